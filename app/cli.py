@@ -0,0 +1,190 @@
+"""
+Command-line batch runner for PyJHora calculations
+
+Runs the same named operations as /api/v1/jobs over a file of births,
+without the HTTP stack:
+
+    python -m app.cli births.csv -o results.jsonl --operations charts,dasha --workers 4
+    cat births.jsonl | python -m app.cli - --operations panchanga > results.jsonl
+
+Rows are calculated in chunks on a process pool and written in input
+order as they complete. A throughput summary is printed to stderr.
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+# PyJHora prints to stdout when imported; keep stdout for results
+with contextlib.redirect_stdout(sys.stderr):
+    from app.models.schemas import validate_as_of, validate_chart_types
+    from app.services.batch import batch_chunk_size
+    from app.services.executor import DEFAULT_START_METHOD, warm_worker
+    from app.services.jobs import (
+        OUTPUT_FORMATS, JobError, complete_records, detect_format, iter_rows, parquet_table, prepare_records, read_rows,
+        require_format
+    )
+    from app.services.operations import (
+        OPERATIONS, invoke_operations_batch, operation_calls, operation_options, resolve_operations
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Run PyJHora calculations for every birth in a CSV, JSONL or Parquet file."
+    )
+    parser.add_argument("input", help="Input file, or - to read from stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output file, or - for stdout (default)")
+    parser.add_argument("--format", dest="input_format", choices=["csv", "jsonl", "parquet"],
+                        help="Input format (default: from the file extension, jsonl for stdin)")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS,
+                        help="Output format (default: from the output file extension, else jsonl)")
+    parser.add_argument("--operations", default="charts",
+                        help=f"Comma-separated operations (default: charts): {', '.join(OPERATIONS)}")
+    parser.add_argument("--ayanamsa", default="LAHIRI", help="Ayanamsa system (default: LAHIRI)")
+    parser.add_argument("--chart-types", default="D1", help="Comma-separated chart types, or 'all' (default: D1)")
+    parser.add_argument("--as-of", help="Date for current dasha/bhukti (YYYY-MM-DD, default: today)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Calculation processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=batch_chunk_size(),
+                        help="Rows per pool task (default: PYJHORA_BATCH_CHUNK or 25)")
+    parser.add_argument("--quiet", action="store_true", help="Do not print the summary")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers and --chunk-size must be at least 1")
+    return args
+
+
+def input_rows(args: argparse.Namespace) -> Iterator[Dict]:
+    if args.input == "-":
+        fmt = args.input_format or "jsonl"
+        if fmt == "parquet":
+            raise JobError("Parquet input cannot be read from stdin")
+        return iter_rows(sys.stdin, fmt)
+    return read_rows(args.input, detect_format(args.input, args.input_format))
+
+
+class ResultWriter:
+    """Append result records to a JSONL stream or a Parquet file"""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self._parquet = None
+        if fmt == "parquet" and path == "-":
+            raise JobError("Parquet output needs an output file (-o)")
+        if path == "-":
+            self._file = self._claim_stdout()
+        elif fmt == "parquet":
+            self._file = open(path, "wb")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+
+    @staticmethod
+    def _claim_stdout():
+        """
+        Keep the real stdout for results and point file descriptor 1 at stderr,
+        so anything printed by PyJHora (here or in the pool workers, which
+        inherit the descriptor) cannot end up in the JSONL stream
+        """
+        sys.stdout.flush()
+        results = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        return results
+
+    def write(self, records: List[Dict]):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            table = parquet_table(records)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self._file, table.schema)
+            self._parquet.write_table(table)
+        else:
+            for record in records:
+                self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        self._file.close()
+
+
+def run(args: argparse.Namespace) -> Dict:
+    """Calculate every input row and write the results; returns the run summary"""
+    names = resolve_operations(args.operations.split(","))
+    chart_types = validate_chart_types([chart_type.strip() for chart_type in args.chart_types.split(",")])
+    calls = operation_calls(names, operation_options(chart_types=chart_types, as_of=validate_as_of(args.as_of)))
+    output_format = args.output_format or ("parquet" if args.output.endswith(".parquet") else "jsonl")
+    require_format(output_format)
+
+    rows = input_rows(args)
+    writer = ResultWriter(args.output, output_format)
+    summary = {"rows": 0, "succeeded": 0, "failed": 0, "workers": args.workers, "operations": names}
+    start = time.perf_counter()
+
+    def flush(records, positions, pending):
+        outcomes = []
+        if pending is not None:
+            try:
+                outcomes = pending.get()
+            except Exception as e:
+                outcomes = [({}, {"calculation": str(e)})] * len(positions)
+        records = complete_records(records, positions, outcomes)
+        writer.write(records)
+        failed = sum(1 for record in records if record["status"] == "error")
+        summary["rows"] += len(records)
+        summary["failed"] += failed
+        summary["succeeded"] += len(records) - failed
+
+    context = multiprocessing.get_context(os.getenv("PYJHORA_POOL_START_METHOD", DEFAULT_START_METHOD))
+    try:
+        with context.Pool(args.workers, initializer=warm_worker) as pool:
+            # Keep a bounded number of chunks in flight so large inputs are streamed, not loaded
+            in_flight = deque()
+            first_row = 0
+            while batch := list(islice(rows, args.chunk_size)):
+                records, births, positions = prepare_records(batch, first_row)
+                first_row += len(batch)
+                pending = pool.apply_async(invoke_operations_batch, (births, args.ayanamsa, calls)) if births else None
+                in_flight.append((records, positions, pending))
+                if len(in_flight) >= 2 * args.workers:
+                    flush(*in_flight.popleft())
+            while in_flight:
+                flush(*in_flight.popleft())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    summary["elapsed_seconds"] = round(elapsed, 2)
+    summary["rows_per_second"] = round(summary["rows"] / elapsed, 2) if elapsed else None
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        summary = run(args)
+    except (JobError, ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(
+            f"Processed {summary['rows']} rows ({summary['succeeded']} succeeded, {summary['failed']} failed) "
+            f"in {summary['elapsed_seconds']}s - {summary['rows_per_second']} rows/sec "
+            f"with {summary['workers']} workers",
+            file=sys.stderr
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,27 @@
 """FastAPI main application"""
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import charts, dashas, yogas, doshas, strength, panchanga, compatibility, special, transits, comprehensive
+from app.routers import charts, dashas, yogas, doshas, strength, panchanga, compatibility, special, transits, comprehensive, batch, jobs
+from app.services.executor import calculation_pool, single_flight
+from app.services.jobs import start_job_runner, stop_job_runner
+from app.services.cache import result_cache, request_cache_status, bypass_requested, CacheStatus, STATUS_HEADER
+from app.services.ephemeris_store import ephemeris_store, store_stats
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background work with the application and stop it on shutdown"""
+    # Memory-map and verify the ephemeris store before the first request needs it
+    await asyncio.to_thread(ephemeris_store)
+    # Process queued bulk jobs in the background (disable with PYJHORA_JOBS_ENABLED=0)
+    start_job_runner()
+    yield
+    # Stop claiming jobs; a job cut short is resumed from its last checkpoint
+    await stop_job_runner()
+    # Stop the calculation worker processes
+    calculation_pool.shutdown()
 
 # Create FastAPI app
 app = FastAPI(
@@ -10,7 +29,8 @@ app = FastAPI(
     description="RESTful API for Vedic astrology calculations using PyJHora library",
     version="1.2.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -22,6 +42,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def result_cache_status(request: Request, call_next):
+    """Honour the cache bypass headers and report HIT/MISS/COALESCED/BYPASS in X-Cache"""
+    status = CacheStatus(bypass=bypass_requested(request.headers))
+    token = request_cache_status.set(status)
+    try:
+        response = await call_next(request)
+    finally:
+        request_cache_status.reset(token)
+    if status.header:
+        response.headers[STATUS_HEADER] = status.header
+    return response
+
 # Include routers
 app.include_router(comprehensive.router)  # Comprehensive endpoint (all-in-one)
 app.include_router(charts.router)
@@ -33,6 +66,8 @@ app.include_router(panchanga.router)
 app.include_router(compatibility.router)
 app.include_router(special.router)
 app.include_router(transits.router)
+app.include_router(batch.router)
+app.include_router(jobs.router)
 
 @app.get("/")
 async def root():
@@ -52,7 +87,9 @@ async def root():
             "panchanga": "/api/v1/panchanga",
             "compatibility": "/api/v1/compatibility",
             "special": "/api/v1/special",
-            "transits": "/api/v1/transits"
+            "transits": "/api/v1/transits",
+            "batch": "/api/v1/batch",
+            "jobs": "/api/v1/jobs"
         },
         "new_in_v1.2": [
             "Comprehensive endpoint - All data in one API call (D1/D9/D10, Dashas, Ashtakavarga, Yogas, Doshas)"
@@ -65,10 +102,14 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (served on the event loop, never queued behind calculations)"""
     return {
         "status": "healthy",
-        "service": "pyjhora-api"
+        "service": "pyjhora-api",
+        "calculation_pool": calculation_pool.stats(),
+        "result_cache": result_cache.stats(),
+        "request_coalescing": single_flight.stats(),
+        "ephemeris_store": store_stats()
     }
 
 @app.get("/wake-up")
@@ -128,6 +169,8 @@ async def list_chart_types():
             "D24": "Chaturvimsamsa (Education)",
             "D27": "Nakshatramsa (Strengths)",
             "D30": "Trimsamsa (Misfortunes)",
+            "D40": "Khavedamsa (Auspicious/Inauspicious Effects)",
+            "D45": "Akshavedamsa (General Indications)",
             "D60": "Shashtyamsa (Past Life)"
         }
     }
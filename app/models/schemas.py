@@ -1,7 +1,7 @@
 """Pydantic models for API request/response validation"""
 
 from pydantic import BaseModel, Field, validator
-from typing import List, Dict, Optional
+from typing import Any, ClassVar, List, Dict, Optional, Union
 from datetime import datetime
 
 class BirthData(BaseModel):
@@ -16,16 +16,15 @@ class BirthData(BaseModel):
     @validator('date')
     def validate_date(cls, v):
         try:
-            datetime.strptime(v, "%Y-%m-%d")
-            return v
+            # Normalized so equivalent inputs ("1990-5-1") produce identical results
+            return datetime.strptime(v, "%Y-%m-%d").strftime("%Y-%m-%d")
         except ValueError:
             raise ValueError("Date must be in YYYY-MM-DD format")
 
     @validator('time')
     def validate_time(cls, v):
         try:
-            datetime.strptime(v, "%H:%M:%S")
-            return v
+            return datetime.strptime(v, "%H:%M:%S").strftime("%H:%M:%S")
         except ValueError:
             raise ValueError("Time must be in HH:MM:SS format (24-hour)")
 
@@ -41,11 +40,162 @@ class BirthData(BaseModel):
             raise ValueError("Longitude must be between -180 and 180")
         return v
 
+def validate_as_of(v):
+    """Normalize an optional YYYY-MM-DD reference date"""
+    if v is None:
+        return v
+    try:
+        return datetime.strptime(v, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise ValueError("as_of must be in YYYY-MM-DD format")
+
 class ChartRequest(BaseModel):
     """Request model for chart calculation"""
     birth_data: BirthData
     ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system", example="LAHIRI")
     chart_type: Optional[str] = Field("D1", description="Chart type (D1, D9, D10, etc.)", example="D1")
+    as_of: Optional[str] = Field(None, description="Date (YYYY-MM-DD) for current dasha/bhukti periods, default today", example="2025-01-01")
+
+    _validate_as_of = validator('as_of', allow_reuse=True)(validate_as_of)
+
+# Parts of the comprehensive analysis that can be requested, and shorthands for groups of them
+ANALYSIS_FIELDS = [
+    "d1", "d9", "d10", "maha_dasha", "current_dasha", "antardasha", "current_bhukti",
+    "ashtakavarga", "present_yogas", "all_yogas", "present_doshas", "all_doshas"
+]
+ANALYSIS_GROUPS = {
+    "charts": ["d1", "d9", "d10"],
+    "dashas": ["maha_dasha", "current_dasha", "antardasha", "current_bhukti"],
+    "yogas": ["present_yogas", "all_yogas"],
+    "doshas": ["present_doshas", "all_doshas"]
+}
+
+def validate_analysis_fields(v):
+    """Expand a list (or comma-separated string) of analysis fields and groups"""
+    if v is None:
+        return v
+    if isinstance(v, str):
+        v = v.split(",")
+    names = [name.strip().lower() for name in v if name.strip()]
+    unknown = [name for name in names if name not in ANALYSIS_FIELDS and name not in ANALYSIS_GROUPS]
+    if unknown:
+        raise ValueError(f"Unsupported fields {unknown}; use {ANALYSIS_FIELDS} or groups {list(ANALYSIS_GROUPS)}")
+    expanded = [field for name in names for field in ANALYSIS_GROUPS.get(name, [name])]
+    return list(dict.fromkeys(expanded))
+
+class ComprehensiveRequest(ChartRequest):
+    """Request model for the comprehensive analysis, optionally limited to some of its parts"""
+    include: Optional[Union[List[str], str]] = Field(
+        None,
+        description=f"Only calculate these parts (default: all): {', '.join(ANALYSIS_FIELDS)}, "
+                    f"or the groups {', '.join(ANALYSIS_GROUPS)}",
+        example=["d1", "current_dasha"]
+    )
+    exclude: Optional[Union[List[str], str]] = Field(
+        None,
+        description="Skip these parts (same names as include)",
+        example=["yogas"]
+    )
+
+    _validate_include = validator('include', allow_reuse=True)(validate_analysis_fields)
+    _validate_exclude = validator('exclude', allow_reuse=True)(validate_analysis_fields)
+
+    @validator('exclude')
+    def validate_selection(cls, v, values):
+        included = values.get('include') or ANALYSIS_FIELDS
+        if v is not None and not [field for field in included if field not in v]:
+            raise ValueError("include/exclude leave nothing to calculate")
+        return v
+
+    def selected_fields(self) -> List[str]:
+        """Requested parts of the analysis, in ANALYSIS_FIELDS order"""
+        included = self.include or ANALYSIS_FIELDS
+        excluded = self.exclude or []
+        return [field for field in ANALYSIS_FIELDS if field in included and field not in excluded]
+
+def validate_chart_types(v):
+    """Uppercase and de-duplicate chart types, expanding "all" to every supported chart"""
+    from app.services.calculator import CHART_FACTORS
+    if isinstance(v, str):
+        v = [v]
+    chart_types = [chart_type.upper() for chart_type in v]
+    if chart_types == ["ALL"]:
+        return list(CHART_FACTORS)
+    unknown = [chart_type for chart_type in chart_types if chart_type not in CHART_FACTORS]
+    if unknown or not chart_types:
+        raise ValueError(f"Unsupported chart types {unknown}; use {list(CHART_FACTORS)} or \"all\"")
+    return list(dict.fromkeys(chart_types))
+
+class VargaTableRequest(BaseModel):
+    """Request model for several divisional charts in one call"""
+    birth_data: BirthData
+    ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system", example="LAHIRI")
+    chart_types: Union[List[str], str] = Field(
+        "all",
+        description='Chart types to calculate (e.g. ["D1", "D9", "D60"]) or "all"',
+        example=["D1", "D9", "D10"]
+    )
+
+    _validate_chart_types = validator('chart_types', allow_reuse=True)(validate_chart_types)
+
+class BatchChartRequest(BaseModel):
+    """Request model for divisional charts of many births in one call"""
+    births: List[Dict[str, Any]] = Field(
+        ...,
+        description="BirthData objects; invalid ones are reported per item",
+        example=[{"date": "1998-12-22", "time": "17:12:00", "timezone_offset": 5.5,
+                  "latitude": 12.9716, "longitude": 77.5946}]
+    )
+    ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system", example="LAHIRI")
+    chart_types: Union[List[str], str] = Field(
+        ["D1"],
+        description='Chart types to calculate for every birth (e.g. ["D1", "D9"]) or "all"',
+        example=["D1", "D9"]
+    )
+
+    _validate_chart_types = validator('chart_types', allow_reuse=True)(validate_chart_types)
+
+    @validator('births')
+    def validate_births(cls, v):
+        from app.services.batch import batch_limit
+        if not v:
+            raise ValueError("At least one birth is required")
+        if len(v) > batch_limit():
+            raise ValueError(f"At most {batch_limit()} births per batch, got {len(v)}")
+        return v
+
+class CompatibilityMatrixRequest(BaseModel):
+    """Request model for the Ashtakoota score matrix between two groups"""
+    boys: List[Dict[str, Any]] = Field(
+        ...,
+        description="Rows: profiles with birth_data or nakshatra + nakshatra_pada, and an optional id",
+        example=[{"id": "b1", "nakshatra": "Rohini", "nakshatra_pada": 2}]
+    )
+    girls: List[Dict[str, Any]] = Field(
+        ...,
+        description="Columns: profiles in the same form as boys",
+        example=[{"id": "g1", "nakshatra": "Hasta", "nakshatra_pada": 3}, {"id": "g2", "nakshatra": 9, "nakshatra_pada": 1}]
+    )
+    ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system")
+    breakdown: bool = Field(False, description="Also return one matrix per koota")
+    encoding: str = Field("json", description="json (nested lists) or uint8 (base64, one byte per cell = score x 2)")
+    stream: bool = Field(False, description="Stream NDJSON, one line per row")
+
+    @validator('boys', 'girls')
+    def validate_group(cls, v):
+        from app.services.matching import matrix_limit
+        if not v:
+            raise ValueError("At least one profile is required")
+        if len(v) > matrix_limit():
+            raise ValueError(f"At most {matrix_limit()} profiles per side, got {len(v)}")
+        return v
+
+    @validator('encoding')
+    def validate_encoding(cls, v):
+        from app.services.matching import MATRIX_ENCODINGS
+        if v not in MATRIX_ENCODINGS:
+            raise ValueError(f"encoding must be one of {list(MATRIX_ENCODINGS)}")
+        return v
 
 class PlanetPosition(BaseModel):
     """Planet position in a chart"""
@@ -71,6 +221,9 @@ class DashaRequest(BaseModel):
     birth_data: BirthData
     ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system")
     dasha_system: Optional[str] = Field("VIMSOTTARI", description="Dasha system type")
+    as_of: Optional[str] = Field(None, description="Date (YYYY-MM-DD) for current dasha/bhukti periods, default today", example="2025-01-01")
+
+    _validate_as_of = validator('as_of', allow_reuse=True)(validate_as_of)
 
 class DashaPeriod(BaseModel):
     """Dasha period model"""
@@ -85,6 +238,7 @@ class DashaResponse(BaseModel):
     dasha_system: str
     birth_data: Dict
     moon_nakshatra: Optional[Dict] = None
+    as_of: Optional[str] = None
     current_dasha: Optional[Dict] = None
     maha_dasha_periods: List[DashaPeriod]
     antara_dasha_periods: Optional[List[Dict]] = None
@@ -108,6 +262,192 @@ class PanchangaRequest(BaseModel):
     longitude: float
     timezone_offset: float
 
+class PanchangaCalendarRequest(BaseModel):
+    """Request model for a day-by-day Panchanga calendar of one place"""
+    latitude: float = Field(..., description="Latitude in decimal degrees", example=13.0827)
+    longitude: float = Field(..., description="Longitude in decimal degrees", example=80.2707)
+    timezone_offset: float = Field(..., description="Timezone offset from UTC (e.g., 5.5 for IST)", example=5.5)
+    place_name: Optional[str] = Field(None, description="Place name (optional)", example="Chennai, India")
+    start_date: str = Field(..., description="First day (YYYY-MM-DD)", example="2025-01-01")
+    end_date: str = Field(..., description="Last day (YYYY-MM-DD), inclusive", example="2025-12-31")
+    ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system")
+    stream: bool = Field(True, description="Stream NDJSON, one line per day; false returns one JSON document")
+
+    @validator('latitude')
+    def validate_latitude(cls, v):
+        if not -90 <= v <= 90:
+            raise ValueError("Latitude must be between -90 and 90")
+        return v
+
+    @validator('longitude')
+    def validate_longitude(cls, v):
+        if not -180 <= v <= 180:
+            raise ValueError("Longitude must be between -180 and 180")
+        return v
+
+    @validator('start_date', 'end_date')
+    def validate_dates(cls, v):
+        try:
+            return datetime.strptime(v, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            raise ValueError("Dates must be in YYYY-MM-DD format")
+
+    @validator('end_date')
+    def validate_range(cls, v, values):
+        from app.services.panchanga_calendar import calendar_max_days
+        if 'start_date' not in values:
+            return v
+        days = (datetime.strptime(v, "%Y-%m-%d") - datetime.strptime(values['start_date'], "%Y-%m-%d")).days + 1
+        if days < 1:
+            raise ValueError("end_date must not be before start_date")
+        if days > calendar_max_days():
+            raise ValueError(f"At most {calendar_max_days()} days per calendar, got {days}")
+        return v
+
+class TransitTimelineRequest(BaseModel):
+    """Request model for planetary positions sampled over a time range"""
+    start: str = Field(..., description="First sample (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS, local time)", example="2025-01-01")
+    end: str = Field(..., description="Last sample at or before this time", example="2034-12-31")
+    step_minutes: float = Field(1440, description="Minutes between samples (1 minute to 30 days)", example=1440)
+    timezone_offset: float = Field(0.0, description="Timezone offset from UTC of start, end and the returned times", example=5.5)
+    planets: Optional[List[str]] = Field(None, description="Planets to include (default: Sun to Ketu)", example=["Jupiter", "Saturn"])
+    ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system")
+    format: str = Field("json", description="json (lists per column), csv (one row per sample and planet) or binary (base64 per column)")
+
+    @validator('start', 'end')
+    def validate_times(cls, v):
+        try:
+            parsed = datetime.fromisoformat(v)
+        except ValueError:
+            raise ValueError("Times must be YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS")
+        if parsed.tzinfo is not None:
+            raise ValueError("Give times without an offset and use timezone_offset")
+        return parsed.isoformat(timespec="seconds")
+
+    @validator('step_minutes', always=True)
+    def validate_step(cls, v, values):
+        from app.services.ephemeris import timeline_max_samples, timeline_samples
+        if not 1 <= v <= 43200:
+            raise ValueError("step_minutes must be between 1 and 43200 (30 days)")
+        if 'start' not in values or 'end' not in values:
+            return v
+        samples = timeline_samples(values['start'], values['end'], v)
+        if samples < 1:
+            raise ValueError("end must not be before start")
+        if samples > timeline_max_samples():
+            raise ValueError(f"At most {timeline_max_samples()} samples per timeline, got {samples}")
+        return v
+
+    @validator('planets')
+    def validate_planets(cls, v):
+        from app.services.ephemeris import planet_indices
+        planet_indices(v)
+        return v
+
+    @validator('format')
+    def validate_format(cls, v):
+        from app.services.ephemeris import TIMELINE_FORMATS
+        if v not in TIMELINE_FORMATS:
+            raise ValueError(f"format must be one of {list(TIMELINE_FORMATS)}")
+        return v
+
+class TransitRangeRequest(BaseModel):
+    """Time range and planets of a search for transit events"""
+    search: ClassVar[str] = "search"
+    # Environment variable overriding the longest range accepted
+    max_days_env: ClassVar[Optional[str]] = None
+
+    start: str = Field(..., description="Start of the range (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS, local time)", example="2025-01-01")
+    end: str = Field(..., description="End of the range", example="2026-01-01")
+    timezone_offset: float = Field(0.0, description="Timezone offset from UTC of start, end and the returned times", example=5.5)
+    planets: Optional[List[str]] = Field(None, description="Planets to include (default: Sun to Ketu)", example=["Mercury", "Saturn"])
+    ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system")
+
+    @validator('start', 'end')
+    def validate_times(cls, v):
+        try:
+            parsed = datetime.fromisoformat(v)
+        except ValueError:
+            raise ValueError("Times must be YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS")
+        if parsed.tzinfo is not None:
+            raise ValueError("Give times without an offset and use timezone_offset")
+        return parsed.isoformat(timespec="seconds")
+
+    @validator('end')
+    def validate_range(cls, v, values):
+        if 'start' not in values:
+            return v
+        days = (datetime.fromisoformat(v) - datetime.fromisoformat(values['start'])).total_seconds() / 86400
+        if days <= 0:
+            raise ValueError("end must be after start")
+        from app.services.transit_events import range_max_days
+        max_days = range_max_days(cls.max_days_env)
+        if days > max_days:
+            raise ValueError(f"At most {max_days} days per {cls.search}, got {days:.0f}")
+        return v
+
+    @validator('planets')
+    def validate_planets(cls, v):
+        from app.services.ephemeris import planet_indices
+        planet_indices(v)
+        return v
+
+class TransitIngressRequest(TransitRangeRequest):
+    """Request model for planetary ingresses found over a time range"""
+    search: ClassVar[str] = "ingress search"
+    max_days_env: ClassVar[Optional[str]] = "PYJHORA_INGRESS_MAX_DAYS"
+
+    divisions: Optional[List[str]] = Field(None, description="sign, nakshatra and/or pada (default: sign)", example=["sign", "nakshatra"])
+    limit: int = Field(1000, description="Most ingresses returned, earliest first (1 to 100000)", example=1000)
+
+    @validator('divisions')
+    def validate_divisions(cls, v):
+        from app.services.transit_events import ingress_divisions
+        ingress_divisions(v)
+        return v
+
+    @validator('limit')
+    def validate_limit(cls, v):
+        if not 1 <= v <= 100000:
+            raise ValueError("limit must be between 1 and 100000")
+        return v
+
+class TransitEventRequest(TransitRangeRequest):
+    """Request model for stations, retrograde periods and combustion found over a time range"""
+    search: ClassVar[str] = "event search"
+    max_days_env: ClassVar[Optional[str]] = "PYJHORA_EVENTS_MAX_DAYS"
+
+    events: Optional[List[str]] = Field(None, description="station, retrograde and/or combustion (default: all)", example=["station"])
+
+    @validator('events')
+    def validate_events(cls, v):
+        from app.services.transit_events import event_kinds
+        event_kinds(v)
+        return v
+
+class SadeSatiTimelineRequest(BaseModel):
+    """Request model for every Sade Sati period over a lifetime"""
+    birth_data: BirthData
+    ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system")
+    years: int = Field(100, description="Years from birth covered (1 to 150)", example=100)
+    include: Optional[List[str]] = Field(None, description="Other Saturn transits to add: ashtama and/or kantaka", example=["ashtama"])
+
+    @validator('years')
+    def validate_years(cls, v):
+        if not 1 <= v <= 150:
+            raise ValueError("years must be between 1 and 150")
+        return v
+
+    @validator('include')
+    def validate_include(cls, v):
+        kinds = ("ashtama", "kantaka")
+        if v is None:
+            return v
+        unknown = [kind for kind in v if kind.strip().lower() not in kinds]
+        if unknown:
+            raise ValueError(f"Unknown Saturn transits {unknown}; use {list(kinds)}")
+        return sorted({kind.strip().lower() for kind in v})
+
 class PanchangaResponse(BaseModel):
     """Response model for Panchanga calculation"""
     status: str = "success"
@@ -131,3 +471,56 @@ class CompatibilityRequest(BaseModel):
     boy_birth_data: BirthData
     girl_birth_data: BirthData
     ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system")
+
+class MatchProfile(BaseModel):
+    """Profile to match: birth data, or a known janma nakshatra and pada"""
+    birth_data: Optional[BirthData] = None
+    nakshatra: Optional[Union[int, str]] = Field(None, description="Janma nakshatra, 1-27 or name", example="Rohini")
+    nakshatra_pada: Optional[int] = Field(None, description="Nakshatra pada (1-4)", example=2)
+
+    @validator('nakshatra')
+    def validate_nakshatra(cls, v):
+        from app.services.matching import nakshatra_number
+        return None if v is None else nakshatra_number(v)
+
+    @validator('nakshatra_pada', always=True)
+    def validate_source(cls, v, values):
+        from app.services.matching import pada_number
+        if values.get('birth_data') is not None or 'nakshatra' not in values:
+            return v
+        if values['nakshatra'] is None or v is None:
+            raise ValueError("Provide birth_data, or nakshatra and nakshatra_pada")
+        return pada_number(v)
+
+class CompatibilityMatchRequest(BaseModel):
+    """Request model for matching one profile against many candidates"""
+    profile: MatchProfile
+    profile_role: str = Field("boy", description="Role of the profile in the Ashtakoota pairing: boy or girl", example="boy")
+    candidates: List[Dict[str, Any]] = Field(
+        ...,
+        description="Candidates, each with birth_data or nakshatra + nakshatra_pada, and an optional id; "
+                    "invalid ones are reported per item",
+        example=[{"id": "c1", "nakshatra": "Hasta", "nakshatra_pada": 3},
+                 {"id": "c2", "birth_data": {"date": "1996-03-14", "time": "08:45:00", "timezone_offset": 5.5,
+                                             "latitude": 13.0827, "longitude": 80.2707}}]
+    )
+    ayanamsa: Optional[str] = Field("LAHIRI", description="Ayanamsa system")
+    min_score: float = Field(0, ge=0, le=36, description="Only return candidates scoring at least this (out of 36)")
+    exclude_nadi_dosha: bool = Field(False, description="Drop candidates with Nadi dosha (0 Nadi points)")
+    top_k: int = Field(10, ge=1, le=1000, description="Number of best matches to return")
+    include_breakdown: bool = Field(True, description="Include the score of each koota")
+
+    @validator('profile_role')
+    def validate_profile_role(cls, v):
+        if v.lower() not in ("boy", "girl"):
+            raise ValueError("profile_role must be 'boy' or 'girl'")
+        return v.lower()
+
+    @validator('candidates')
+    def validate_candidates(cls, v):
+        from app.services.matching import match_limit
+        if not v:
+            raise ValueError("At least one candidate is required")
+        if len(v) > match_limit():
+            raise ValueError(f"At most {match_limit()} candidates per request, got {len(v)}")
+        return v
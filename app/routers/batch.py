@@ -0,0 +1,59 @@
+"""Batch calculation endpoints"""
+
+import time
+from fastapi import APIRouter, HTTPException
+from app.models.schemas import BatchChartRequest, ErrorResponse
+from app.services.batch import run_batch, validate_birth_data
+
+router = APIRouter(prefix="/api/v1/batch", tags=["Batch"])
+
+@router.post("/charts", responses={400: {"model": ErrorResponse}})
+async def calculate_chart_batch(request: BatchChartRequest):
+    """
+    Calculate Divisional Charts for Many Births
+
+    Accepts a list of birth data records (up to `PYJHORA_BATCH_LIMIT`, default 500)
+    and the chart types to calculate for each, e.g. `["D1", "D9"]` or `"all"`.
+
+    Records are calculated in chunks across the worker pool, with all charts of
+    one birth derived from a single planetary position calculation. Results come
+    back in input order; an invalid or failing record gets `status: "error"`
+    with a message instead of failing the whole batch.
+    """
+    try:
+        start = time.perf_counter()
+        results = [None] * len(request.births)
+        births, indices = [], []
+        for index, item in enumerate(request.births):
+            birth_data, error = validate_birth_data(item)
+            if error:
+                results[index] = {"index": index, "status": "error", "error": error}
+            else:
+                births.append(birth_data)
+                indices.append(index)
+
+        outcomes, counters = await run_batch(births, request.ayanamsa, "calculate_vargas", request.chart_types)
+        for index, birth_data, (ok, value) in zip(indices, births, outcomes):
+            if ok:
+                # Echo each record's own birth data (place names are not part of the cache key)
+                charts = {chart_type: {**chart, "birth_data": birth_data} for chart_type, chart in value.items()}
+                results[index] = {"index": index, "status": "success", "birth_data": birth_data, "charts": charts}
+            else:
+                results[index] = {"index": index, "status": "error", "birth_data": birth_data, "error": value}
+
+        failed = sum(1 for result in results if result["status"] == "error")
+        return {
+            "status": "success",
+            "ayanamsa": request.ayanamsa,
+            "chart_types": request.chart_types,
+            "total": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": results,
+            "calculation_info": {
+                **counters,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+            }
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,8 +1,8 @@
 """Chart calculation endpoints"""
 
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import ChartRequest, ChartResponse, ErrorResponse
-from app.services.calculator import PyJHoraCalculator
+from app.models.schemas import ChartRequest, ChartResponse, VargaTableRequest, ErrorResponse
+from app.services.executor import calculate, CalculationPoolError
 
 router = APIRouter(prefix="/api/v1/charts", tags=["Charts"])
 
@@ -14,12 +14,14 @@ async def calculate_rasi_chart(request: ChartRequest):
     Returns planet positions, ascendant, and house placements for the birth chart.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_chart", "D1"
         )
-        result = calculator.calculate_chart("D1")
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -31,12 +33,14 @@ async def calculate_navamsa_chart(request: ChartRequest):
     Returns planet positions in the Navamsa chart (marriage/spouse chart).
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_chart", "D9"
         )
-        result = calculator.calculate_chart("D9")
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -48,12 +52,14 @@ async def calculate_dasamsa_chart(request: ChartRequest):
     Returns planet positions in the Dasamsa chart (career/profession chart).
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_chart", "D10"
         )
-        result = calculator.calculate_chart("D10")
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -65,8 +71,9 @@ async def calculate_hora_chart(request: ChartRequest):
     Returns planet positions in the Hora chart (wealth/money chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D2")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D2")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -78,8 +85,9 @@ async def calculate_drekkana_chart(request: ChartRequest):
     Returns planet positions in the Drekkana chart (siblings/courage chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D3")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D3")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -91,8 +99,9 @@ async def calculate_chaturthamsa_chart(request: ChartRequest):
     Returns planet positions in the Chaturthamsa chart (property/assets chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D4")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D4")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -104,8 +113,9 @@ async def calculate_saptamsa_chart(request: ChartRequest):
     Returns planet positions in the Saptamsa chart (children/progeny chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D7")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D7")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -117,8 +127,9 @@ async def calculate_dwadasamsa_chart(request: ChartRequest):
     Returns planet positions in the Dwadasamsa chart (parents chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D12")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D12")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -130,8 +141,9 @@ async def calculate_shodasamsa_chart(request: ChartRequest):
     Returns planet positions in the Shodasamsa chart (vehicles/comforts chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D16")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D16")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -143,8 +155,9 @@ async def calculate_vimsamsa_chart(request: ChartRequest):
     Returns planet positions in the Vimsamsa chart (spiritual practices chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D20")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D20")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -156,8 +169,9 @@ async def calculate_chaturvimsamsa_chart(request: ChartRequest):
     Returns planet positions in the Chaturvimsamsa chart (education/learning chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D24")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D24")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -169,8 +183,9 @@ async def calculate_nakshatramsa_chart(request: ChartRequest):
     Returns planet positions in the Nakshatramsa chart (strengths/weaknesses chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D27")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D27")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -182,8 +197,9 @@ async def calculate_trimsamsa_chart(request: ChartRequest):
     Returns planet positions in the Trimsamsa chart (evils/misfortunes chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D30")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D30")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -195,8 +211,9 @@ async def calculate_khavedamsa_chart(request: ChartRequest):
     Returns planet positions in the Khavedamsa chart (auspicious/inauspicious chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D40")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D40")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -208,8 +225,9 @@ async def calculate_akshavedamsa_chart(request: ChartRequest):
     Returns planet positions in the Akshavedamsa chart (general indications chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D45")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D45")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -221,8 +239,9 @@ async def calculate_shashtyamsa_chart(request: ChartRequest):
     Returns planet positions in the Shashtyamsa chart (past life/karma chart).
     """
     try:
-        calculator = PyJHoraCalculator(request.birth_data.dict(), request.ayanamsa)
-        return calculator.calculate_chart("D60")
+        return await calculate(request.birth_data.dict(), request.ayanamsa, "calculate_chart", "D60")
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -235,13 +254,39 @@ async def calculate_divisional_chart(request: ChartRequest):
     Specify chart_type in request body (e.g., "D1", "D9", "D60")
     """
     try:
-        calculator = PyJHoraCalculator(
+        chart_type = request.chart_type or "D1"
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_chart", chart_type.upper()
+        )
+        return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/vargas", responses={400: {"model": ErrorResponse}})
+async def calculate_varga_table(request: VargaTableRequest):
+    """
+    Calculate Several Divisional Charts in One Call
+
+    Returns a compact table of planet (and ascendant) signs for each requested
+    varga, e.g. `table["Moon"]["D9"] = "Gemini"`. Pass `chart_types: "all"` for
+    every supported chart (D1-D60, including the full Shodasavarga).
+
+    All charts are derived from a single planetary position calculation, so this
+    is much cheaper than calling the individual chart endpoints one by one.
+    """
+    try:
+        result = await calculate(
+            request.birth_data.dict(),
+            request.ayanamsa,
+            "calculate_varga_table", request.chart_types
         )
-        chart_type = request.chart_type or "D1"
-        result = calculator.calculate_chart(chart_type.upper())
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -253,12 +298,14 @@ async def calculate_house_wise_chart(chart_type: str, request: ChartRequest):
     Returns planets organized by houses for any divisional chart.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_house_wise", chart_type.upper()
         )
-        result = calculator.calculate_house_wise(chart_type.upper())
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -274,11 +321,13 @@ async def calculate_bhava_chalit_chart(request: ChartRequest):
     calculated using the Swiss Ephemeris method.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_bhava_chalit"
         )
-        result = calculator.calculate_bhava_chalit()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,8 +1,22 @@
 """Marriage compatibility calculation endpoint"""
 
+import asyncio
+import json
+import time
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import CompatibilityRequest, ErrorResponse
-from app.services.calculator import PyJHoraCalculator
+from fastapi.responses import StreamingResponse
+from app.models.schemas import CompatibilityRequest, CompatibilityMatchRequest, CompatibilityMatrixRequest, ErrorResponse
+from app.services.ashtakoota import ASHTAKOOTA_KOOTAS, ashtakoota_table
+from app.services.calculator import NAKSHATRA_NAMES, PyJHoraCalculator
+from app.services.cache import canonical_birth_data, cache_key
+from app.services.executor import calculate, run_cached, guarded_call, CalculationPoolError
+from app.services.matching import (
+    MATRIX_INVALID, candidate_id, encode_breakdown, encode_scores, matrix_block, rank_matches, resolve_candidates,
+    table_indices
+)
+
+# Rows of the matrix gathered per step when streaming
+MATRIX_STREAM_ROWS = 64
 
 router = APIRouter(prefix="/api/v1/compatibility", tags=["Compatibility"])
 
@@ -36,11 +50,179 @@ async def calculate_marriage_compatibility(request: CompatibilityRequest):
     Returns detailed scores for each koota with overall compatibility rating.
     """
     try:
-        result = PyJHoraCalculator.calculate_marriage_compatibility(
-            request.boy_birth_data.dict(),
-            request.girl_birth_data.dict(),
+        boy_birth_data = request.boy_birth_data.dict()
+        girl_birth_data = request.girl_birth_data.dict()
+        key = cache_key(
+            "calculate_marriage_compatibility",
+            canonical_birth_data(boy_birth_data),
+            canonical_birth_data(girl_birth_data),
+            request.ayanamsa
+        )
+        result = await run_cached(
+            key,
+            guarded_call,
+            request.ayanamsa,
+            PyJHoraCalculator.calculate_marriage_compatibility,
+            boy_birth_data,
+            girl_birth_data,
             request.ayanamsa
         )
-        return result
+        # Echo this request's birth data (place names are not part of the cache key)
+        return {
+            **result,
+            "boy": {**result["boy"], "birth_data": boy_birth_data},
+            "girl": {**result["girl"], "birth_data": girl_birth_data}
+        }
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/match", responses={400: {"model": ErrorResponse}})
+async def match_compatibility(request: CompatibilityMatchRequest):
+    """
+    Match One Profile Against Many Candidates
+
+    Scores the profile against every candidate with the Ashtakoota system (same
+    scores as `/marriage`) and returns the `top_k` best matches, highest score
+    first. `profile_role` says whether the profile is the boy or the girl of
+    each pairing.
+
+    Candidates give either `birth_data` or a pre-computed `nakshatra` (1-27 or
+    name) and `nakshatra_pada`, plus an optional `id` echoed in the results.
+    Nakshatras calculated from birth data are cached, so repeated searches over
+    the same candidates only do the scoring.
+
+    **Filters:**
+    - `min_score`: drop candidates below this total (out of 36)
+    - `exclude_nadi_dosha`: drop candidates with 0 Nadi points
+
+    Invalid candidates are listed under `errors` instead of failing the search.
+    """
+    try:
+        start = time.perf_counter()
+        if request.profile.birth_data is not None:
+            profile_nakshatra = await calculate(
+                request.profile.birth_data.dict(), request.ayanamsa, "calculate_moon_nakshatra"
+            )
+            profile = (profile_nakshatra["nakshatra_number"], profile_nakshatra["nakshatra_pada"])
+        else:
+            profile = (request.profile.nakshatra, request.profile.nakshatra_pada)
+
+        pairs, errors, info = await resolve_candidates(request.candidates, request.ayanamsa)
+        candidates = [(index, candidate_id(request.candidates[index]), pairs[index]) for index in sorted(pairs)]
+        results, matched = await asyncio.to_thread(
+            rank_matches, profile, request.profile_role, candidates,
+            request.min_score, request.exclude_nadi_dosha, request.top_k, request.include_breakdown
+        )
+        return {
+            "status": "success",
+            "ayanamsa": request.ayanamsa,
+            "profile": {
+                "role": request.profile_role,
+                "nakshatra": NAKSHATRA_NAMES[profile[0] - 1],
+                "nakshatra_pada": profile[1]
+            },
+            "total_candidates": len(request.candidates),
+            "scored": len(candidates),
+            "matched": matched,
+            "returned": len(results),
+            "results": results,
+            "errors": errors,
+            "calculation_info": {
+                **info,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+            }
+        }
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _matrix_profiles(items, pairs):
+    return [
+        {"id": candidate_id(item), "nakshatra": NAKSHATRA_NAMES[pairs[index][0] - 1], "nakshatra_pada": pairs[index][1]}
+        if index in pairs else None
+        for index, item in enumerate(items)
+    ]
+
+
+@router.post("/matrix", responses={400: {"model": ErrorResponse}})
+async def compatibility_matrix(request: CompatibilityMatrixRequest):
+    """
+    Ashtakoota Score Matrix Between Two Groups
+
+    Scores every boy against every girl and returns an N x M matrix of totals
+    (out of 36), with `breakdown: true` also one matrix per koota. Profiles
+    take the same form as `/match` candidates: `birth_data` or `nakshatra` +
+    `nakshatra_pada`, with an optional `id`.
+
+    **Encodings:**
+    - `json` (default): nested lists of points, `null` for pairs with an invalid profile
+    - `uint8`: base64 of the row-major matrix as one byte per cell holding
+      score x 2 (0-72); 255 marks pairs with an invalid profile
+
+    With `stream: true` the response is NDJSON: a header line, one line per
+    boy (row) and a closing summary line, so large matrices never have to be
+    held in memory as a whole.
+    """
+    try:
+        start = time.perf_counter()
+        # Both sides' chunks share the pool's fan-out slots, so they are resolved together
+        (boy_pairs, boy_errors, boy_info), (girl_pairs, girl_errors, girl_info) = await asyncio.gather(
+            resolve_candidates(request.boys, request.ayanamsa), resolve_candidates(request.girls, request.ayanamsa)
+        )
+        boys = table_indices(boy_pairs, len(request.boys))
+        girls = table_indices(girl_pairs, len(request.girls))
+        errors = ([{"side": "boys", **error} for error in boy_errors]
+                  + [{"side": "girls", **error} for error in girl_errors])
+        info = {key: boy_info[key] + girl_info[key] for key in boy_info}
+
+        def header():
+            # Called off the event loop: the first use of the table may load or build it
+            return {
+                "status": "success",
+                "ayanamsa": request.ayanamsa,
+                "shape": [len(request.boys), len(request.girls)],
+                "encoding": request.encoding,
+                "invalid_value": MATRIX_INVALID if request.encoding == "uint8" else None,
+                "kootas": [koota for koota, _ in ASHTAKOOTA_KOOTAS],
+                "koota_maxima": ashtakoota_table().maxima.tolist(),
+                "boys": _matrix_profiles(request.boys, boy_pairs),
+                "girls": _matrix_profiles(request.girls, girl_pairs)
+            }
+
+        if request.stream:
+            def lines():
+                yield json.dumps({"type": "header", **header()}) + "\n"
+                for first in range(0, len(boys), MATRIX_STREAM_ROWS):
+                    totals, kootas = matrix_block(boys[first:first + MATRIX_STREAM_ROWS], girls, request.breakdown)
+                    for offset in range(len(totals)):
+                        row = {"type": "row", "row": first + offset, "totals": encode_scores(totals[offset], request.encoding)}
+                        if kootas is not None:
+                            row["breakdown"] = encode_breakdown(kootas[offset], request.encoding)
+                        yield json.dumps(row) + "\n"
+                summary = {"type": "summary", "errors": errors,
+                           "calculation_info": {**info, "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}}
+                yield json.dumps(summary) + "\n"
+
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        def build():
+            totals, kootas = matrix_block(boys, girls, request.breakdown)
+            result = {**header(), "totals": encode_scores(totals, request.encoding)}
+            if kootas is not None:
+                result["breakdown"] = encode_breakdown(kootas, request.encoding)
+            return result
+
+        result = await asyncio.to_thread(build)
+        return {
+            **result,
+            "errors": errors,
+            "calculation_info": {**info, "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
+        }
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
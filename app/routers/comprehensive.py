@@ -1,13 +1,102 @@
 """Comprehensive analysis endpoint - All data in one call"""
 
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import ChartRequest, ErrorResponse
-from app.services.calculator import PyJHoraCalculator
+from app.models.schemas import ComprehensiveRequest, ErrorResponse
+from app.services.calculator import PyJHoraCalculator, as_of_date
+from app.services.executor import calculate_many, CalculationPoolError
+from app.services.pipeline import Section, run_sections, section_timeout
 
 router = APIRouter(prefix="/api/v1/comprehensive", tags=["Comprehensive Analysis"])
 
+CHART_FIELDS = {
+    "d1": ("D1", "d1_rasi", "D1 - Rasi (Birth Chart)", "D1 Rasi"),
+    "d9": ("D9", "d9_navamsa", "D9 - Navamsa (Marriage/Spouse)", "D9 Navamsa"),
+    "d10": ("D10", "d10_dasamsa", "D10 - Dasamsa (Career)", "D10 Dasamsa")
+}
+
+def _analysis_sections(birth_data: Dict, ayanamsa: str, as_of: Optional[str], fields: List[str],
+                       ephemeris_calls: Dict[str, int]) -> List[Section]:
+    """
+    Calculation graph for the requested parts of the full analysis
+
+    The sections built on the D1 chart (charts, dashas, ashtakavarga) are
+    calculated as one "natal" pool task on a single calculator, so D1 is
+    evaluated once; yogas and doshas run as their own tasks alongside it.
+    Every result is cached under its single-purpose endpoint's key, and only
+    uncached ones are calculated. The current-period lookups are cheap and
+    run in the API process. Sections no requested field needs are not part
+    of the graph, so never calculated. PyJHora calls made are added to
+    `ephemeris_calls`.
+    """
+    async def run_calls(calls: Dict[str, Tuple[str, tuple, Dict]]) -> Dict[str, Tuple[bool, Any]]:
+        outcomes, made = await calculate_many(birth_data, ayanamsa, list(calls.values()))
+        for name, count in made.items():
+            ephemeris_calls[name] = ephemeris_calls.get(name, 0) + count
+        return dict(zip(calls, outcomes))
+
+    def unwrap(outcome: Tuple[bool, Any]) -> Any:
+        ok, value = outcome
+        if not ok:
+            raise ValueError(value)
+        return value
+
+    def natal(name: str):
+        async def run(done):
+            return unwrap(done["natal"][name])
+        return run
+
+    def pooled(name: str, method: str):
+        async def run(done):
+            return unwrap((await run_calls({name: (method, (), {})}))[name])
+        return run
+
+    async def current_dasha(done):
+        return PyJHoraCalculator.with_current_dasha(done["maha_dasha"], as_of)
+
+    async def current_bhukti(done):
+        return PyJHoraCalculator.with_current_bhukti(done["antardasha"], as_of)
+
+    def wanted(*names):
+        return any(name in fields for name in names)
+
+    natal_calls = {}
+    sections = []
+    chart_types = [CHART_FIELDS[field][0] for field in CHART_FIELDS if field in fields]
+    if chart_types:
+        natal_calls["charts"] = ("calculate_vargas", (chart_types,), {})
+    if wanted("maha_dasha", "current_dasha"):
+        # Maha Dasha periods, then the one running on as_of
+        natal_calls["maha_dasha"] = ("calculate_dasha_periods", ("VIMSOTTARI",), {})
+        sections.append(Section("current_dasha", current_dasha, requires=("maha_dasha",)))
+    if wanted("antardasha", "current_bhukti"):
+        # Antardasha (Bhukti) periods, then the one running on as_of
+        natal_calls["antardasha"] = ("calculate_bhukti_periods", ("VIMSOTTARI",), {})
+        sections.append(Section("current_bhukti", current_bhukti, requires=("antardasha",)))
+    if wanted("ashtakavarga"):
+        # Ashtakavarga (7 Bhinna + 1 Sarva)
+        natal_calls["ashtakavarga"] = ("calculate_ashtakavarga", (), {})
+    if natal_calls:
+        sections.append(Section("natal", lambda done: run_calls(natal_calls)))
+        sections.extend(Section(name, natal(name), requires=("natal",)) for name in natal_calls)
+    if wanted("present_yogas", "all_yogas"):
+        sections.append(Section("yogas", pooled("yogas", "calculate_yogas")))
+    if wanted("present_doshas", "all_doshas"):
+        sections.append(Section("doshas", pooled("doshas", "calculate_doshas")))
+    return sections
+
+def _raise_for_failure(failure):
+    """Report a request whose sections all failed like a single calculation would"""
+    error = failure.error
+    if isinstance(error, CalculationPoolError):
+        raise HTTPException(status_code=error.status_code, detail=str(error))
+    if isinstance(error, asyncio.TimeoutError):
+        raise HTTPException(status_code=504, detail=failure.reason)
+    raise HTTPException(status_code=400, detail=str(error) if error else failure.reason)
+
 @router.post("/full-analysis", responses={400: {"model": ErrorResponse}})
-async def get_full_analysis(request: ChartRequest):
+async def get_full_analysis(request: ComprehensiveRequest):
     """
     Get Complete Vedic Astrology Analysis in One Call
 
@@ -23,73 +112,80 @@ async def get_full_analysis(request: ChartRequest):
     - All Doshas (afflictions)
 
     This endpoint combines all major calculations into a single response.
+    Independent sections are calculated concurrently; a section that fails or
+    exceeds its time budget is left out (null), listed in `failed_sections`,
+    and the response is flagged `partial`.
+
+    `include` / `exclude` limit the analysis to some of its parts (e.g.
+    `"include": ["d1", "current_dasha"]`); parts that are not requested are
+    neither calculated nor returned.
     """
     try:
-        calculator = PyJHoraCalculator(
-            request.birth_data.dict(),
-            request.ayanamsa
-        )
-
-        # Calculate D1, D9, D10 charts
-        d1_chart = calculator.calculate_chart('D1')
-        d9_chart = calculator.calculate_chart('D9')
-        d10_chart = calculator.calculate_chart('D10')
-
-        # Calculate Maha Dasha
-        maha_dasha = calculator.calculate_dasha('VIMSOTTARI')
-
-        # Calculate Antardasha (Bhukti)
-        antardasha = calculator.calculate_dasha_bhukti('VIMSOTTARI')
-
-        # Calculate Ashtakavarga (7 Bhinna + 1 Sarva)
-        ashtakavarga = calculator.calculate_ashtakavarga()
-
-        # Calculate Yogas
-        yogas = calculator.calculate_yogas()
-
-        # Calculate Doshas
-        doshas = calculator.calculate_doshas()
+        birth_data = request.birth_data.dict()
+        fields = request.selected_fields()
+        ephemeris_calls = {}
+        graph = _analysis_sections(birth_data, request.ayanamsa, request.as_of, fields, ephemeris_calls)
+        sections, failures, timings = await run_sections(graph)
+        sections.pop("natal", None)
+        natal_failure = failures.pop("natal", None)
+        if natal_failure:
+            # "natal" is internal; the sections it calculates report its failure instead
+            for section in graph:
+                if section.requires == ("natal",):
+                    failures[section.name] = natal_failure
+        if not sections:
+            _raise_for_failure(next(iter(failures.values())))
+
+        charts = sections.get('charts')
+        maha_dasha, antardasha = sections.get('current_dasha'), sections.get('current_bhukti')
+        ashtakavarga, yogas, doshas = sections.get('ashtakavarga'), sections.get('yogas'), sections.get('doshas')
+        present_yogas = [y for y in yogas.get('yogas', []) if y.get('present', False)] if yogas else None
+        present_doshas = [d for d in doshas.get('doshas', []) if d.get('present', False)] if doshas else None
+        chart_fields = [field for field in CHART_FIELDS if field in fields]
 
         # Compile comprehensive response
         response = {
             "status": "success",
-            "birth_data": request.birth_data.dict(),
+            "birth_data": birth_data,
             "ayanamsa": request.ayanamsa,
+            "as_of": as_of_date(request.as_of).isoformat(),
+            "included": fields,
+            "partial": bool(failures),
+            "failed_sections": [failure.to_dict(name) for name, failure in failures.items()]
+        }
 
-            "charts": {
-                "d1_rasi": {
-                    "name": "D1 - Rasi (Birth Chart)",
-                    "ascendant": d1_chart['ascendant'],
-                    "planets": d1_chart['planets']
-                },
-                "d9_navamsa": {
-                    "name": "D9 - Navamsa (Marriage/Spouse)",
-                    "ascendant": d9_chart['ascendant'],
-                    "planets": d9_chart['planets']
-                },
-                "d10_dasamsa": {
-                    "name": "D10 - Dasamsa (Career)",
-                    "ascendant": d10_chart['ascendant'],
-                    "planets": d10_chart['planets']
+        if chart_fields:
+            response["charts"] = {
+                CHART_FIELDS[field][1]: {
+                    "name": CHART_FIELDS[field][2],
+                    "ascendant": charts[CHART_FIELDS[field][0]]['ascendant'],
+                    "planets": charts[CHART_FIELDS[field][0]]['planets']
                 }
-            },
-
-            "dashas": {
-                "maha_dasha": {
-                    "system": "Vimsottari",
-                    "moon_nakshatra": maha_dasha.get('moon_nakshatra'),
-                    "periods": maha_dasha.get('maha_dasha_periods', []),
-                    "current_period": maha_dasha.get('current_dasha')
-                },
-                "antardasha": {
-                    "system": "Vimsottari",
+                for field in chart_fields
+            } if charts else None
+
+        dashas = {}
+        if "maha_dasha" in fields or "current_dasha" in fields:
+            dashas["maha_dasha"] = {
+                "system": "Vimsottari",
+                "moon_nakshatra": maha_dasha.get('moon_nakshatra'),
+                **({"periods": maha_dasha.get('maha_dasha_periods', [])} if "maha_dasha" in fields else {}),
+                "current_period": maha_dasha.get('current_dasha')
+            } if maha_dasha else None
+        if "antardasha" in fields or "current_bhukti" in fields:
+            dashas["antardasha"] = {
+                "system": "Vimsottari",
+                **({
                     "total_periods": len(antardasha.get('bhukti_periods', [])),
-                    "periods": antardasha.get('bhukti_periods', []),
-                    "current_period": antardasha.get('current_bhukti')
-                }
-            },
-
-            "ashtakavarga": {
+                    "periods": antardasha.get('bhukti_periods', [])
+                } if "antardasha" in fields else {}),
+                "current_period": antardasha.get('current_bhukti')
+            } if antardasha else None
+        if dashas:
+            response["dashas"] = dashas
+
+        if "ashtakavarga" in fields:
+            response["ashtakavarga"] = {
                 "bhinna_ashtakavarga": {
                     "description": "7 Individual Planet Charts (Bindu strength by house)",
                     "planets": ashtakavarga.get('binna_ashtakavarga', {})
@@ -98,38 +194,52 @@ async def get_full_analysis(request: ChartRequest):
                     "description": "Combined Ashtakavarga (Total strength across all planets)",
                     "data": ashtakavarga.get('samudhaya_ashtakavarga', {})
                 }
-            },
+            } if ashtakavarga else None
 
-            "yogas": {
+        if "present_yogas" in fields or "all_yogas" in fields:
+            response["yogas"] = {
                 "total_analyzed": len(yogas.get('yogas', [])),
-                "total_present": sum(1 for y in yogas.get('yogas', []) if y.get('present', False)),
-                "present_yogas": [y for y in yogas.get('yogas', []) if y.get('present', False)],
-                "all_yogas": yogas.get('yogas', [])
-            },
+                "total_present": len(present_yogas),
+                **({"present_yogas": present_yogas} if "present_yogas" in fields else {}),
+                **({"all_yogas": yogas.get('yogas', [])} if "all_yogas" in fields else {})
+            } if yogas else None
 
-            "doshas": {
+        if "present_doshas" in fields or "all_doshas" in fields:
+            response["doshas"] = {
                 "total_analyzed": len(doshas.get('doshas', [])),
-                "total_present": sum(1 for d in doshas.get('doshas', []) if d.get('present', False)),
-                "present_doshas": [d for d in doshas.get('doshas', []) if d.get('present', False)],
-                "all_doshas": doshas.get('doshas', [])
-            },
-
-            "summary": {
-                "charts_calculated": ["D1 Rasi", "D9 Navamsa", "D10 Dasamsa"],
-                "maha_dasha_periods": len(maha_dasha.get('maha_dasha_periods', [])),
-                "antardasha_periods": len(antardasha.get('bhukti_periods', [])),
-                "bhinna_ashtakavarga_planets": 7,
-                "yogas_present": sum(1 for y in yogas.get('yogas', []) if y.get('present', False)),
-                "doshas_present": sum(1 for d in doshas.get('doshas', []) if d.get('present', False)),
-                "current_maha_dasha": maha_dasha.get('current_dasha', {}).get('lord') if maha_dasha.get('current_dasha') else None,
-                "strongest_planet_ashtakavarga": max(
-                    ashtakavarga.get('binna_ashtakavarga', {}).items(),
-                    key=lambda x: x[1].get('total', 0)
-                )[0] if ashtakavarga.get('binna_ashtakavarga') else None
-            }
-        }
+                "total_present": len(present_doshas),
+                **({"present_doshas": present_doshas} if "present_doshas" in fields else {}),
+                **({"all_doshas": doshas.get('doshas', [])} if "all_doshas" in fields else {})
+            } if doshas else None
+
+        summary = {"charts_calculated": [CHART_FIELDS[field][3] for field in chart_fields] if charts else []}
+        if "maha_dasha" in fields:
+            summary["maha_dasha_periods"] = len(maha_dasha.get('maha_dasha_periods', [])) if maha_dasha else None
+        if "antardasha" in fields:
+            summary["antardasha_periods"] = len(antardasha.get('bhukti_periods', [])) if antardasha else None
+        if "ashtakavarga" in fields:
+            summary["bhinna_ashtakavarga_planets"] = 7 if ashtakavarga else None
+        if "yogas" in sections or "yogas" in failures:
+            summary["yogas_present"] = len(present_yogas) if yogas else None
+        if "doshas" in sections or "doshas" in failures:
+            summary["doshas_present"] = len(present_doshas) if doshas else None
+        if "maha_dasha" in fields or "current_dasha" in fields:
+            summary["current_maha_dasha"] = maha_dasha.get('current_dasha', {}).get('lord') if maha_dasha and maha_dasha.get('current_dasha') else None
+        if "ashtakavarga" in fields:
+            summary["strongest_planet_ashtakavarga"] = max(
+                ashtakavarga.get('binna_ashtakavarga', {}).items(),
+                key=lambda x: x[1].get('total', 0)
+            )[0] if ashtakavarga and ashtakavarga.get('binna_ashtakavarga') else None
+        summary["ephemeris_calls"] = sum(ephemeris_calls.values())
+        summary["section_timings_ms"] = timings
+        summary["section_timeout_seconds"] = section_timeout()
+        response["summary"] = summary
 
         return response
 
+    except HTTPException:
+        raise
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
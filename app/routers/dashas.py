@@ -3,6 +3,7 @@
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import DashaRequest, DashaResponse, ErrorResponse
 from app.services.calculator import PyJHoraCalculator
+from app.services.executor import calculate, CalculationPoolError
 
 router = APIRouter(prefix="/api/v1/dashas", tags=["Dashas"])
 
@@ -14,12 +15,16 @@ async def calculate_vimsottari_dasha(request: DashaRequest):
     Returns Maha Dasha periods (120-year cycle) with current dasha information.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_dasha_periods", "VIMSOTTARI"
         )
-        result = calculator.calculate_dasha("VIMSOTTARI")
+        # The natal periods are cached; only the current-period lookup depends on the date
+        result = PyJHoraCalculator.with_current_dasha(result, request.as_of)
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -31,15 +36,18 @@ async def get_current_dasha(request: DashaRequest):
     Returns only the current Maha Dasha with elapsed and remaining time.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_dasha_periods", "VIMSOTTARI"
         )
-        result = calculator.calculate_dasha("VIMSOTTARI")
+        # The natal periods are cached; only the current-period lookup depends on the date
+        result = PyJHoraCalculator.with_current_dasha(result, request.as_of)
 
         if result.get("current_dasha"):
             return {
                 "status": "success",
+                "as_of": result["as_of"],
                 "current_dasha": result["current_dasha"],
                 "moon_nakshatra": result["moon_nakshatra"]
             }
@@ -48,6 +56,8 @@ async def get_current_dasha(request: DashaRequest):
                 "status": "success",
                 "message": "Current dasha period not found"
             }
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -60,11 +70,14 @@ async def calculate_dasha_bhukti(request: DashaRequest):
     Each Bhukti period shows which Maha Dasha it belongs to and its duration.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_bhukti_periods", "VIMSOTTARI"
         )
-        result = calculator.calculate_dasha_bhukti("VIMSOTTARI")
+        result = PyJHoraCalculator.with_current_bhukti(result, request.as_of)
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import ChartRequest, ErrorResponse
-from app.services.calculator import PyJHoraCalculator
+from app.services.executor import calculate, CalculationPoolError
 
 router = APIRouter(prefix="/api/v1/doshas", tags=["Doshas"])
 
@@ -24,11 +24,13 @@ async def calculate_doshas(request: ChartRequest):
     Returns whether each dosha is present and detailed description with remedies.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_doshas"
         )
-        result = calculator.calculate_doshas()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
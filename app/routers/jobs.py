@@ -0,0 +1,150 @@
+"""Background job endpoints for bulk calculations"""
+
+import asyncio
+import os
+import shutil
+from typing import Optional
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
+from app.models.schemas import ErrorResponse, validate_as_of, validate_chart_types
+from app.services import jobs
+from app.services.jobs import (
+    DEFAULT_JOB_CHUNK, OUTPUT_FORMATS, JobError, count_rows, detect_format, get_job_store, job_resource, require_format
+)
+from app.services.operations import OPERATIONS, operation_options, resolve_operations
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["Jobs"])
+
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+
+def _raise_for_job_error(e: JobError):
+    raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+@router.post("", status_code=202, responses={400: {"model": ErrorResponse}})
+async def submit_job(
+    file: UploadFile = File(..., description="CSV, JSONL or Parquet file with one birth per row"),
+    operations: str = Form("charts", description=f"Comma-separated operations: {', '.join(OPERATIONS)}"),
+    ayanamsa: str = Form("LAHIRI"),
+    chart_types: str = Form("D1", description="Comma-separated chart types for charts/varga_table, or 'all'"),
+    as_of: Optional[str] = Form(None, description="Date for current dasha/bhukti (YYYY-MM-DD), default today"),
+    output_format: str = Form("jsonl", description="jsonl or parquet"),
+    input_format: Optional[str] = Form(None, description="csv, jsonl or parquet (default: from the file name)")
+):
+    """
+    Submit a Bulk Calculation Job
+
+    Upload a file of births (columns/keys `date`, `time`, `latitude`, `longitude`,
+    `timezone_offset`, optional `place_name`; other columns are echoed back as
+    `fields`) and select the operations to run for every row.
+
+    The job is queued and processed in the background in checkpointed chunks.
+    Poll `GET /api/v1/jobs/{id}` for progress and download the results from
+    `GET /api/v1/jobs/{id}/results` once it completes.
+    """
+    try:
+        names = resolve_operations(operations.split(","))
+        types = validate_chart_types([chart_type.strip() for chart_type in chart_types.split(",")])
+        options = operation_options(chart_types=types, as_of=validate_as_of(as_of))
+        fmt = detect_format(file.filename, input_format)
+        if output_format not in OUTPUT_FORMATS:
+            raise JobError(f"Unsupported output format '{output_format}'; use {list(OUTPUT_FORMATS)}")
+        require_format(output_format)
+    except JobError as e:
+        _raise_for_job_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    store = get_job_store()
+    job_id = store.new_job_dir()
+    input_path = os.path.join(store.job_dir(job_id), f"input.{fmt}")
+    try:
+        with open(input_path, "wb") as f:
+            while block := await file.read(UPLOAD_BLOCK_SIZE):
+                await asyncio.to_thread(f.write, block)
+        total_rows = await asyncio.to_thread(count_rows, input_path, fmt)
+    except Exception as e:
+        shutil.rmtree(store.job_dir(job_id), ignore_errors=True)
+        raise HTTPException(status_code=400, detail=f"Could not read the uploaded {fmt} file - {e}")
+
+    chunk_size = int(os.getenv("PYJHORA_JOB_CHUNK", DEFAULT_JOB_CHUNK))
+    job = await asyncio.to_thread(
+        store.create, job_id, file.filename, fmt, output_format, total_rows, ayanamsa, names, options, chunk_size
+    )
+    if jobs.job_runner is not None:
+        jobs.job_runner.notify()
+    return job_resource(job)
+
+
+@router.get("")
+async def list_jobs(limit: int = 50):
+    """List the most recent jobs"""
+    store = get_job_store()
+    return {
+        "status": "success",
+        "jobs": [job_resource(job) for job in await asyncio.to_thread(store.list, limit)]
+    }
+
+
+@router.get("/{job_id}", responses={404: {"model": ErrorResponse}})
+async def get_job(job_id: str):
+    """Job status, progress and throughput (rows/sec), with links to the result parts"""
+    store = get_job_store()
+    try:
+        return job_resource(await asyncio.to_thread(store.get, job_id))
+    except JobError as e:
+        _raise_for_job_error(e)
+
+
+@router.get("/{job_id}/results", responses={404: {"model": ErrorResponse}})
+async def download_results(job_id: str):
+    """
+    Download All Results as JSONL
+
+    Streams the completed result parts in input order. Available for JSONL
+    jobs while they run (parts written so far) and after they complete.
+    Parquet jobs are downloaded part by part.
+    """
+    store = get_job_store()
+    try:
+        job = await asyncio.to_thread(store.get, job_id)
+    except JobError as e:
+        _raise_for_job_error(e)
+    if job["output_format"] != "jsonl":
+        raise HTTPException(status_code=400, detail="Parquet results are downloaded per part from /results/{part}")
+
+    def stream():
+        for part in range(job["next_chunk"]):
+            with open(store.part_path(job, part), "rb") as f:
+                yield from iter(lambda: f.read(UPLOAD_BLOCK_SIZE), b"")
+
+    return StreamingResponse(
+        stream(), media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.jsonl"'}
+    )
+
+
+@router.get("/{job_id}/results/{part}", responses={404: {"model": ErrorResponse}})
+async def download_result_part(job_id: str, part: int):
+    """Download one result part (one checkpointed chunk of rows)"""
+    store = get_job_store()
+    try:
+        job = await asyncio.to_thread(store.get, job_id)
+    except JobError as e:
+        _raise_for_job_error(e)
+    if not 0 <= part < job["next_chunk"]:
+        raise HTTPException(status_code=404, detail=f"Result part {part} of job {job_id} is not available")
+    path = store.part_path(job, part)
+    media_type = "application/x-ndjson" if job["output_format"] == "jsonl" else "application/vnd.apache.parquet"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+
+@router.delete("/{job_id}", responses={404: {"model": ErrorResponse}})
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; result parts written so far are kept"""
+    store = get_job_store()
+    try:
+        return job_resource(await asyncio.to_thread(store.cancel, job_id))
+    except JobError as e:
+        _raise_for_job_error(e)
@@ -1,8 +1,13 @@
 """Panchanga calculation endpoint"""
 
+import json
+import time
+from datetime import date
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import ChartRequest, ErrorResponse
-from app.services.calculator import PyJHoraCalculator
+from fastapi.responses import StreamingResponse
+from app.models.schemas import ChartRequest, PanchangaCalendarRequest, ErrorResponse
+from app.services.executor import calculate, CalculationPoolError
+from app.services.panchanga_calendar import calendar_months, iter_calendar
 
 router = APIRouter(prefix="/api/v1/panchanga", tags=["Panchanga"])
 
@@ -28,12 +33,14 @@ async def calculate_panchanga(request: ChartRequest):
     - Event planning
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_panchanga"
         )
-        result = calculator.calculate_panchanga()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -79,11 +86,86 @@ async def calculate_extended_panchanga(request: ChartRequest):
     **Note:** All times are in 24-hour format (HH:MM)
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_extended_panchanga"
         )
-        result = calculator.calculate_extended_panchanga()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/calendar", responses={400: {"model": ErrorResponse}})
+async def panchanga_calendar(request: PanchangaCalendarRequest):
+    """
+    Panchanga Calendar for a Date Range
+
+    Returns the Panchanga of every day from `start_date` to `end_date` for one
+    place: vara, sunrise, sunset and the next sunrise, and the tithi,
+    nakshatra, yoga and karana prevailing at sunrise with their end times.
+
+    Days run from sunrise to sunrise, so each sunrise is calculated once and
+    bounds two days. A whole month is calculated per pool task and cached,
+    so a yearly calendar is one request of twelve tasks.
+
+    By default the response is NDJSON: a header line, one line per day and a
+    closing summary line. With `stream: false` it is a single JSON document.
+    Days that cannot be calculated (e.g. no sunrise near the poles) carry an
+    `error` instead of the panchanga.
+
+    **Note:** End times are local, e.g. `14:30:46`, or `05:12:03 (+1)` when
+    they fall after midnight
+    """
+    start = time.perf_counter()
+    first, last = date.fromisoformat(request.start_date), date.fromisoformat(request.end_date)
+    location = (request.latitude, request.longitude, request.timezone_offset)
+    header = {
+        "status": "success",
+        "location": {
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "timezone_offset": request.timezone_offset,
+            "place_name": request.place_name
+        },
+        "start_date": request.start_date,
+        "end_date": request.end_date,
+        "ayanamsa": request.ayanamsa
+    }
+
+    def summary(days, errors):
+        return {
+            "total_days": days,
+            "errors": errors,
+            "calculation_info": {
+                "tasks": len(calendar_months(first, last)),
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+            }
+        }
+
+    if request.stream:
+        async def lines():
+            yield json.dumps({"type": "header", **header}) + "\n"
+            days = errors = 0
+            try:
+                async for month in iter_calendar(location, first, last, request.ayanamsa):
+                    for day in month:
+                        days += 1
+                        errors += "error" in day
+                        yield json.dumps({"type": "day", **day}) + "\n"
+            except CalculationPoolError as e:
+                yield json.dumps({"type": "error", "status_code": e.status_code, "detail": str(e)}) + "\n"
+                return
+            yield json.dumps({"type": "summary", **summary(days, errors)}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    try:
+        days = [day async for month in iter_calendar(location, first, last, request.ayanamsa) for day in month]
+        return {**header, "days": days, **summary(len(days), sum("error" in day for day in days))}
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import ChartRequest, ErrorResponse
-from app.services.calculator import PyJHoraCalculator
+from app.services.executor import calculate, CalculationPoolError
 
 router = APIRouter(prefix="/api/v1/special", tags=["Special Calculations"])
 
@@ -39,12 +39,14 @@ async def calculate_special_lagnas(request: ChartRequest):
     Returns sign, degree, and significance for each lagna.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_special_lagnas"
         )
-        result = calculator.calculate_special_lagnas()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -79,11 +81,13 @@ async def calculate_bhava_bala(request: ChartRequest):
     Higher strength = Better results from that house.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_bhava_bala"
         )
-        result = calculator.calculate_bhava_bala()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import ChartRequest, ErrorResponse
-from app.services.calculator import PyJHoraCalculator
+from app.services.executor import calculate, CalculationPoolError
 
 router = APIRouter(prefix="/api/v1/strength", tags=["Strength"])
 
@@ -24,12 +24,14 @@ async def calculate_ashtakavarga(request: ChartRequest):
     - Total bindus count (should be ~337)
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_ashtakavarga"
         )
-        result = calculator.calculate_ashtakavarga()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -50,12 +52,14 @@ async def calculate_shadbala(request: ChartRequest):
     Higher values indicate stronger planets that give better results.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_shadbala"
         )
-        result = calculator.calculate_shadbala()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -74,11 +78,13 @@ async def calculate_bhava_bala(request: ChartRequest):
     Stronger houses give better results in their significations.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_bhava_bala"
         )
-        result = calculator.calculate_bhava_bala()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
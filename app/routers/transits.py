@@ -1,8 +1,22 @@
 """Transit (Gochara) calculation endpoints"""
 
+import asyncio
+import time
+from datetime import datetime
+import numpy as np
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import ChartRequest, ErrorResponse
-from app.services.calculator import PyJHoraCalculator
+from fastapi.responses import JSONResponse, Response
+from app.models.schemas import (
+    ChartRequest, SadeSatiTimelineRequest, TransitEventRequest, TransitIngressRequest, TransitTimelineRequest, ErrorResponse
+)
+from app.services.calculator import NAKSHATRA_NAMES, PLANET_NAMES, SIGN_NAMES
+from app.services.ephemeris import (
+    COLUMN_DTYPES, calculate_timeline, encode_column, planet_indices, timeline_columns, timeline_csv, timeline_samples
+)
+from app.services.executor import calculate, CalculationPoolError
+from app.services.transit_events import (
+    COMBUSTION_ORBS, calculate_events, calculate_ingresses, event_kinds, ingress_divisions, local_times, utc_julian_day
+)
 
 router = APIRouter(prefix="/api/v1/transits", tags=["Transits"])
 
@@ -24,15 +38,18 @@ async def calculate_current_transits(request: ChartRequest):
     - Retrograde tracking
 
     **Note:** Pass current date/time in birth_data to get current transits.
-    For any date/time, use that date in birth_data field.
+    For any date/time, use that date in birth_data field. For when planets
+    turn retrograde or direct, or are combust, over a range, use `/events`.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_current_transits"
         )
-        result = calculator.calculate_current_transits()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -54,19 +71,54 @@ async def calculate_sade_sati(request: ChartRequest):
 
     Returns:
     - Current phase (if in Sade Sati)
+    - Exact start and end of the current Sade Sati (if in it)
     - Moon sign from birth chart
     - Current Saturn position
     - Whether native is in Sade Sati
 
     **Note:** Use birth data for natal Moon, current date for Saturn position.
+    For every period over a lifetime, use `/sade-sati/timeline`.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_sade_sati"
         )
-        result = calculator.calculate_sade_sati()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/sade-sati/timeline", responses={400: {"model": ErrorResponse}})
+async def calculate_sade_sati_timeline(request: SadeSatiTimelineRequest):
+    """
+    Every Sade Sati Period Over a Lifetime
+
+    Lists each Sade Sati from birth over `years` years (default 100), with
+    exact dates found from Saturn's sign ingresses rather than its average
+    2.5 years per sign. Add `include: ["ashtama", "kantaka"]` for Ashtama
+    Shani (8th from Moon) and Kantaka Shani (4th, 7th and 10th from Moon).
+
+    Returns for each period:
+    - Cycle number: a retrograde exit and re-entry splits one cycle into
+      several periods with the same number
+    - Start and end (local time of birth_data) and length in years
+    - Phases: Saturn's stay in each sign, with its start and end and
+      whether Saturn entered the sign moving backwards
+
+    A period already running at birth starts at its real (earlier) date.
+    """
+    try:
+        result = await calculate(
+            request.birth_data.dict(),
+            request.ayanamsa,
+            "calculate_sade_sati_timeline", years=request.years, include=tuple(request.include or ())
+        )
+        return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -84,23 +136,254 @@ async def calculate_next_planet_entries(request: ChartRequest):
     - Understanding upcoming influences
     - Transit forecasting
 
-    **Planets tracked:** Sun, Moon, Mars, Mercury, Jupiter, Venus, Saturn
-    (Rahu/Ketu move retrograde and are excluded)
+    **Planets tracked:** all 9, Sun to Ketu
 
     Returns for each entry:
     - Planet name
     - Entry date and time
     - Sign being entered
     - ISO datetime for sorting
+    - Whether the planet enters it moving backwards (retrograde re-entry,
+      and always for Rahu/Ketu)
 
-    **Note:** Calculates from the date/time provided in birth_data.
+    **Note:** Calculates from the date/time provided in birth_data. For
+    every ingress over a range, use `/ingresses`.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_next_planet_entries", num_entries=5
         )
-        result = calculator.calculate_next_planet_entries(num_entries=5)
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/timeline", responses={400: {"model": ErrorResponse}})
+async def calculate_transit_timeline(request: TransitTimelineRequest):
+    """
+    Planetary Positions over a Time Range
+
+    Samples the sidereal longitude and daily speed of each planet every
+    `step_minutes` from `start` to `end`, with the sign (1-12), nakshatra
+    (1-27), pada (1-4) and retrograde flag derived from them. Ten years at
+    daily resolution is one request.
+
+    Samples are read from the precomputed ephemeris store where it covers
+    the range (otherwise one Swiss Ephemeris call per sample and planet);
+    signs and nakshatras are derived for whole columns at once.
+    Chunks of samples run in parallel across the pool and are cached.
+
+    **Formats:**
+    - `json`: one list per column under `planets.<name>`, plus `times`;
+      `sign_names`/`nakshatra_names` translate the numbers
+    - `csv`: one row per sample and planet, with names
+    - `binary`: each column as base64 of its little-endian values
+      (`dtypes` gives them); sample i is at `start_jd_utc + i * step_days`
+
+    **Note:** Times are local to `timezone_offset` (default UTC). Rahu/Ketu
+    are the mean nodes, as elsewhere in this API.
+    """
+    started = time.perf_counter()
+    count = timeline_samples(request.start, request.end, request.step_minutes)
+    planets = planet_indices(request.planets)
+    start = datetime.fromisoformat(request.start)
+    step_days = request.step_minutes / 1440
+    start_jd_utc = utc_julian_day(request.start, request.timezone_offset)
+    try:
+        series, chunks = await calculate_timeline(start_jd_utc, step_days, count, planets, request.ayanamsa)
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def render() -> Response:
+        # Columns of up to timeline_max_samples() values per planet: built and serialized off the event loop
+        offsets = np.round(np.arange(count) * request.step_minutes * 60).astype(np.int64).astype("timedelta64[s]")
+        times = np.datetime_as_string(np.datetime64(start, "s") + offsets, unit="s")
+        if request.format == "csv":
+            return Response(timeline_csv(times, start_jd_utc + step_days * np.arange(count), series), media_type="text/csv")
+
+        result = {
+            "status": "success",
+            "start": request.start,
+            "end": request.end,
+            "step_minutes": request.step_minutes,
+            "timezone_offset": request.timezone_offset,
+            "ayanamsa": request.ayanamsa,
+            "samples": count,
+            "start_jd_utc": start_jd_utc,
+            "step_days": step_days,
+            "format": request.format,
+            "sign_names": SIGN_NAMES,
+            "nakshatra_names": NAKSHATRA_NAMES
+        }
+        if request.format == "binary":
+            result["dtypes"] = COLUMN_DTYPES
+        else:
+            result["times"] = times.tolist()
+        result["planets"] = {
+            PLANET_NAMES[planet]: {name: encode_column(name, values, request.format)
+                                   for name, values in timeline_columns(series[planet]).items()}
+            for planet in planets
+        }
+        result["calculation_info"] = {"tasks": chunks, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+        return JSONResponse(result)
+
+    return await asyncio.to_thread(render)
+
+@router.post("/ingresses", responses={400: {"model": ErrorResponse}})
+async def calculate_transit_ingresses(request: TransitIngressRequest):
+    """
+    Sign, Nakshatra and Pada Ingresses over a Time Range
+
+    Finds every time a planet enters a new sign (and, on request, nakshatra
+    or pada) between `start` and `end`, for all 9 planets by default. A
+    planet that turns retrograde back over a boundary re-enters the
+    previous sign; both crossings are listed, the backward one with
+    `retrograde: true`. A yearly calendar of all planets takes milliseconds.
+
+    Each planet's longitude is sampled on a grid fine enough that it cannot
+    pass two boundaries, or station twice, between samples; every change
+    between samples is then refined to a fraction of a second.
+
+    Returns for each ingress (earliest first, at most `limit`):
+    - Planet and division (sign, nakshatra or pada)
+    - Local time and Julian day (UTC)
+    - Division left and entered (padas as "Rohini 2")
+
+    **Note:** Times are local to `timezone_offset` (default UTC). Rahu/Ketu
+    are the mean nodes and always move backwards.
+    """
+    started = time.perf_counter()
+    planets = planet_indices(request.planets)
+    divisions = ingress_divisions(request.divisions)
+    start_jd_utc, end_jd_utc = (utc_julian_day(value, request.timezone_offset) for value in (request.start, request.end))
+    try:
+        events, tasks = await calculate_ingresses(start_jd_utc, end_jd_utc, planets, divisions, request.ayanamsa)
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    names = {
+        "sign": lambda number: SIGN_NAMES[number],
+        "nakshatra": lambda number: NAKSHATRA_NAMES[number],
+        "pada": lambda number: f"{NAKSHATRA_NAMES[number // 4]} {number % 4 + 1}"
+    }
+    counts = {"sign": 12, "nakshatra": 27, "pada": 108}
+
+    def render() -> JSONResponse:
+        # Up to `limit` (100000) ingresses: built and serialized off the event loop
+        returned = events[:request.limit]
+        times = local_times(np.array([event[0] for event in returned]), request.timezone_offset)
+        return JSONResponse({
+            "status": "success",
+            "start": request.start,
+            "end": request.end,
+            "timezone_offset": request.timezone_offset,
+            "ayanamsa": request.ayanamsa,
+            "planets": [PLANET_NAMES[planet] for planet in planets],
+            "divisions": list(divisions),
+            "total": len(events),
+            "truncated": len(events) > len(returned),
+            "ingresses": [
+                {
+                    "planet": PLANET_NAMES[planet],
+                    "division": division,
+                    "time": local_time,
+                    "jd_utc": round(jd_utc, 6),
+                    "from": names[division](before),
+                    "to": names[division](after),
+                    "retrograde": (after - before) % counts[division] != 1
+                }
+                for (jd_utc, planet, division, before, after), local_time in zip(returned, times.tolist())
+            ],
+            "calculation_info": {"tasks": tasks, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+        })
+
+    return await asyncio.to_thread(render)
+
+@router.post("/events", responses={400: {"model": ErrorResponse}})
+async def calculate_transit_events(request: TransitEventRequest):
+    """
+    Stations, Retrograde Periods and Combustion over a Time Range
+
+    Finds, for all 9 planets by default:
+    - **station**: each time a planet stands still and turns retrograde or
+      direct (Mars to Saturn; the Sun and Moon never station and the mean
+      Rahu/Ketu always move backwards)
+    - **retrograde**: each period between two stations
+    - **combustion**: each period a planet (Moon to Saturn) is within its
+      classical distance from the Sun, with the smaller orbs PyJHora uses
+      while it is retrograde (listed in `combustion_orbs`)
+
+    Speeds and distances are sampled on a grid that cannot miss a station
+    or a combustion period, then each change is refined to a fraction of a
+    second. Periods overlapping the range keep their real start and end,
+    even outside it.
+
+    **Note:** Times are local to `timezone_offset` (default UTC). To know
+    when Mercury next turns retrograde, search from now and take the
+    first Mercury station with `turns: "retrograde"`.
+    """
+    started = time.perf_counter()
+    planets = planet_indices(request.planets)
+    kinds = event_kinds(request.events)
+    start_jd_utc, end_jd_utc = (utc_julian_day(value, request.timezone_offset) for value in (request.start, request.end))
+    try:
+        stations, periods, tasks = await calculate_events(start_jd_utc, end_jd_utc, planets, request.ayanamsa)
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def render() -> JSONResponse:
+        # Built and serialized off the event loop, with the local times of all events converted at once
+        station_times = local_times(np.array([station[0] for station in stations]), request.timezone_offset).tolist()
+        period_times = local_times(np.array([period[2:] for period in periods]).reshape(-1, 2),
+                                   request.timezone_offset).tolist()
+        result = {
+            "status": "success",
+            "start": request.start,
+            "end": request.end,
+            "timezone_offset": request.timezone_offset,
+            "ayanamsa": request.ayanamsa,
+            "planets": [PLANET_NAMES[planet] for planet in planets],
+            "events": list(kinds)
+        }
+        if "station" in kinds:
+            result["stations"] = [
+                {
+                    "planet": PLANET_NAMES[planet],
+                    "time": local_time,
+                    "jd_utc": round(jd_utc, 6),
+                    "turns": "retrograde" if retrograde else "direct"
+                }
+                for (jd_utc, planet, retrograde), local_time in zip(stations, station_times)
+            ]
+        for kind in ("retrograde", "combustion"):
+            if kind in kinds:
+                result[kind] = [
+                    {
+                        "planet": PLANET_NAMES[planet],
+                        "start": local_start,
+                        "end": local_end,
+                        "start_jd_utc": round(period_start, 6),
+                        "end_jd_utc": round(period_end, 6),
+                        "days": round(period_end - period_start, 2)
+                    }
+                    for (period_kind, planet, period_start, period_end), (local_start, local_end)
+                    in zip(periods, period_times) if period_kind == kind
+                ]
+        if "combustion" in kinds:
+            result["combustion_orbs"] = {
+                PLANET_NAMES[planet]: dict(zip(("direct", "retrograde"), COMBUSTION_ORBS[planet]))
+                for planet in planets if planet in COMBUSTION_ORBS
+            }
+        result["calculation_info"] = {"tasks": tasks, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+        return JSONResponse(result)
+
+    return await asyncio.to_thread(render)
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import ChartRequest, ErrorResponse
-from app.services.calculator import PyJHoraCalculator
+from app.services.executor import calculate, CalculationPoolError
 
 router = APIRouter(prefix="/api/v1/yogas", tags=["Yogas"])
 
@@ -21,11 +21,13 @@ async def calculate_yogas(request: ChartRequest):
     Returns yoga name, description, effects, and which divisional chart it appears in.
     """
     try:
-        calculator = PyJHoraCalculator(
+        result = await calculate(
             request.birth_data.dict(),
-            request.ayanamsa
+            request.ayanamsa,
+            "calculate_yogas"
         )
-        result = calculator.calculate_yogas()
         return result
+    except CalculationPoolError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
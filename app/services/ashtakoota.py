@@ -0,0 +1,162 @@
+"""Precomputed Ashtakoota scores for every nakshatra-pada pair"""
+
+import logging
+import os
+import random
+import threading
+from importlib import metadata
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from jhora.horoscope.match import compatibility
+
+logger = logging.getLogger(__name__)
+
+# Bump when the table layout or the scoring inputs change; stale files are then rebuilt
+ASHTAKOOTA_TABLE_VERSION = 1
+DEFAULT_TABLE_PATH = f"/tmp/pyjhora-ashtakoota-v{ASHTAKOOTA_TABLE_VERSION}.npz"
+DEFAULT_VERIFY_PAIRS = 256
+
+try:
+    PYJHORA_VERSION = metadata.version("PyJHora")
+except metadata.PackageNotFoundError:
+    PYJHORA_VERSION = "unknown"
+
+# Ashtakoota kootas in scoring order, with the PyJHora method that scores each
+ASHTAKOOTA_KOOTAS = [
+    ("varna", "varna_porutham"), ("vasiya", "vasiya_porutham"), ("tara", "tara_porutham"),
+    ("yoni", "yoni_porutham"), ("graha_maitri", "maitri_porutham"), ("gana", "gana_porutham"),
+    ("rasi", "raasi_porutham"), ("nadi", "naadi_porutham")
+]
+
+NAKSHATRA_PADAS = 27 * 4
+
+
+def pair_index(nakshatra: int, pada: int) -> int:
+    """Row/column of a nakshatra (1-27) and pada (1-4) in the table"""
+    return (nakshatra - 1) * 4 + (pada - 1)
+
+
+def pyjhora_scores(boy_nakshatra: int, boy_pada: int, girl_nakshatra: int, girl_pada: int) -> List[Tuple[float, float]]:
+    """(score, max) of each koota, calculated by PyJHora"""
+    ashtakoota = compatibility.Ashtakoota(boy_nakshatra, boy_pada, girl_nakshatra, girl_pada, method="North")
+    return [getattr(ashtakoota, method)() for _, method in ASHTAKOOTA_KOOTAS]
+
+
+class AshtakootaTable:
+    """
+    Koota scores for all 108 x 108 (boy, girl) nakshatra-pada pairs
+
+    Every koota score is a multiple of 0.5, so `half_points[boy, girl, koota]`
+    holds twice the score as uint8 (about 93KB in total). Lookups return the
+    same values as scoring the pair with PyJHora.
+    """
+
+    def __init__(self, half_points: np.ndarray, maxima: np.ndarray, source: str = "built"):
+        if half_points.shape != (NAKSHATRA_PADAS, NAKSHATRA_PADAS, len(ASHTAKOOTA_KOOTAS)):
+            raise ValueError(f"Unexpected Ashtakoota table shape {half_points.shape}")
+        self.half_points = half_points
+        self.maxima = maxima
+        self.total_half_points = half_points.sum(axis=2, dtype=np.uint8)
+        self.totals = self.total_half_points / 2
+        self.source = source
+
+    @classmethod
+    def build(cls) -> "AshtakootaTable":
+        """Score every pair with PyJHora (about 0.2s)"""
+        half_points = np.zeros((NAKSHATRA_PADAS, NAKSHATRA_PADAS, len(ASHTAKOOTA_KOOTAS)), dtype=np.uint8)
+        maxima = None
+        for boy in range(NAKSHATRA_PADAS):
+            for girl in range(NAKSHATRA_PADAS):
+                scores = pyjhora_scores(boy // 4 + 1, boy % 4 + 1, girl // 4 + 1, girl % 4 + 1)
+                half_points[boy, girl] = [round(score * 2) for score, _ in scores]
+                maxima = [maximum for _, maximum in scores]
+        return cls(half_points, np.array(maxima, dtype=np.float64))
+
+    @classmethod
+    def load(cls, path: str) -> Optional["AshtakootaTable"]:
+        """Table saved by `save`, or None if missing or built for another version"""
+        try:
+            with np.load(path) as data:
+                if (int(data["table_version"]) != ASHTAKOOTA_TABLE_VERSION
+                        or str(data["pyjhora_version"]) != PYJHORA_VERSION):
+                    return None
+                return cls(data["half_points"], data["maxima"], source="loaded")
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, path: str):
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            tmp, half_points=self.half_points, maxima=self.maxima,
+            table_version=ASHTAKOOTA_TABLE_VERSION, pyjhora_version=PYJHORA_VERSION
+        )
+        os.replace(tmp, path)
+
+    def verify(self, pairs: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Compare the table with PyJHora for `pairs` random pairs (all pairs if None)
+
+        Returns the (boy, girl) table indices that disagree.
+        """
+        every = [(boy, girl) for boy in range(NAKSHATRA_PADAS) for girl in range(NAKSHATRA_PADAS)]
+        checked = every if pairs is None or pairs >= len(every) else random.sample(every, pairs)
+        mismatches = []
+        for boy, girl in checked:
+            scores = pyjhora_scores(boy // 4 + 1, boy % 4 + 1, girl // 4 + 1, girl % 4 + 1)
+            if ([score * 2 for score, _ in scores] != self.half_points[boy, girl].tolist()
+                    or [maximum for _, maximum in scores] != self.maxima.tolist()):
+                mismatches.append((boy, girl))
+        return mismatches
+
+    def pair_scores(self, boy: Tuple[int, int], girl: Tuple[int, int]) -> Tuple[Dict, float]:
+        """Koota scores and total for a boy/girl (nakshatra, pada) pair"""
+        return self.scores_at(pair_index(*boy), pair_index(*girl))
+
+    def scores_at(self, boy_index: int, girl_index: int) -> Tuple[Dict, float]:
+        """Koota scores and total for table indices"""
+        half_points = self.half_points[boy_index, girl_index]
+        scores = {
+            koota: {"score": float(half_points[i]) / 2, "max": float(self.maxima[i])}
+            for i, (koota, _) in enumerate(ASHTAKOOTA_KOOTAS)
+        }
+        return scores, float(self.totals[boy_index, girl_index])
+
+    def info(self) -> Dict:
+        return {
+            "version": ASHTAKOOTA_TABLE_VERSION,
+            "pyjhora_version": PYJHORA_VERSION,
+            "source": self.source,
+            "bytes": int(self.half_points.nbytes)
+        }
+
+
+_table: Optional[AshtakootaTable] = None
+_table_lock = threading.Lock()
+
+
+def ashtakoota_table() -> AshtakootaTable:
+    """
+    Table for this process, created on first use
+
+    A table saved by another worker (PYJHORA_ASHTAKOOTA_TABLE) is reused if
+    its version matches and a sample of PYJHORA_ASHTAKOOTA_VERIFY pairs
+    agrees with PyJHora; otherwise the table is rebuilt and saved.
+    """
+    global _table
+    with _table_lock:
+        if _table is None:
+            path = os.getenv("PYJHORA_ASHTAKOOTA_TABLE", DEFAULT_TABLE_PATH)
+            sample = int(os.getenv("PYJHORA_ASHTAKOOTA_VERIFY", DEFAULT_VERIFY_PAIRS))
+            table = AshtakootaTable.load(path)
+            if table is not None and table.verify(sample):
+                logger.warning("Ashtakoota table %s disagrees with PyJHora, rebuilding", path)
+                table = None
+            if table is None:
+                table = AshtakootaTable.build()
+                try:
+                    table.save(path)
+                except OSError as e:
+                    logger.warning("Could not save the Ashtakoota table to %s: %s", path, e)
+            _table = table
+        return _table
@@ -0,0 +1,89 @@
+"""Isolation of PyJHora's process-global ayanamsa (sidereal) mode"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+import swisseph as swe
+from jhora import const
+from jhora.panchanga import drik
+from jhora.horoscope.chart import charts
+
+# charts.rasi_chart() re-applies the ayanamsa captured as its default argument at import
+# time on every call, so only this mode is left untouched by PyJHora's internal resets.
+LIBRARY_AYANAMSA = charts.rasi_chart.__defaults__[0]
+
+
+def select_ayanamsa(ayanamsa: str) -> bool:
+    """
+    Make `ayanamsa` the active mode for subsequent PyJHora calls
+
+    PyJHora's mode is only re-set when it actually differs from the requested
+    one. Returns True if a switch happened.
+    """
+    switched = const._DEFAULT_AYANAMSA_MODE != ayanamsa or drik._ayanamsa_mode != ayanamsa
+    if switched:
+        drik.set_ayanamsa_mode(ayanamsa)
+    # PyJHora resets the Swiss Ephemeris mode after every call, so this one is always applied
+    swe.set_sid_mode(getattr(swe, f'SIDM_{ayanamsa}', swe.SIDM_LAHIRI))
+    return switched
+
+
+class AyanamsaGuard:
+    """
+    Serialises calculations that need different ayanamsa modes within one process
+
+    Calculations in LIBRARY_AYANAMSA share the mode and may run concurrently.
+    Any other mode is switched back to LIBRARY_AYANAMSA by PyJHora mid-calculation,
+    so those calculations run exclusively.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._active = 0
+        self._active_mode = None
+        self._exclusive_waiting = 0
+        self.switches = 0
+        self.waits = 0
+
+    def _can_enter(self, ayanamsa: str) -> bool:
+        if self._active == 0:
+            return True
+        # Join running calculations only in the shared mode, and not ahead of a queued switch
+        return (ayanamsa == LIBRARY_AYANAMSA and self._active_mode == ayanamsa
+                and self._exclusive_waiting == 0)
+
+    @contextmanager
+    def use(self, ayanamsa: str):
+        """Hold `ayanamsa` as the active mode for the duration of the block"""
+        exclusive = ayanamsa != LIBRARY_AYANAMSA
+        with self._condition:
+            if not self._can_enter(ayanamsa):
+                self.waits += 1
+                self._exclusive_waiting += exclusive
+                while not self._can_enter(ayanamsa):
+                    self._condition.wait()
+                self._exclusive_waiting -= exclusive
+            self._active += 1
+            self._active_mode = ayanamsa
+            if select_ayanamsa(ayanamsa):
+                self.switches += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        """Current mode and switch counters"""
+        with self._condition:
+            return {
+                "active_mode": self._active_mode,
+                "active_calculations": self._active,
+                "mode_switches": self.switches,
+                "waits": self.waits
+            }
+
+
+ayanamsa_guard = AyanamsaGuard()
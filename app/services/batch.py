@@ -0,0 +1,122 @@
+"""Batch calculations over many births"""
+
+import asyncio
+import os
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models.schemas import BirthData
+from app.services.cache import CacheBackend, result_cache, request_cache_status
+from app.services.executor import (
+    calculation_pool, calculation_key, fan_out_slots, invoke_calculator_batch, CalculationPoolError,
+    PoolSaturatedError
+)
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_BATCH_LIMIT = 500
+DEFAULT_BATCH_CHUNK = 25
+SATURATED_RETRY_SECONDS = 0.5
+
+
+def batch_limit() -> int:
+    """Largest number of births accepted in one batch request"""
+    return int(os.getenv("PYJHORA_BATCH_LIMIT", DEFAULT_BATCH_LIMIT))
+
+
+def batch_chunk_size() -> int:
+    """Births calculated per pool task"""
+    return int(os.getenv("PYJHORA_BATCH_CHUNK", DEFAULT_BATCH_CHUNK))
+
+
+def validate_birth_data(item: Any) -> Tuple[Optional[Dict], Optional[str]]:
+    """Return (birth data, None) for a valid record, or (None, error message)"""
+    try:
+        return BirthData(**item).dict(), None
+    except (ValidationError, TypeError) as e:
+        if isinstance(e, ValidationError):
+            details = "; ".join(f"{'.'.join(str(p) for p in error['loc'])}: {error['msg']}" for error in e.errors())
+        else:
+            details = "expected an object"
+        return None, f"Invalid birth data - {details}"
+
+
+async def run_chunked(items: List[Any], fn: Callable, *args, chunk_size: Optional[int] = None,
+                      on_error: Callable[[str], Any], wait_when_saturated: bool = False,
+                      max_in_flight: Optional[int] = None) -> List[Any]:
+    """
+    Run `fn(chunk, *args)` over `items` in pool-sized chunks, results in input order
+
+    `fn` must return one result per item of its chunk. Chunks take the
+    fan-out slots shared by all requests, so concurrent large runs cannot
+    starve interactive requests out of the queue; `max_in_flight` further
+    caps the chunks of this run within them. A chunk the pool
+    could not run, or that found no free slot within the pool timeout,
+    yields `on_error(message)` for each of its items; with
+    `wait_when_saturated` a full queue or busy slots are waited out instead.
+    """
+    chunk_size = chunk_size or batch_chunk_size()
+    chunks = [list(range(start, min(start + chunk_size, len(items)))) for start in range(0, len(items), chunk_size)]
+    results: List[Any] = [None] * len(items)
+    slots = fan_out_slots()
+    own_slots = asyncio.Semaphore(max_in_flight) if max_in_flight else nullcontext()
+
+    async def run_chunk(indices: List[int]):
+        async with own_slots:
+            while True:
+                try:
+                    async with slots:
+                        outcomes = await calculation_pool.submit(fn, [items[i] for i in indices], *args)
+                    break
+                except PoolSaturatedError as e:
+                    if not wait_when_saturated:
+                        outcomes = [on_error(str(e))] * len(indices)
+                        break
+                    await asyncio.sleep(SATURATED_RETRY_SECONDS)
+                except CalculationPoolError as e:
+                    outcomes = [on_error(str(e))] * len(indices)
+                    break
+        for index, outcome in zip(indices, outcomes):
+            results[index] = outcome
+
+    await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+    return results
+
+
+async def run_batch(births: List[Dict], ayanamsa: str, method: str, *args,
+                    chunk_size: Optional[int] = None,
+                    cache: Optional[CacheBackend] = None) -> Tuple[List[Tuple[bool, Any]], Dict]:
+    """
+    Run `PyJHoraCalculator(birth, ayanamsa).<method>(*args)` for every birth
+
+    Cached results (in `cache`, default the result cache) are used where
+    available and the rest is calculated in chunks across the pool.
+    Returns (True, result) or (False, error) per birth in input order,
+    plus counters for the batch.
+    """
+    chunk_size = chunk_size or batch_chunk_size()
+    cache = result_cache if cache is None else cache
+    status = request_cache_status.get()
+    bypass = status is not None and status.bypass
+
+    outcomes: List[Optional[Tuple[bool, Any]]] = [None] * len(births)
+    keys = [calculation_key(birth, ayanamsa, method, args) for birth in births]
+    pending = []
+    cached = [(False, None)] * len(keys) if bypass else await cache.aget_many(keys)
+    for index, (found, value) in enumerate(cached):
+        if found:
+            outcomes[index] = (True, value)
+        else:
+            pending.append(index)
+
+    calculated = await run_chunked(
+        [births[i] for i in pending], invoke_calculator_batch, ayanamsa, method, args, None,
+        chunk_size=chunk_size, on_error=lambda message: (False, message)
+    )
+    for index, (ok, value) in zip(pending, calculated):
+        outcomes[index] = (ok, value)
+    await cache.aset_many([(keys[index], value) for index, (ok, value) in zip(pending, calculated) if ok])
+
+    chunks = (len(pending) + chunk_size - 1) // chunk_size
+    return outcomes, {"cached": len(births) - len(pending), "calculated": len(pending), "chunks": chunks}
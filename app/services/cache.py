@@ -0,0 +1,525 @@
+"""Content-addressed cache for calculation results"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import redis
+except ImportError:  # optional, only needed for PYJHORA_CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_CACHE_TTL = 86400.0
+DEFAULT_CACHE_BACKEND = "memory"
+DEFAULT_SHARED_CACHE_SIZE = 100000
+DEFAULT_NAKSHATRA_CACHE_SIZE = 100000
+DEFAULT_SQLITE_PATH = "/tmp/pyjhora-cache.sqlite3"
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+
+# Bump when the shape of cached results changes so old entries are never served
+CACHE_SCHEMA_VERSION = 2
+
+try:
+    PYJHORA_VERSION = version("PyJHora")
+except PackageNotFoundError:
+    PYJHORA_VERSION = "unknown"
+
+BYPASS_HEADER = "X-Cache-Bypass"
+STATUS_HEADER = "X-Cache"
+
+
+def canonical_birth_data(birth_data: Dict) -> Dict:
+    """
+    Normalized birth data fields that affect a calculation
+
+    Equivalent spellings ("1998-12-2" / "1998-12-02", 13 / 13.0) map to the
+    same value. place_name is left out since it is only echoed back.
+    """
+    moment = datetime.strptime(f"{birth_data['date']} {birth_data['time']}", "%Y-%m-%d %H:%M:%S")
+    return {
+        "date": moment.strftime("%Y-%m-%d"),
+        "time": moment.strftime("%H:%M:%S"),
+        "timezone_offset": float(birth_data['timezone_offset']),
+        "latitude": float(birth_data['latitude']),
+        "longitude": float(birth_data['longitude'])
+    }
+
+
+def cache_key(operation: str, *parts) -> str:
+    """Stable hash of an operation name and its (JSON-serializable) inputs"""
+    payload = json.dumps(
+        [CACHE_SCHEMA_VERSION, PYJHORA_VERSION, operation, parts],
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CacheBackend(ABC):
+    """
+    Interface for result cache stores
+
+    Values are stored as copies (pickled): a value returned by get() can be
+    changed by its caller without affecting the cached entry.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for `key`"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store `value` under `key`, expiring after `ttl` seconds"""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry"""
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """Size and hit/miss counters"""
+
+    def get_many(self, keys: List[str]) -> List[Tuple[bool, Any]]:
+        """(found, value) for each of `keys`"""
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items: List[Tuple[str, Any]], ttl: Optional[float] = None):
+        """Store each (key, value) of `items`"""
+        for key, value in items:
+            self.set(key, value, ttl)
+
+    async def aget_many(self, keys: List[str]) -> List[Tuple[bool, Any]]:
+        """get_many() in a thread, so a slow or locked store never blocks the event loop"""
+        return await asyncio.to_thread(self.get_many, keys) if keys else []
+
+    async def aset_many(self, items: List[Tuple[str, Any]], ttl: Optional[float] = None):
+        """set_many() in a thread, so a slow or locked store never blocks the event loop"""
+        if items:
+            await asyncio.to_thread(self.set_many, items, ttl)
+
+    async def aget(self, key: str) -> Tuple[bool, Any]:
+        """get() without blocking the event loop"""
+        return (await self.aget_many([key]))[0]
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        """set() without blocking the event loop"""
+        await self.aset_many([(key, value)], ttl)
+
+
+class LRUCache(CacheBackend):
+    """
+    In-process least-recently-used cache with per-entry expiry
+
+    Holds at most `maxsize` entries and `maxbytes` of pickled values; a
+    `maxsize` of 0 disables caching, and a value larger than `maxbytes` is
+    not kept. Values are kept pickled, like in the shared stores, so no two
+    callers ever share (and can corrupt) one cached object.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None, maxbytes: Optional[int] = None):
+        self.maxsize = maxsize if maxsize is not None else int(os.getenv("PYJHORA_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+        self.ttl = ttl if ttl is not None else float(os.getenv("PYJHORA_CACHE_TTL", DEFAULT_CACHE_TTL))
+        self.maxbytes = maxbytes if maxbytes is not None else int(os.getenv("PYJHORA_CACHE_BYTES", DEFAULT_CACHE_BYTES))
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= len(entry[1])
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return True, pickle.loads(entry[1])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            if len(payload) > self.maxbytes:
+                return
+            self._entries[key] = (expires, payload)
+            self._bytes += len(payload)
+            while len(self._entries) > self.maxsize or self._bytes > self.maxbytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    async def aget_many(self, keys: List[str]) -> List[Tuple[bool, Any]]:
+        return self.get_many(keys)
+
+    async def aset_many(self, items: List[Tuple[str, Any]], ttl: Optional[float] = None):
+        self.set_many(items, ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.maxsize,
+                "bytes": self._bytes,
+                "max_bytes": self.maxbytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "pyjhora_version": PYJHORA_VERSION
+            }
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a local SQLite file, shared by every process on the host
+
+    Lets all gunicorn workers in a container see each other's results and
+    keeps them across worker restarts. Values are pickled; the file is
+    private to this service. At most `maxsize` entries are kept, dropping the
+    least recently used ones. The entry count in stats() is kept in
+    memory and recounted when the file is pruned, so it is approximate
+    when other processes write too.
+    """
+
+    PRUNE_EVERY = 100
+    # Keys looked up per SELECT in get_many (below SQLite's limit on bound parameters)
+    SELECT_BATCH = 500
+
+    def __init__(self, path: Optional[str] = None, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        self.path = path or os.getenv("PYJHORA_CACHE_PATH", DEFAULT_SQLITE_PATH)
+        self.maxsize = maxsize if maxsize is not None else int(os.getenv("PYJHORA_SHARED_CACHE_SIZE", DEFAULT_SHARED_CACHE_SIZE))
+        self.ttl = ttl if ttl is not None else float(os.getenv("PYJHORA_CACHE_TTL", DEFAULT_CACHE_TTL))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self._entries = db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers and a writer in other processes overlap"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: List[str]) -> List[Tuple[bool, Any]]:
+        now = time.time()
+        db = self._connection()
+        rows = {}
+        for start in range(0, len(keys), self.SELECT_BATCH):
+            batch = keys[start:start + self.SELECT_BATCH]
+            rows.update(db.execute(
+                f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(batch))}) AND expires > ?",
+                (*batch, now)
+            ).fetchall())
+        with self._lock:
+            self.hits += len(rows)
+            self.misses += len(keys) - len(rows)
+        if rows:
+            db.executemany("UPDATE results SET accessed = ? WHERE key = ?", [(now, key) for key in rows])
+        return [(True, pickle.loads(rows[key])) if key in rows else (False, None) for key in keys]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.set_many([(key, value)], ttl)
+
+    def set_many(self, items: List[Tuple[str, Any]], ttl: Optional[float] = None):
+        if self.maxsize <= 0 or not items:
+            return
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        db = self._connection()
+        with db:
+            db.execute("BEGIN")
+            db.executemany(
+                "INSERT OR REPLACE INTO results (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires, now) for key, value in items]
+            )
+        with self._lock:
+            prune = self._writes // self.PRUNE_EVERY != (self._writes + len(items)) // self.PRUNE_EVERY
+            self._writes += len(items)
+            self._entries += len(items)
+        if prune:
+            self._prune(db, now)
+
+    def _prune(self, db: sqlite3.Connection, now: float):
+        """Drop expired entries, then the least recently used beyond maxsize, and recount the rest"""
+        db.execute("DELETE FROM results WHERE expires <= ?", (now,))
+        db.execute(
+            "DELETE FROM results WHERE key IN "
+            "(SELECT key FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,)
+        )
+        entries = db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        with self._lock:
+            self._entries = entries
+
+    def clear(self):
+        self._connection().execute("DELETE FROM results")
+        with self._lock:
+            self._entries = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "entries": self._entries,
+                "max_entries": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache stored in Redis (or any server speaking its protocol), shared across hosts
+
+    `client` may be any object with Redis' get/set/delete/scan_iter methods,
+    which lets tests run against a local stand-in. Values are pickled.
+    """
+
+    def __init__(self, client=None, url: Optional[str] = None, ttl: Optional[float] = None,
+                 prefix: str = "pyjhora:result:"):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("PYJHORA_CACHE_BACKEND=redis requires the 'redis' package")
+            client = redis.Redis.from_url(url or os.getenv("PYJHORA_CACHE_REDIS_URL", DEFAULT_REDIS_URL))
+        self.client = client
+        self.ttl = ttl if ttl is not None else float(os.getenv("PYJHORA_CACHE_TTL", DEFAULT_CACHE_TTL))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        payload = self.client.get(self.prefix + key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+        return True, pickle.loads(payload)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        seconds = max(1, int(self.ttl if ttl is None else ttl))
+        self.client.set(self.prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=seconds)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "redis",
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+class TieredCache(CacheBackend):
+    """
+    In-process LRU (L1) in front of a shared store (L2)
+
+    L2 hits are copied into L1. L2 failures are logged and treated as misses
+    so an unavailable shared store never fails a calculation.
+    """
+
+    def __init__(self, l1: LRUCache, l2: CacheBackend):
+        self.l1 = l1
+        self.l2 = l2
+        self._lock = threading.Lock()
+        self.l2_errors = 0
+
+    def _l2_failed(self, operation: str, error: Exception):
+        with self._lock:
+            self.l2_errors += 1
+        logger.warning("Shared result cache %s failed: %s", operation, error)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        found, value = self.l1.get(key)
+        if found:
+            return found, value
+        try:
+            found, value = self.l2.get(key)
+        except Exception as e:
+            self._l2_failed("read", e)
+            return False, None
+        if found:
+            self.l1.set(key, value)
+        return found, value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.l1.set(key, value, ttl)
+        try:
+            self.l2.set(key, value, ttl)
+        except Exception as e:
+            self._l2_failed("write", e)
+
+    async def aget_many(self, keys: List[str]) -> List[Tuple[bool, Any]]:
+        # L1 is read in place; only its misses go to the shared store, in one call on a thread
+        results = self.l1.get_many(keys)
+        missing = [i for i, (found, _) in enumerate(results) if not found]
+        if not missing:
+            return results
+        try:
+            fetched = await asyncio.to_thread(self.l2.get_many, [keys[i] for i in missing])
+        except Exception as e:
+            self._l2_failed("read", e)
+            return results
+        for i, (found, value) in zip(missing, fetched):
+            if found:
+                self.l1.set(keys[i], value)
+                results[i] = (True, value)
+        return results
+
+    def set_many(self, items: List[Tuple[str, Any]], ttl: Optional[float] = None):
+        self.l1.set_many(items, ttl)
+        try:
+            self.l2.set_many(items, ttl)
+        except Exception as e:
+            self._l2_failed("write", e)
+
+    def clear(self):
+        self.l1.clear()
+        try:
+            self.l2.clear()
+        except Exception as e:
+            self._l2_failed("clear", e)
+
+    def stats(self) -> Dict:
+        l1 = self.l1.stats()
+        try:
+            l2 = self.l2.stats()
+        except Exception as e:
+            l2 = {"error": str(e)}
+        hits = l1["hits"] + l2.get("hits", 0)
+        lookups = l1["hits"] + l1["misses"]
+        return {
+            "backend": f"memory+{l2.get('backend', 'shared')}",
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "l2_errors": self.l2_errors,
+            "pyjhora_version": PYJHORA_VERSION,
+            "l1": l1,
+            "l2": l2
+        }
+
+
+def build_result_cache(backend: Optional[str] = None) -> CacheBackend:
+    """Create the result cache selected by PYJHORA_CACHE_BACKEND (memory, sqlite or redis)"""
+    backend = backend or os.getenv("PYJHORA_CACHE_BACKEND", DEFAULT_CACHE_BACKEND)
+    if backend == "memory":
+        return LRUCache()
+    if backend == "sqlite":
+        return TieredCache(LRUCache(), SQLiteCache())
+    if backend == "redis":
+        return TieredCache(LRUCache(), RedisCache())
+    raise ValueError(f"Unsupported cache backend: {backend}")
+
+
+def build_nakshatra_cache(results: CacheBackend) -> CacheBackend:
+    """
+    Cache for the janma nakshatras of compatibility match candidates
+
+    Entries are tiny but a single search can bring tens of thousands of
+    them, so they get their own, larger LRU in front of the result
+    cache's shared store (if any).
+    """
+    l1 = LRUCache(maxsize=int(os.getenv("PYJHORA_NAKSHATRA_CACHE_SIZE", DEFAULT_NAKSHATRA_CACHE_SIZE)))
+    if isinstance(results, TieredCache):
+        return TieredCache(l1, results.l2)
+    return l1
+
+
+class CacheStatus:
+    """Per-request cache outcome, shared between the middleware and the dispatcher"""
+
+    def __init__(self, bypass: bool = False):
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def header(self) -> Optional[str]:
+        """Value for the X-Cache response header, None if nothing was looked up"""
+        if self.bypass:
+            return "BYPASS"
+        if self.misses:
+            return "MISS"
+        if self.coalesced:
+            return "COALESCED"
+        if self.hits:
+            return "HIT"
+        return None
+
+
+# Set by the HTTP middleware for each request; calls outside a request use the cache normally
+request_cache_status: ContextVar[Optional[CacheStatus]] = ContextVar("request_cache_status", default=None)
+
+
+def bypass_requested(headers) -> bool:
+    """True if the request asks for a freshly computed result"""
+    if headers.get(BYPASS_HEADER, "").strip().lower() in ("1", "true", "yes"):
+        return True
+    return "no-cache" in headers.get("Cache-Control", "").lower()
+
+
+result_cache = build_result_cache()
+nakshatra_cache = build_nakshatra_cache(result_cache)
@@ -1,14 +1,19 @@
 """PyJHora calculation service"""
 
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 import swisseph as swe
 from jhora.panchanga import drik
 from jhora.horoscope.chart import charts
 from jhora.horoscope.dhasa.graha import vimsottari
 from jhora.horoscope.chart import yoga, dosha, ashtakavarga, strength
-from jhora.horoscope.match import compatibility
 from jhora import utils
+from app.services.ayanamsa import select_ayanamsa
+from app.services.ashtakoota import ashtakoota_table
+from app.services.day_timetable import clock, clock_range, day_timetable
+from app.services.ephemeris_store import sidereal_position
+from app.services.panchanga_kernel import PanchangaKernel
+from app.services.transit_events import local_times, next_ingress, planet_ingresses
 
 # Constants
 PLANET_NAMES = {
@@ -24,7 +29,7 @@ SIGN_NAMES = [
 CHART_FACTORS = {
     "D1": 1, "D2": 2, "D3": 3, "D4": 4, "D7": 7, "D9": 9,
     "D10": 10, "D12": 12, "D16": 16, "D20": 20, "D24": 24,
-    "D27": 27, "D30": 30, "D60": 60
+    "D27": 27, "D30": 30, "D40": 40, "D45": 45, "D60": 60
 }
 
 # D2 Hora uses only Cancer and Leo
@@ -33,6 +38,56 @@ HORA_SIGNS = {
     "Leo": 4       # Sign ID for Leo
 }
 
+NAKSHATRA_NAMES = [
+    "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
+    "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni",
+    "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha",
+    "Anuradha", "Jyeshtha", "Mula", "Purva Ashadha", "Uttara Ashadha",
+    "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada",
+    "Uttara Bhadrapada", "Revati"
+]
+
+TITHI_NAMES = [
+    "Pratipada", "Dwitiya", "Tritiya", "Chaturthi", "Panchami",
+    "Shashthi", "Saptami", "Ashtami", "Navami", "Dashami",
+    "Ekadashi", "Dwadashi", "Trayodashi", "Chaturdashi", "Purnima/Amavasya"
+]
+
+YOGA_NAMES = [
+    "Vishkambha", "Priti", "Ayushman", "Saubhagya", "Shobhana", "Atiganda",
+    "Sukarman", "Dhriti", "Shula", "Ganda", "Vriddhi", "Dhruva",
+    "Vyaghata", "Harshana", "Vajra", "Siddhi", "Vyatipata", "Variyan",
+    "Parigha", "Shiva", "Siddha", "Sadhya", "Shubha", "Shukla",
+    "Brahma", "Indra", "Vaidhriti"
+]
+
+VARA_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+VARA_LORDS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+
+KARANA_NAMES = [
+    "Kimstughna", "Bava", "Balava", "Kaulava", "Taitila",
+    "Garija", "Vanija", "Vishti", "Shakuni", "Chatushpada", "Naga"
+]
+
+# Largest longitude error in degrees accepted from the ephemeris store for transits
+TRANSIT_TOLERANCE = 1e-6
+
+# Phases of Saturn's transits, by sign counted from the natal Moon sign (0 = the Moon sign)
+SATURN_TRANSITS = {
+    "sade_sati": {11: "Rising Phase (12th from Moon)", 0: "Peak Phase (on Moon)", 1: "Setting Phase (2nd from Moon)"},
+    "ashtama": {7: "Ashtama Shani (8th from Moon)"},
+    "kantaka": {3: "Kantaka Shani (4th from Moon)", 6: "Kantaka Shani (7th from Moon)", 9: "Kantaka Shani (10th from Moon)"}
+}
+# Saturn's ingresses are searched from this many days before (and after) the range of interest,
+# so periods running at its ends (Sade Sati lasts up to about 8 years) get their real dates
+SATURN_SEARCH_MARGIN_DAYS = 3653
+# Periods less than this many days apart (a retrograde exit and re-entry) belong to one cycle
+SATURN_CYCLE_GAP_DAYS = 365
+
+def as_of_date(as_of: Optional[str] = None) -> date:
+    """Reference date (YYYY-MM-DD) for "current period" lookups, today if not given"""
+    return datetime.strptime(as_of, "%Y-%m-%d").date() if as_of else date.today()
+
 class PyJHoraCalculator:
     """PyJHora calculation wrapper"""
 
@@ -54,9 +109,8 @@ class PyJHoraCalculator:
             birth_data['timezone_offset']
         )
 
-        # Set ayanamsa
-        drik.set_ayanamsa_mode(ayanamsa)
-        swe.set_sid_mode(getattr(swe, f'SIDM_{ayanamsa}', swe.SIDM_LAHIRI))
+        # Set ayanamsa (process-global; concurrent callers hold ayanamsa_guard)
+        select_ayanamsa(ayanamsa)
 
         # Calculate Julian Day
         # IMPORTANT: PyJHora expects LOCAL TIME in JD, not UT
@@ -77,6 +131,93 @@ class PyJHoraCalculator:
         jd_ut = swe.julday(year, month, day, ut_time)
         self.ayanamsa_value = swe.get_ayanamsa_ut(jd_ut)
 
+        # Natal state shared by all calculate_* methods, computed on first use
+        self._natal_chart = None
+        self._natal_positions = None
+        self._natal_moon_nakshatra = None
+        self._natal_house_planet_list = None
+        self._varga_positions = {}
+        self._panchanga_kernel = None
+
+        # Number of ephemeris-backed PyJHora calls made, per function name
+        self.ephemeris_calls = {}
+
+    def _pyjhora(self, fn, *args, **kwargs):
+        """Call an ephemeris-backed PyJHora function, counting the call"""
+        self.ephemeris_calls[fn.__name__] = self.ephemeris_calls.get(fn.__name__, 0) + 1
+        return fn(*args, **kwargs)
+
+    @property
+    def jd_utc(self) -> float:
+        """Julian day (UTC) of the birth data's date and time"""
+        return self.jd - self.place.timezone / 24
+
+    @property
+    def total_ephemeris_calls(self) -> int:
+        """Total ephemeris-backed PyJHora calls made by this calculator"""
+        return sum(self.ephemeris_calls.values())
+
+    @property
+    def panchanga_kernel(self) -> PanchangaKernel:
+        """Shared Sun/Moon evaluations for the panchanga limbs at this place"""
+        if self._panchanga_kernel is None:
+            self._panchanga_kernel = PanchangaKernel(self.place)
+        return self._panchanga_kernel
+
+    @property
+    def natal_chart(self) -> List:
+        """D1 (Rasi) chart data from PyJHora"""
+        if self._natal_chart is None:
+            self._natal_chart = self._pyjhora(charts.rasi_chart, self.jd, self.place)
+        return self._natal_chart
+
+    @property
+    def natal_positions(self) -> Tuple[Dict, int, float]:
+        """Parsed D1 positions: ({planet_id: (sign_id, longitude)}, asc_sign, asc_deg)"""
+        if self._natal_positions is None:
+            self._natal_positions = self.parse_chart_data(self.natal_chart)
+        return self._natal_positions
+
+    @property
+    def natal_moon_nakshatra(self) -> Tuple[int, float, int]:
+        """Moon nakshatra as (nakshatra index 0-26, degrees elapsed in it, Vimsottari lord)"""
+        if self._natal_moon_nakshatra is None:
+            parsed, _, _ = self.natal_positions
+            moon_sign, moon_long_in_sign = parsed.get(1, (0, 0))  # Moon is planet 1
+
+            # Calculate absolute longitude for nakshatra (27 nakshatras in 360 degrees)
+            moon_abs_long = moon_sign * 30 + moon_long_in_sign
+            nakshatra_num = int(moon_abs_long / (360/27))
+            nakshatra_deg = moon_abs_long % (360/27)
+
+            # Correct Vimsottari sequence: Ketu -> Venus -> Sun -> Moon -> Mars -> Rahu -> Jupiter -> Saturn -> Mercury
+            nakshatra_lords = [8, 5, 0, 1, 2, 7, 4, 6, 3] * 3
+            self._natal_moon_nakshatra = (nakshatra_num, nakshatra_deg, nakshatra_lords[nakshatra_num])
+        return self._natal_moon_nakshatra
+
+    def varga_positions(self, chart_factor: int) -> Tuple[Dict, int, float]:
+        """
+        Parsed positions in a divisional chart, in the same format as natal_positions
+
+        Derived from the memoized D1 chart with PyJHora's own varga mapping, so no
+        further ephemeris evaluation is needed; results match charts.divisional_chart().
+        """
+        if chart_factor == 1:
+            return self.natal_positions
+        if chart_factor not in self._varga_positions:
+            chart_data = charts.divisional_positions_from_rasi_positions(
+                self.natal_chart, divisional_chart_factor=chart_factor
+            )
+            self._varga_positions[chart_factor] = self.parse_chart_data(chart_data)
+        return self._varga_positions[chart_factor]
+
+    @property
+    def natal_house_planet_list(self) -> List:
+        """D1 planets grouped by sign, as used by PyJHora's ashtakavarga"""
+        if self._natal_house_planet_list is None:
+            self._natal_house_planet_list = utils.get_house_planet_list_from_planet_positions(self.natal_chart)
+        return self._natal_house_planet_list
+
     def parse_chart_data(self, chart_data: List) -> Tuple[Dict, int, float]:
         """Parse PyJHora chart data"""
         parsed = {}
@@ -110,16 +251,8 @@ class PyJHoraCalculator:
 
         chart_factor = CHART_FACTORS.get(chart_type, 1)
 
-        # Get chart from PyJHora
-        if chart_factor == 1:
-            chart_data = charts.rasi_chart(self.jd, self.place)
-        else:
-            chart_data = charts.divisional_chart(
-                self.jd, self.place, divisional_chart_factor=chart_factor
-            )
-
-        # Parse chart
-        parsed, asc_sign, asc_deg = self.parse_chart_data(chart_data)
+        # Get chart positions (all vargas are derived from one D1 evaluation)
+        parsed, asc_sign, asc_deg = self.varga_positions(chart_factor)
 
         # Format results
         planets_list = []
@@ -160,6 +293,35 @@ class PyJHoraCalculator:
             }
         }
 
+    def calculate_vargas(self, chart_types: List[str] = None) -> Dict[str, Dict]:
+        """Calculate several divisional charts (default: all CHART_FACTORS) from one D1 evaluation"""
+        chart_types = chart_types or list(CHART_FACTORS)
+        return {chart_type.upper(): self.calculate_chart(chart_type) for chart_type in chart_types}
+
+    def calculate_varga_table(self, chart_types: List[str] = None) -> Dict:
+        """Calculate a compact planet x varga -> sign table for several divisional charts"""
+        vargas = self.calculate_vargas(chart_types)
+
+        table = {"Ascendant": {}}
+        table.update({PLANET_NAMES[planet_id]: {} for planet_id in range(9)})
+        for chart_type, chart in vargas.items():
+            table["Ascendant"][chart_type] = chart["ascendant"]["sign"]
+            for planet in chart["planets"]:
+                table[planet["planet"]][chart_type] = planet["sign"]
+
+        return {
+            "status": "success",
+            "birth_data": self.birth_data,
+            "chart_types": list(vargas),
+            "table": table,
+            "calculation_info": {
+                "ayanamsa": self.ayanamsa,
+                "ayanamsa_value": round(self.ayanamsa_value, 4),
+                "julian_day": round(self.jd, 6),
+                "note": "D2 uses the classical Hora method (Cancer/Leo only), as in /charts/hora"
+            }
+        }
+
     def calculate_classical_hora(self) -> Dict:
         """
         Calculate Classical D2 Hora Chart
@@ -172,8 +334,7 @@ class PyJHoraCalculator:
           First 15° = Cancer, Last 15° = Leo
         """
         # Get Rasi chart for planetary positions
-        chart_data = charts.rasi_chart(self.jd, self.place)
-        parsed, asc_sign, asc_deg = self.parse_chart_data(chart_data)
+        parsed, asc_sign, asc_deg = self.natal_positions
 
         # Calculate Hora ascendant
         # Ascendant follows the same rule as planets
@@ -242,37 +403,19 @@ class PyJHoraCalculator:
             }
         }
 
-    def calculate_dasha(self, dasha_system: str = "VIMSOTTARI") -> Dict:
-        """Calculate Vimsottari Dasha periods"""
-        from jhora.horoscope.dhasa.graha import vimsottari
-        from datetime import date
+    def calculate_dasha(self, dasha_system: str = "VIMSOTTARI", as_of: Optional[str] = None) -> Dict:
+        """Calculate Vimsottari Dasha periods with the dasha running on `as_of` (default: today)"""
+        return self.with_current_dasha(self.calculate_dasha_periods(dasha_system), as_of)
 
-        # Get Moon position for nakshatra
-        chart_data = charts.rasi_chart(self.jd, self.place)
-        parsed, _, _ = self.parse_chart_data(chart_data)
-
-        moon_sign, moon_long_in_sign = parsed.get(1, (0, 0))  # Moon is planet 1
-
-        # Calculate absolute longitude for nakshatra
-        moon_abs_long = moon_sign * 30 + moon_long_in_sign
+    def calculate_dasha_periods(self, dasha_system: str = "VIMSOTTARI") -> Dict:
+        """Calculate natal Vimsottari Maha Dasha periods (independent of the current date)"""
+        from jhora.horoscope.dhasa.graha import vimsottari
 
-        # Calculate nakshatra (27 nakshatras in 360 degrees)
-        nakshatra_num = int(moon_abs_long / (360/27))
-        nakshatra_deg = moon_abs_long % (360/27)
-        nakshatra_names = [
-            "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
-            "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni",
-            "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha",
-            "Anuradha", "Jyeshtha", "Mula", "Purva Ashadha", "Uttara Ashadha",
-            "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada",
-            "Uttara Bhadrapada", "Revati"
-        ]
+        # Get Moon nakshatra
+        nakshatra_num, nakshatra_deg, starting_lord = self.natal_moon_nakshatra
 
         # Get dasha data
-        # Correct Vimsottari sequence: Ketu -> Venus -> Sun -> Moon -> Mars -> Rahu -> Jupiter -> Saturn -> Mercury
         dasha_years = {8: 7, 5: 20, 0: 6, 1: 10, 2: 7, 7: 18, 4: 16, 6: 19, 3: 17}
-        nakshatra_lords = [8, 5, 0, 1, 2, 7, 4, 6, 3] * 3
-        starting_lord = nakshatra_lords[nakshatra_num]
 
         # Calculate elapsed years in current dasha
         elapsed_fraction = nakshatra_deg / (360/27)
@@ -311,15 +454,29 @@ class PyJHoraCalculator:
 
             current_date = end_date
 
-        # Find current dasha
-        today = date.today()
+        return {
+            "status": "success",
+            "dasha_system": dasha_system,
+            "birth_data": self.birth_data,
+            "moon_nakshatra": {
+                "number": nakshatra_num + 1,
+                "name": NAKSHATRA_NAMES[nakshatra_num],
+                "lord": PLANET_NAMES[starting_lord]
+            },
+            "maha_dasha_periods": maha_dasha_periods
+        }
+
+    @staticmethod
+    def with_current_dasha(dasha: Dict, as_of: Optional[str] = None) -> Dict:
+        """Add the Maha Dasha running on `as_of` to a calculate_dasha_periods() result"""
+        on_date = as_of_date(as_of)
         current_dasha = None
-        for period in maha_dasha_periods:
+        for period in dasha['maha_dasha_periods']:
             start = datetime.strptime(period['start_date'], '%Y-%m-%d').date()
             end = datetime.strptime(period['end_date'], '%Y-%m-%d').date()
-            if start <= today < end:
-                elapsed_in_dasha = (today - start).days / 365.25
-                remaining = (end - today).days / 365.25
+            if start <= on_date < end:
+                elapsed_in_dasha = (on_date - start).days / 365.25
+                remaining = (end - on_date).days / 365.25
                 current_dasha = {
                     **period,
                     "elapsed_years": round(elapsed_in_dasha, 2),
@@ -328,43 +485,29 @@ class PyJHoraCalculator:
                 break
 
         return {
-            "status": "success",
-            "dasha_system": dasha_system,
-            "birth_data": self.birth_data,
-            "moon_nakshatra": {
-                "number": nakshatra_num + 1,
-                "name": nakshatra_names[nakshatra_num],
-                "lord": PLANET_NAMES[starting_lord]
-            },
+            "status": dasha['status'],
+            "dasha_system": dasha['dasha_system'],
+            "birth_data": dasha['birth_data'],
+            "moon_nakshatra": dasha['moon_nakshatra'],
+            "as_of": on_date.isoformat(),
             "current_dasha": current_dasha,
-            "maha_dasha_periods": maha_dasha_periods
+            "maha_dasha_periods": dasha['maha_dasha_periods']
         }
 
-    def calculate_dasha_bhukti(self, dasha_system: str = "VIMSOTTARI") -> Dict:
-        """Calculate Dasha periods with Bhukti (sub-periods)"""
+    def calculate_dasha_bhukti(self, dasha_system: str = "VIMSOTTARI", as_of: Optional[str] = None) -> Dict:
+        """Calculate Dasha periods with Bhukti (sub-periods) and the bhukti running on `as_of` (default: today)"""
+        return self.with_current_bhukti(self.calculate_bhukti_periods(dasha_system), as_of)
+
+    def calculate_bhukti_periods(self, dasha_system: str = "VIMSOTTARI") -> Dict:
+        """Calculate natal Dasha-Bhukti periods (independent of the current date)"""
         if dasha_system != "VIMSOTTARI":
             raise ValueError("Only VIMSOTTARI dasha system is currently supported")
 
         # Get Moon nakshatra for basic info
-        chart_data = charts.rasi_chart(self.jd, self.place)
-        parsed, _, _ = self.parse_chart_data(chart_data)
-        moon_sign, moon_long_in_sign = parsed.get(1, (0, 0))
-        moon_abs_long = moon_sign * 30 + moon_long_in_sign
-        nakshatra_num = int(moon_abs_long / (360/27))
-        nakshatra_names = [
-            "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
-            "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni",
-            "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha",
-            "Anuradha", "Jyeshtha", "Mula", "Purva Ashadha", "Uttara Ashadha",
-            "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada",
-            "Uttara Bhadrapada", "Revati"
-        ]
-        # Correct Vimsottari sequence: Ketu -> Venus -> Sun -> Moon -> Mars -> Rahu -> Jupiter -> Saturn -> Mercury
-        nakshatra_lords = [8, 5, 0, 1, 2, 7, 4, 6, 3] * 3
-        starting_lord = nakshatra_lords[nakshatra_num]
+        nakshatra_num, _, starting_lord = self.natal_moon_nakshatra
 
         # Get Bhukti periods from PyJHora
-        current_period, all_periods = vimsottari.get_vimsottari_dhasa_bhukthi(self.jd, self.place)
+        current_period, all_periods = self._pyjhora(vimsottari.get_vimsottari_dhasa_bhukthi, self.jd, self.place)
 
         # Parse Bhukti periods
         bhukti_periods = []
@@ -379,19 +522,33 @@ class PyJHoraCalculator:
                 "start_date": date_str
             })
 
-        # Find current Bhukti
-        from datetime import date
-        today = date.today()
+        return {
+            "status": "success",
+            "dasha_system": dasha_system,
+            "birth_data": self.birth_data,
+            "moon_nakshatra": {
+                "number": nakshatra_num + 1,
+                "name": NAKSHATRA_NAMES[nakshatra_num],
+                "lord": PLANET_NAMES[starting_lord]
+            },
+            "bhukti_periods": bhukti_periods
+        }
+
+    @staticmethod
+    def with_current_bhukti(dasha: Dict, as_of: Optional[str] = None) -> Dict:
+        """Add the Bhukti running on `as_of` to a calculate_bhukti_periods() result"""
+        on_date = as_of_date(as_of)
+        bhukti_periods = dasha['bhukti_periods']
         current_bhukti = None
 
         for i in range(len(bhukti_periods) - 1):
             start_date = datetime.strptime(bhukti_periods[i]['start_date'], '%Y-%m-%d %H:%M:%S').date()
             end_date = datetime.strptime(bhukti_periods[i+1]['start_date'], '%Y-%m-%d %H:%M:%S').date()
 
-            if start_date <= today < end_date:
+            if start_date <= on_date < end_date:
                 duration_days = (end_date - start_date).days
-                elapsed_days = (today - start_date).days
-                remaining_days = (end_date - today).days
+                elapsed_days = (on_date - start_date).days
+                remaining_days = (end_date - on_date).days
 
                 current_bhukti = {
                     "maha_dasha_lord": bhukti_periods[i]['maha_dasha_lord'],
@@ -405,14 +562,11 @@ class PyJHoraCalculator:
                 break
 
         return {
-            "status": "success",
-            "dasha_system": dasha_system,
-            "birth_data": self.birth_data,
-            "moon_nakshatra": {
-                "number": nakshatra_num + 1,
-                "name": nakshatra_names[nakshatra_num],
-                "lord": PLANET_NAMES[starting_lord]
-            },
+            "status": dasha['status'],
+            "dasha_system": dasha['dasha_system'],
+            "birth_data": dasha['birth_data'],
+            "moon_nakshatra": dasha['moon_nakshatra'],
+            "as_of": on_date.isoformat(),
             "current_bhukti": current_bhukti,
             "bhukti_periods": bhukti_periods
         }
@@ -452,7 +606,7 @@ class PyJHoraCalculator:
         """Calculate all Yogas present in the chart"""
         # Get yoga details for all divisional charts
         # Returns: (all_yogas_dict, d1_count, total_count)
-        all_yogas_dict, d1_count, total_count = yoga.get_yoga_details_for_all_charts(self.jd, self.place)
+        all_yogas_dict, d1_count, total_count = self._pyjhora(yoga.get_yoga_details_for_all_charts, self.jd, self.place)
 
         # Format the results
         yogas_found = []
@@ -477,7 +631,7 @@ class PyJHoraCalculator:
     def calculate_doshas(self) -> Dict:
         """Calculate all Doshas present in the chart"""
         # Get dosha details
-        dosha_details = dosha.get_dosha_details(self.jd, self.place)
+        dosha_details = self._pyjhora(dosha.get_dosha_details, self.jd, self.place)
 
         # Parse the HTML results to extract information
         doshas_found = []
@@ -504,12 +658,8 @@ class PyJHoraCalculator:
 
     def calculate_ashtakavarga(self) -> Dict:
         """Calculate Ashtakavarga (Bindus in each house for each planet)"""
-        # Get chart data
-        chart_data = charts.rasi_chart(self.jd, self.place)
-        house_to_planet_list = utils.get_house_planet_list_from_planet_positions(chart_data)
-
-        # Calculate Ashtakavarga
-        binna, samudhaya, prastara = ashtakavarga.get_ashtaka_varga(house_to_planet_list)
+        # Calculate Ashtakavarga from the natal chart
+        binna, samudhaya, prastara = ashtakavarga.get_ashtaka_varga(self.natal_house_planet_list)
 
         # Format Binna Ashtakavarga (planet-wise)
         planet_names_av = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Ascendant"]
@@ -538,7 +688,7 @@ class PyJHoraCalculator:
     def calculate_shadbala(self) -> Dict:
         """Calculate Shadbala (Six-fold Planetary Strength)"""
         # Calculate Shadbala
-        shad_bala_values = strength.shad_bala(self.jd, self.place)
+        shad_bala_values = self._pyjhora(strength.shad_bala, self.jd, self.place)
 
         # Format the results
         planet_strengths = []
@@ -561,43 +711,10 @@ class PyJHoraCalculator:
 
     def calculate_panchanga(self) -> Dict:
         """Calculate Panchanga (5 limbs of time)"""
-        # Calculate all Panchanga elements
-        tithi_result = drik.tithi(self.jd, self.place)
-        nakshatra_result = drik.nakshatra(self.jd, self.place)
-        yoga_result = drik.yogam(self.jd, self.place)
-        karana_result = drik.karana(self.jd, self.place)
-
-        # Tithi names
-        tithi_names = [
-            "Pratipada", "Dwitiya", "Tritiya", "Chaturthi", "Panchami",
-            "Shashthi", "Saptami", "Ashtami", "Navami", "Dashami",
-            "Ekadashi", "Dwadashi", "Trayodashi", "Chaturdashi", "Purnima/Amavasya"
-        ]
-
-        # Nakshatra names
-        nakshatra_names = [
-            "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
-            "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni",
-            "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha",
-            "Anuradha", "Jyeshtha", "Mula", "Purva Ashadha", "Uttara Ashadha",
-            "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada",
-            "Uttara Bhadrapada", "Revati"
-        ]
-
-        # Yoga names
-        yoga_names = [
-            "Vishkambha", "Priti", "Ayushman", "Saubhagya", "Shobhana", "Atiganda",
-            "Sukarman", "Dhriti", "Shula", "Ganda", "Vriddhi", "Dhruva",
-            "Vyaghata", "Harshana", "Vajra", "Siddhi", "Vyatipata", "Variyan",
-            "Parigha", "Shiva", "Siddha", "Sadhya", "Shubha", "Shukla",
-            "Brahma", "Indra", "Vaidhriti"
-        ]
-
-        # Karana names
-        karana_names = [
-            "Kimstughna", "Bava", "Balava", "Kaulava", "Taitila",
-            "Garija", "Vanija", "Vishti", "Shakuni", "Chatushpada", "Naga"
-        ]
+        # Calculate all Panchanga elements (same results as drik.tithi/nakshatra/yogam/karana)
+        tithi_result, nakshatra_result, yoga_result, karana_result = self._pyjhora(
+            self.panchanga_kernel.panchanga, self.jd
+        )
 
         # Format results
         tithi_num = int(tithi_result[0])
@@ -615,24 +732,24 @@ class PyJHoraCalculator:
             "birth_data": self.birth_data,
             "tithi": {
                 "number": tithi_num,
-                "name": tithi_names[tithi_index],
+                "name": TITHI_NAMES[tithi_index],
                 "paksha": paksha,
                 "elapsed_fraction": round(tithi_result[1], 2)
             },
             "nakshatra": {
                 "number": nakshatra_num,
-                "name": nakshatra_names[nakshatra_num - 1],
+                "name": NAKSHATRA_NAMES[nakshatra_num - 1],
                 "pada": nakshatra_pada,
                 "elapsed_fraction": round(nakshatra_result[2], 2)
             },
             "yoga": {
                 "number": yoga_num,
-                "name": yoga_names[yoga_num - 1],
+                "name": YOGA_NAMES[yoga_num - 1],
                 "elapsed_fraction": round(yoga_result[1], 2)
             },
             "karana": {
                 "number": karana_num,
-                "name": karana_names[karana_num] if karana_num < len(karana_names) else f"Karana {karana_num}",
+                "name": KARANA_NAMES[karana_num] if karana_num < len(KARANA_NAMES) else f"Karana {karana_num}",
                 "elapsed_fraction": round(karana_result[1], 2)
             }
         }
@@ -642,105 +759,40 @@ class PyJHoraCalculator:
         # Get basic panchanga
         basic_panchanga = self.calculate_panchanga()
 
-        # Get Vara (weekday)
-        day_of_week = int((self.jd + 1.5) % 7)
-        vara_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        vara_lords = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]
+        # Get Vara (weekday), 0 = Sunday
+        day_of_week = drik.vaara(self.jd)
 
-        # Get sunrise and sunset
-        try:
-            sunrise_jd = drik.sunrise(self.jd, self.place)[1]
-            sunset_jd = drik.sunset(self.jd, self.place)[1]
-            sunrise_hours = (sunrise_jd - int(sunrise_jd)) * 24
-            sunset_hours = (sunset_jd - int(sunset_jd)) * 24
-            sunrise_time = f"{int(sunrise_hours):02d}:{int((sunrise_hours % 1) * 60):02d}"
-            sunset_time = f"{int(sunset_hours):02d}:{int((sunset_hours % 1) * 60):02d}"
-        except:
-            sunrise_time = "06:00"
-            sunset_time = "18:00"
-
-        # Get moonrise and moonset
-        try:
-            moonrise_jd = drik.moonrise(self.jd, self.place)[1]
-            moonset_jd = drik.moonset(self.jd, self.place)[1]
-            moonrise_hours = (moonrise_jd - int(moonrise_jd)) * 24
-            moonset_hours = (moonset_jd - int(moonset_jd)) * 24
-            moonrise_time = f"{int(moonrise_hours):02d}:{int((moonrise_hours % 1) * 60):02d}"
-            moonset_time = f"{int(moonset_hours):02d}:{int((moonset_hours % 1) * 60):02d}"
-        except:
-            moonrise_time = "N/A"
-            moonset_time = "N/A"
-
-        # Rahu Kaal
+        # Sunrise/sunset and every period derived from them, calculated once per date and place
         try:
-            rahu_kaal = drik.raahu_kaalam(self.jd, self.place)
-            rahu_start_hours = (rahu_kaal[0] - int(rahu_kaal[0])) * 24
-            rahu_end_hours = (rahu_kaal[1] - int(rahu_kaal[1])) * 24
-            rahu_kaal_timing = f"{int(rahu_start_hours):02d}:{int((rahu_start_hours % 1) * 60):02d} - " + \
-                              f"{int(rahu_end_hours):02d}:{int((rahu_end_hours % 1) * 60):02d}"
-        except:
-            rahu_kaal_timing = "Not available"
-
-        # Yamaganda
-        try:
-            yamaganda = drik.yamaganda_kaalam(self.jd, self.place)
-            yama_start_hours = (yamaganda[0] - int(yamaganda[0])) * 24
-            yama_end_hours = (yamaganda[1] - int(yamaganda[1])) * 24
-            yamaganda_timing = f"{int(yama_start_hours):02d}:{int((yama_start_hours % 1) * 60):02d} - " + \
-                              f"{int(yama_end_hours):02d}:{int((yama_end_hours % 1) * 60):02d}"
-        except:
-            yamaganda_timing = "Not available"
-
-        # Gulika
-        try:
-            gulika = drik.gulikai_kaalam(self.jd, self.place)
-            gulika_start_hours = (gulika[0] - int(gulika[0])) * 24
-            gulika_end_hours = (gulika[1] - int(gulika[1])) * 24
-            gulika_timing = f"{int(gulika_start_hours):02d}:{int((gulika_start_hours % 1) * 60):02d} - " + \
-                           f"{int(gulika_end_hours):02d}:{int((gulika_end_hours % 1) * 60):02d}"
-        except:
-            gulika_timing = "Not available"
-
-        # Durmuhurtam
-        try:
-            durmuhurta = drik.durmuhurtam(self.jd, self.place)
-            durmuhurta_timings = []
-            for period in durmuhurta:
-                start_hours = (period[0] - int(period[0])) * 24
-                end_hours = (period[1] - int(period[1])) * 24
-                timing = f"{int(start_hours):02d}:{int((start_hours % 1) * 60):02d} - " + \
-                        f"{int(end_hours):02d}:{int((end_hours % 1) * 60):02d}"
-                durmuhurta_timings.append(timing)
-        except:
+            timetable = self._pyjhora(day_timetable, self.jd, self.place)
+        except Exception:
+            timetable = None
+
+        if timetable:
+            sunrise_time = clock(timetable["sunrise"])
+            sunset_time = clock(timetable["sunset"])
+            moonrise_time = clock(timetable["moonrise"]) if timetable["moonrise"] is not None else "N/A"
+            moonset_time = clock(timetable["moonset"]) if timetable["moonset"] is not None else "N/A"
+            rahu_kaal_timing = clock_range(timetable["rahu_kaal"])
+            yamaganda_timing = clock_range(timetable["yamaganda"])
+            gulika_timing = clock_range(timetable["gulika"])
+            durmuhurta_timings = [clock_range(period) for period in timetable["durmuhurta"]]
+            abhijit_timing = clock_range(timetable["abhijit_muhurta"])
+            brahma_timing = clock_range(timetable["brahma_muhurta"])
+        else:
+            sunrise_time, sunset_time = "06:00", "18:00"
+            moonrise_time = moonset_time = "N/A"
+            rahu_kaal_timing = yamaganda_timing = gulika_timing = "Not available"
+            abhijit_timing = brahma_timing = "Not available"
             durmuhurta_timings = []
 
-        # Abhijit Muhurta
-        try:
-            abhijit = drik.abhijit_muhurta(self.jd, self.place)
-            abhijit_start_hours = (abhijit[0] - int(abhijit[0])) * 24
-            abhijit_end_hours = (abhijit[1] - int(abhijit[1])) * 24
-            abhijit_timing = f"{int(abhijit_start_hours):02d}:{int((abhijit_start_hours % 1) * 60):02d} - " + \
-                            f"{int(abhijit_end_hours):02d}:{int((abhijit_end_hours % 1) * 60):02d}"
-        except:
-            abhijit_timing = "Not available"
-
-        # Brahma Muhurta
-        try:
-            brahma = drik.brahma_muhurtha(self.jd, self.place)
-            brahma_start_hours = (brahma[0] - int(brahma[0])) * 24
-            brahma_end_hours = (brahma[1] - int(brahma[1])) * 24
-            brahma_timing = f"{int(brahma_start_hours):02d}:{int((brahma_start_hours % 1) * 60):02d} - " + \
-                           f"{int(brahma_end_hours):02d}:{int((brahma_end_hours % 1) * 60):02d}"
-        except:
-            brahma_timing = "Not available"
-
         return {
             "status": "success",
             "birth_data": self.birth_data,
             "basic_panchanga": basic_panchanga,
             "vara": {
-                "day": vara_names[day_of_week],
-                "lord": vara_lords[day_of_week],
+                "day": VARA_NAMES[day_of_week],
+                "lord": VARA_LORDS[day_of_week],
                 "number": day_of_week + 1
             },
             "sun_moon_timings": {
@@ -779,98 +831,63 @@ class PyJHoraCalculator:
             }
         }
 
+    def calculate_moon_nakshatra(self) -> Dict:
+        """Janma nakshatra (1-27) and pada (1-4) of the Moon, as used for compatibility"""
+        nakshatra = self._pyjhora(drik.nakshatra, self.jd, self.place)
+        nakshatra_num = int(nakshatra[0])
+        return {
+            "nakshatra_number": nakshatra_num,
+            "nakshatra": NAKSHATRA_NAMES[nakshatra_num - 1],
+            "nakshatra_pada": int(nakshatra[1])
+        }
+
+    @staticmethod
+    def ashtakoota_scores(boy_nakshatra_num: int, boy_pada_num: int,
+                          girl_nakshatra_num: int, girl_pada_num: int) -> Tuple[Dict, float]:
+        """Ashtakoota koota scores for a boy/girl nakshatra-pada pair, and their total"""
+        # Looked up in the precomputed table of PyJHora's scores for all 108 x 108 pairs
+        return ashtakoota_table().pair_scores(
+            (boy_nakshatra_num, boy_pada_num), (girl_nakshatra_num, girl_pada_num)
+        )
+
+    @staticmethod
+    def compatibility_rating(total_score: float) -> Tuple[str, str]:
+        """Rating and recommendation for an Ashtakoota total out of 36"""
+        if total_score >= 28:
+            return "Excellent", "Highly compatible match. Very auspicious for marriage."
+        if total_score >= 24:
+            return "Very Good", "Good compatibility. Suitable for marriage."
+        if total_score >= 18:
+            return "Average", "Moderate compatibility. Some challenges may arise."
+        return "Below Average", "Low compatibility. Marriage may face significant challenges."
+
     @staticmethod
     def calculate_marriage_compatibility(boy_birth_data: Dict, girl_birth_data: Dict, ayanamsa: str = "LAHIRI") -> Dict:
         """Calculate Marriage Compatibility using Ashtakoota system"""
-        # Create calculators for both
-        boy_calc = PyJHoraCalculator(boy_birth_data, ayanamsa)
-        girl_calc = PyJHoraCalculator(girl_birth_data, ayanamsa)
-
         # Get nakshatras
-        boy_nak = drik.nakshatra(boy_calc.jd, boy_calc.place)
-        girl_nak = drik.nakshatra(girl_calc.jd, girl_calc.place)
-
-        boy_nakshatra_num = int(boy_nak[0])
-        boy_pada_num = int(boy_nak[1])
-        girl_nakshatra_num = int(girl_nak[0])
-        girl_pada_num = int(girl_nak[1])
+        boy = PyJHoraCalculator(boy_birth_data, ayanamsa).calculate_moon_nakshatra()
+        girl = PyJHoraCalculator(girl_birth_data, ayanamsa).calculate_moon_nakshatra()
 
         # Calculate Ashtakoota
-        ashtakoota = compatibility.Ashtakoota(
-            boy_nakshatra_num, boy_pada_num,
-            girl_nakshatra_num, girl_pada_num,
-            method="North"
+        scores, total_score = PyJHoraCalculator.ashtakoota_scores(
+            boy["nakshatra_number"], boy["nakshatra_pada"],
+            girl["nakshatra_number"], girl["nakshatra_pada"]
         )
-
-        # Get all scores (returns tuples of (score, max))
-        varna_result = ashtakoota.varna_porutham()
-        vasiya_result = ashtakoota.vasiya_porutham()
-        tara_result = ashtakoota.tara_porutham()
-        yoni_result = ashtakoota.yoni_porutham()
-        maitri_result = ashtakoota.maitri_porutham()
-        gana_result = ashtakoota.gana_porutham()
-        rasi_result = ashtakoota.raasi_porutham()
-        nadi_result = ashtakoota.naadi_porutham()
-
-        # Extract scores
-        varna_score = varna_result[0]
-        vasiya_score = vasiya_result[0]
-        tara_score = tara_result[0]
-        yoni_score = yoni_result[0]
-        maitri_score = maitri_result[0]
-        gana_score = gana_result[0]
-        rasi_score = rasi_result[0]
-        nadi_score = nadi_result[0]
-
-        total_score = (varna_score + vasiya_score + tara_score + yoni_score +
-                      maitri_score + gana_score + rasi_score + nadi_score)
-
-        # Nakshatra names for reference
-        nakshatra_names = [
-            "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
-            "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni",
-            "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha",
-            "Anuradha", "Jyeshtha", "Mula", "Purva Ashadha", "Uttara Ashadha",
-            "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada",
-            "Uttara Bhadrapada", "Revati"
-        ]
-
-        # Compatibility interpretation
-        if total_score >= 28:
-            compatibility_rating = "Excellent"
-            recommendation = "Highly compatible match. Very auspicious for marriage."
-        elif total_score >= 24:
-            compatibility_rating = "Very Good"
-            recommendation = "Good compatibility. Suitable for marriage."
-        elif total_score >= 18:
-            compatibility_rating = "Average"
-            recommendation = "Moderate compatibility. Some challenges may arise."
-        else:
-            compatibility_rating = "Below Average"
-            recommendation = "Low compatibility. Marriage may face significant challenges."
+        compatibility_rating, recommendation = PyJHoraCalculator.compatibility_rating(total_score)
 
         return {
             "status": "success",
             "boy": {
                 "birth_data": boy_birth_data,
-                "nakshatra": nakshatra_names[boy_nakshatra_num - 1],
-                "nakshatra_pada": boy_pada_num
+                "nakshatra": boy["nakshatra"],
+                "nakshatra_pada": boy["nakshatra_pada"]
             },
             "girl": {
                 "birth_data": girl_birth_data,
-                "nakshatra": nakshatra_names[girl_nakshatra_num - 1],
-                "nakshatra_pada": girl_pada_num
-            },
-            "ashtakoota_scores": {
-                "varna": {"score": float(varna_score), "max": float(varna_result[1])},
-                "vasiya": {"score": float(vasiya_score), "max": float(vasiya_result[1])},
-                "tara": {"score": float(tara_score), "max": float(tara_result[1])},
-                "yoni": {"score": float(yoni_score), "max": float(yoni_result[1])},
-                "graha_maitri": {"score": float(maitri_score), "max": float(maitri_result[1])},
-                "gana": {"score": float(gana_score), "max": float(gana_result[1])},
-                "rasi": {"score": float(rasi_score), "max": float(rasi_result[1])},
-                "nadi": {"score": float(nadi_score), "max": float(nadi_result[1])}
+                "nakshatra": girl["nakshatra"],
+                "nakshatra_pada": girl["nakshatra_pada"]
             },
+            "ashtakoota_scores": scores,
             "total_score": total_score,
             "maximum_score": 36,
             "percentage": round((total_score / 36) * 100, 2),
@@ -881,13 +898,13 @@ class PyJHoraCalculator:
     def calculate_special_lagnas(self) -> Dict:
         """Calculate Special Lagnas (Ascendants for specific purposes)"""
         # Calculate all special lagnas
-        hora_lagna_result = drik.hora_lagna(self.jd, self.place)
-        ghati_lagna_result = drik.ghati_lagna(self.jd, self.place)
-        bhava_lagna_result = drik.bhava_lagna(self.jd, self.place)
-        sree_lagna_result = drik.sree_lagna(self.jd, self.place)
-        pranapada_lagna_result = drik.pranapada_lagna(self.jd, self.place)
-        indu_lagna_result = drik.indu_lagna(self.jd, self.place)
-        bhrigu_bindhu_lagna_result = drik.bhrigu_bindhu_lagna(self.jd, self.place)
+        hora_lagna_result = self._pyjhora(drik.hora_lagna, self.jd, self.place)
+        ghati_lagna_result = self._pyjhora(drik.ghati_lagna, self.jd, self.place)
+        bhava_lagna_result = self._pyjhora(drik.bhava_lagna, self.jd, self.place)
+        sree_lagna_result = self._pyjhora(drik.sree_lagna, self.jd, self.place)
+        pranapada_lagna_result = self._pyjhora(drik.pranapada_lagna, self.jd, self.place)
+        indu_lagna_result = self._pyjhora(drik.indu_lagna, self.jd, self.place)
+        bhrigu_bindhu_lagna_result = self._pyjhora(drik.bhrigu_bindhu_lagna, self.jd, self.place)
 
         # Format each lagna
         def format_lagna(lagna_result):
@@ -941,7 +958,7 @@ class PyJHoraCalculator:
     def calculate_bhava_bala(self) -> Dict:
         """Calculate Bhava Bala (House Strength)"""
         # Calculate Bhava Bala
-        bhava_bala_values = strength.bhava_bala(self.jd, self.place)
+        bhava_bala_values = self._pyjhora(strength.bhava_bala, self.jd, self.place)
 
         # Format the results
         house_strengths = []
@@ -980,11 +997,10 @@ class PyJHoraCalculator:
 
     def calculate_current_transits(self) -> Dict:
         """Calculate current planetary transits (Gochara)"""
-        # Get current planetary positions
+        # Positions and speeds come from the ephemeris store (one memory read each) when it covers the date
         positions = []
         for planet_id in range(9):  # 0-8 (Sun to Ketu)
-            # Get longitude for all planets using sidereal_longitude
-            long_deg = drik.sidereal_longitude(self.jd, planet_id)
+            long_deg, speed = self._pyjhora(sidereal_position, self.jd_utc, planet_id, TRANSIT_TOLERANCE)
 
             sign_num = int(long_deg / 30)
             degree = long_deg % 30
@@ -993,8 +1009,6 @@ class PyJHoraCalculator:
             nak_num = int(long_deg / 13.333333333333334) % 27
             nak_pada = int((long_deg % 13.333333333333334) / 3.333333333333333) + 1
 
-            # Get planet speed
-            speed = drik.daily_planet_speed(self.jd, self.place, planet_id)
             is_retrograde = speed < 0
 
             positions.append({
@@ -1018,11 +1032,11 @@ class PyJHoraCalculator:
     def calculate_sade_sati(self) -> Dict:
         """Calculate Sade Sati (Saturn's 7.5-year transit)"""
         # Get Moon's sign in birth chart
-        moon_long = drik.sidereal_longitude(self.jd, 1)  # Moon is planet 1
+        moon_long = self._pyjhora(sidereal_position, self.jd_utc, 1, TRANSIT_TOLERANCE)[0]  # Moon is planet 1
         moon_sign = int(moon_long / 30)
 
         # Get current Saturn position
-        saturn_long = drik.sidereal_longitude(self.jd, 6)  # Saturn is planet 6
+        saturn_long = self._pyjhora(sidereal_position, self.jd_utc, 6, TRANSIT_TOLERANCE)[0]  # Saturn is planet 6
         saturn_sign = int(saturn_long / 30)
 
         # Sade Sati spans 3 signs: 12th from Moon, Moon sign, 2nd from Moon
@@ -1043,7 +1057,12 @@ class PyJHoraCalculator:
             in_sade_sati = True
             current_phase = "Setting Phase (2nd from Moon)"
 
-        # Calculate approximate dates (Saturn takes ~2.5 years per sign)
+        # Exact start and end of the current stay in the three signs, from Saturn's ingresses
+        current_period = None
+        if in_sade_sati:
+            periods = self.saturn_transit_periods(moon_sign, self.jd_utc, self.jd_utc, ("sade_sati",))["sade_sati"]
+            current_period = periods[0] if periods else None
+
         return {
             "status": "success",
             "birth_data": self.birth_data,
@@ -1051,6 +1070,7 @@ class PyJHoraCalculator:
             "current_saturn_sign": SIGN_NAMES[saturn_sign],
             "in_sade_sati": in_sade_sati,
             "current_phase": current_phase,
+            "current_period": current_period,
             "sade_sati_signs": {
                 "rising": SIGN_NAMES[sade_sati_start_sign],
                 "peak": SIGN_NAMES[moon_sign],
@@ -1060,36 +1080,105 @@ class PyJHoraCalculator:
                           "It's considered a period of challenges and spiritual growth."
         }
 
-    def calculate_next_planet_entries(self, num_entries: int = 5) -> Dict:
-        """Calculate next planet entry dates into signs"""
-        entries = []
+    def saturn_transit_periods(self, moon_sign: int, start_jd_utc: float, end_jd_utc: float,
+                               kinds: Tuple[str, ...]) -> Dict[str, List[Dict]]:
+        """
+        Saturn's transits of each kind in SATURN_TRANSITS that overlap start to end (JD, UTC)
 
-        # Check entries for all planets except Rahu/Ketu (they're always retrograde)
-        for planet_id in range(7):  # 0-6 (Sun to Saturn)
-            try:
-                # Get next entry date
-                next_date = drik.next_planet_entry_date(self.jd, planet_id)
+        One ingress search over the whole range gives Saturn's stay in each
+        sign. A period is an uninterrupted run of stays in the kind's signs:
+        a retrograde exit and re-entry ends one period and starts the next
+        one of the same cycle.
+        """
+        search_start = start_jd_utc - SATURN_SEARCH_MARGIN_DAYS
+        search_end = end_jd_utc + SATURN_SEARCH_MARGIN_DAYS
+        sign = int(self._pyjhora(sidereal_position, search_start, 6, TRANSIT_TOLERANCE)[0] // 30)  # Saturn is planet 6
+        stays, entered, retrograde = [], search_start, False
+        for entry_jd, _, past_sign, future_sign in self._pyjhora(planet_ingresses, search_start, search_end, 6, ("sign",)):
+            stays.append((entered, entry_jd, sign, retrograde))
+            entered, sign, retrograde = entry_jd, future_sign, (future_sign - past_sign) % 12 != 1
+        stays.append((entered, search_end, sign, retrograde))
+
+        def local_time(jd_utc: float) -> str:
+            return str(local_times([jd_utc], self.place.timezone)[0])
+
+        timeline = {}
+        for kind in kinds:
+            runs, run = [], None
+            for entered, left, sign, retrograde in stays:
+                phase = SATURN_TRANSITS[kind].get((sign - moon_sign) % 12)
+                if phase is None:
+                    run = None
+                    continue
+                if run is None:
+                    run = []
+                    runs.append(run)
+                run.append((entered, left, sign, phase, retrograde))
+
+            periods, cycle, last_end = [], 0, None
+            for run in runs:
+                start, end = run[0][0], run[-1][1]
+                if start >= end_jd_utc or end <= start_jd_utc:
+                    continue
+                if last_end is None or start - last_end > SATURN_CYCLE_GAP_DAYS:
+                    cycle += 1
+                last_end = end
+                periods.append({
+                    "cycle": cycle,
+                    "start": local_time(start),
+                    "end": local_time(end),
+                    "years": round((end - start) / 365.25, 2),
+                    "phases": [
+                        {
+                            "phase": phase,
+                            "saturn_sign": SIGN_NAMES[sign],
+                            "start": local_time(entered),
+                            "end": local_time(left),
+                            "retrograde_entry": retrograde
+                        }
+                        for entered, left, sign, phase, retrograde in run
+                    ]
+                })
+            timeline[kind] = periods
+        return timeline
 
-                if next_date:
-                    # Convert to datetime
-                    year, month, day, hours = next_date
-                    entry_datetime = datetime(int(year), int(month), int(day), int(hours),
-                                            int((hours % 1) * 60))
+    def calculate_sade_sati_timeline(self, years: int = 100, include: Tuple[str, ...] = ()) -> Dict:
+        """Every Sade Sati period (and Ashtama/Kantaka Shani if included) from birth over `years` years"""
+        moon_long = self._pyjhora(sidereal_position, self.jd_utc, 1, TRANSIT_TOLERANCE)[0]  # Moon is planet 1
+        moon_sign = int(moon_long / 30)
+        kinds = tuple(kind for kind in SATURN_TRANSITS if kind == "sade_sati" or kind in include)
+        timeline = self.saturn_transit_periods(moon_sign, self.jd_utc, self.jd_utc + years * 365.25, kinds)
 
-                    # Get the sign the planet will enter
-                    entry_jd = swe.julday(int(year), int(month), int(day), hours)
-                    future_long = drik.sidereal_longitude(entry_jd, planet_id)
-                    future_sign = int(future_long / 30)
+        return {
+            "status": "success",
+            "birth_data": self.birth_data,
+            "moon_sign": SIGN_NAMES[moon_sign],
+            "years": years,
+            "signs": {kind: [SIGN_NAMES[(moon_sign + offset) % 12] for offset in SATURN_TRANSITS[kind]] for kind in kinds},
+            "timeline": timeline
+        }
 
-                    entries.append({
-                        "planet": PLANET_NAMES[planet_id],
-                        "entry_date": entry_datetime.strftime("%Y-%m-%d"),
-                        "entry_time": entry_datetime.strftime("%H:%M"),
-                        "entering_sign": SIGN_NAMES[future_sign],
-                        "entry_datetime": entry_datetime.isoformat()
-                    })
-            except Exception as e:
-                continue
+    def calculate_next_planet_entries(self, num_entries: int = 5) -> Dict:
+        """Calculate next planet entry dates into signs"""
+        entries = []
+
+        # Next sign entry of every planet, Rahu/Ketu included (they move backwards)
+        for planet_id in range(9):  # 0-8 (Sun to Ketu)
+            entry = self._pyjhora(next_ingress, self.jd_utc, planet_id)
+            if entry:
+                # Convert to local date and time
+                entry_jd, past_sign, future_sign = entry
+                year, month, day, hours = drik.jd_to_gregorian(entry_jd + self.place.timezone / 24)
+                entry_datetime = (datetime(year, month, day) + timedelta(hours=hours)).replace(microsecond=0)
+
+                entries.append({
+                    "planet": PLANET_NAMES[planet_id],
+                    "entry_date": entry_datetime.strftime("%Y-%m-%d"),
+                    "entry_time": entry_datetime.strftime("%H:%M"),
+                    "entering_sign": SIGN_NAMES[future_sign],
+                    "entry_datetime": entry_datetime.isoformat(),
+                    "retrograde": (future_sign - past_sign) % 12 != 1
+                })
 
         # Sort by date
         entries.sort(key=lambda x: x['entry_datetime'])
@@ -1103,11 +1192,10 @@ class PyJHoraCalculator:
     def calculate_bhava_chalit(self) -> Dict:
         """Calculate Bhava Chalit Chart (house cusp-based planetary placement)"""
         # Get house cusps (Bhava Madhya) - cusps represent the MIDDLE of each house
-        house_cusps = drik.bhaava_madhya(self.jd, self.place, bhava_method=1)
+        house_cusps = self._pyjhora(drik.bhaava_madhya, self.jd, self.place, bhava_method=1)
 
         # Get Rasi chart for planetary positions (for sign/degree info)
-        chart_data = charts.rasi_chart(self.jd, self.place)
-        parsed, asc_sign, asc_deg = self.parse_chart_data(chart_data)
+        parsed, asc_sign, asc_deg = self.natal_positions
 
         # Build planets list using correct cusp-as-middle interpretation
         planets_by_house = {i: [] for i in range(1, 13)}
@@ -1212,11 +1300,4 @@ class PyJHoraCalculator:
     @staticmethod
     def _get_nakshatra_name(nak_num: int) -> str:
         """Get nakshatra name from number"""
-        nakshatras = [
-            "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
-            "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni", "Uttara Phalguni",
-            "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha",
-            "Moola", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha",
-            "Purva Bhadrapada", "Uttara Bhadrapada", "Revati"
-        ]
-        return nakshatras[nak_num % 27]
+        return NAKSHATRA_NAMES[nak_num % 27]
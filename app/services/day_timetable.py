@@ -0,0 +1,123 @@
+"""Sunrise-based day divisions (Rahu Kaal, muhurtas, ...) from one sunrise/sunset pair"""
+
+import os
+from typing import Dict, Optional, Tuple
+
+from jhora.panchanga import drik
+
+from app.services.cache import LRUCache, cache_key
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_TIMETABLE_CACHE_SIZE = 4096
+DEFAULT_TIMETABLE_DECIMALS = 2
+
+# Fraction of the day (sunrise to sunset) at which each period starts, by weekday (0 = Sunday),
+# as in drik.trikalam()
+TRIKALAM_OFFSETS = {
+    "rahu_kaal": [0.875, 0.125, 0.75, 0.5, 0.625, 0.375, 0.25],
+    "yamaganda": [0.5, 0.375, 0.25, 0.125, 0.0, 0.75, 0.625],
+    "gulika": [0.75, 0.625, 0.5, 0.375, 0.25, 0.125, 0.0]
+}
+
+# Durmuhurta starts in twelfths of the day after sunrise (0.0 = none), by weekday, as in
+# drik.durmuhurtam(); Tuesday's second one counts twelfths of the night after sunset
+DURMUHURTA_OFFSETS = [[10.4, 0.0], [6.4, 8.8], [2.4, 4.8], [5.6, 0.0], [4.0, 8.8], [2.4, 6.4], [1.6, 0.0]]
+
+_timetable_cache: Optional[LRUCache] = None
+
+
+def timetable_decimals() -> int:
+    """Decimal places latitude and longitude are rounded to before calculating a timetable"""
+    return int(os.getenv("PYJHORA_TIMETABLE_DECIMALS", DEFAULT_TIMETABLE_DECIMALS))
+
+
+def timetable_cache() -> LRUCache:
+    """Per-process cache of timetables, created on first use (inside each pool worker)"""
+    global _timetable_cache
+    if _timetable_cache is None:
+        _timetable_cache = LRUCache(maxsize=int(os.getenv("PYJHORA_TIMETABLE_CACHE_SIZE", DEFAULT_TIMETABLE_CACHE_SIZE)))
+    return _timetable_cache
+
+
+def clock(hours: float) -> str:
+    """Local hours as HH:MM, with (+1)/(-1) for the next/previous day"""
+    days, hours = divmod(hours, 24)
+    text = f"{int(hours):02d}:{int((hours % 1) * 60):02d}"
+    return f"{text} ({int(days):+d})" if days else text
+
+
+def build_day_timetable(jd: float, place: drik.Place) -> Dict:
+    """
+    Sunrise, sunset and the periods derived from them for the date of `jd`
+
+    Sunrise, sunset and the next sunrise are calculated once; Rahu Kaal,
+    Yamaganda, Gulika, Durmuhurta, Abhijit and Brahma Muhurta are then the
+    same arithmetic PyJHora applies to them in drik.trikalam(),
+    durmuhurtam(), abhijit_muhurta() and brahma_muhurtha(), each of which
+    would otherwise recalculate them. Times are float local hours.
+    Moonrise/moonset are None when they cannot be calculated.
+    """
+    sunrise = drik.sunrise(jd, place)[0]
+    sunset = drik.sunset(jd, place)[0]
+    next_sunrise = drik.sunrise(jd + 1, place)[0]
+    day_length = sunset - sunrise
+    night_length = 24.0 + next_sunrise - sunset
+    weekday = drik.vaara(jd)
+
+    periods = {}
+    for name, offsets in TRIKALAM_OFFSETS.items():
+        start = sunrise + day_length * offsets[weekday]
+        periods[name] = (start, start + 0.125 * day_length)
+
+    durmuhurta = []
+    for i, offset in enumerate(DURMUHURTA_OFFSETS[weekday]):
+        if offset != 0.0:
+            base, length = (sunset, night_length) if weekday == 2 and i == 1 else (sunrise, day_length)
+            start = base + length * offset / 12
+            durmuhurta.append((start, start + day_length * 0.8 / 12))
+
+    night_muhurta = night_length / 15.0
+    moon = {}
+    for name, fn in (("moonrise", drik.moonrise), ("moonset", drik.moonset)):
+        try:
+            moon[name] = fn(jd, place)[0]
+        except Exception:
+            moon[name] = None
+
+    return {
+        "weekday": weekday,
+        "sunrise": sunrise,
+        "sunset": sunset,
+        "next_sunrise": next_sunrise,
+        "day_length": day_length,
+        "night_length": night_length,
+        **moon,
+        **periods,
+        "durmuhurta": durmuhurta,
+        "abhijit_muhurta": (sunrise + 7 / 15 * day_length, sunrise + 8 / 15 * day_length),
+        "brahma_muhurta": (sunrise - 2 * night_muhurta, sunrise - night_muhurta)
+    }
+
+
+def day_timetable(jd: float, place: drik.Place) -> Dict:
+    """
+    Timetable of the date of `jd` at `place`, cached per (date, rounded latitude/longitude, timezone)
+
+    The timetable is calculated for the rounded coordinates
+    (PYJHORA_TIMETABLE_DECIMALS, 0.01 degrees = about 1km by default) so
+    every request within the same cell gets the same, reusable result.
+    """
+    decimals = timetable_decimals()
+    _, latitude, longitude, timezone_offset = place
+    cell = drik.Place(place[0], round(latitude, decimals), round(longitude, decimals), timezone_offset)
+    key = cache_key("day_timetable", drik.jd_to_gregorian(jd)[:3], cell.latitude, cell.longitude, timezone_offset)
+    cache = timetable_cache()
+    found, timetable = cache.get(key)
+    if not found:
+        timetable = build_day_timetable(jd, cell)
+        cache.set(key, timetable)
+    return timetable
+
+
+def clock_range(period: Tuple[float, float]) -> str:
+    return f"{clock(period[0])} - {clock(period[1])}"
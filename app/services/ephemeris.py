@@ -0,0 +1,133 @@
+"""Planetary longitude/speed series sampled over a time range"""
+
+import asyncio
+import base64
+import csv
+import io
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.cache import cache_key
+from app.services.calculator import NAKSHATRA_NAMES, PLANET_NAMES, SIGN_NAMES
+from app.services.ephemeris_store import KETU, RAHU, sidereal_positions
+from app.services.executor import fan_out_slots, run_cached
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_TIMELINE_MAX_SAMPLES = 100000
+DEFAULT_TIMELINE_CHUNK = 1000
+
+# Largest longitude error in degrees accepted from the ephemeris store (output has 6 decimals)
+TIMELINE_TOLERANCE = 1e-6
+
+TIMELINE_FORMATS = ("json", "csv", "binary")
+
+ONE_NAKSHATRA = 360 / 27
+ONE_PADA = ONE_NAKSHATRA / 4
+
+# Little-endian dtypes of the columns in the binary format
+COLUMN_DTYPES = {"longitude": "<f8", "speed": "<f8", "sign": "u1", "nakshatra": "u1", "pada": "u1", "retrograde": "u1"}
+
+
+def timeline_max_samples() -> int:
+    """Largest number of samples (per planet) accepted in one timeline request"""
+    return int(os.getenv("PYJHORA_TIMELINE_MAX_SAMPLES", DEFAULT_TIMELINE_MAX_SAMPLES))
+
+
+def timeline_chunk_size() -> int:
+    """Samples calculated per pool task"""
+    return int(os.getenv("PYJHORA_TIMELINE_CHUNK", DEFAULT_TIMELINE_CHUNK))
+
+
+def timeline_samples(start: str, end: str, step_minutes: float) -> int:
+    """Number of samples from `start` to at most `end` (ISO local times), `step_minutes` apart"""
+    minutes = (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds() / 60
+    return int(minutes // step_minutes) + 1
+
+
+def planet_indices(names: Optional[List[str]]) -> Tuple[int, ...]:
+    """Planets 0-8 for the given names (all nine when empty), in Sun-to-Ketu order"""
+    if not names:
+        return tuple(range(9))
+    lookup = {PLANET_NAMES[i].lower(): i for i in range(9)}
+    unknown = [name for name in names if name.strip().lower() not in lookup]
+    if unknown:
+        raise ValueError(f"Unknown planets {unknown}; use {[PLANET_NAMES[i] for i in range(9)]}")
+    return tuple(sorted({lookup[name.strip().lower()] for name in names}))
+
+
+def calculate_timeline_chunk(start_jd_utc: float, step_days: float, count: int, planets: Tuple[int, ...],
+                             ayanamsa: str) -> Dict[int, np.ndarray]:
+    """Series of each planet for `count` samples from `start_jd_utc` (executed inside a worker)"""
+    jd_utc = start_jd_utc + step_days * np.arange(count)
+    series = {}
+    with ayanamsa_guard.use(ayanamsa):
+        for planet in planets:
+            if planet == KETU:
+                rahu = series[RAHU] if RAHU in series else sidereal_positions(jd_utc, RAHU, TIMELINE_TOLERANCE)
+                series[KETU] = np.stack([(rahu[0] + 180) % 360, rahu[1]])
+            else:
+                series[planet] = sidereal_positions(jd_utc, planet, TIMELINE_TOLERANCE)
+    return series
+
+
+async def calculate_timeline(start_jd_utc: float, step_days: float, count: int, planets: Tuple[int, ...],
+                             ayanamsa: str) -> Tuple[Dict[int, np.ndarray], int]:
+    """
+    Series of each planet over `count` samples, calculated in pool-sized chunks
+
+    Each chunk is one pool task and one result-cache entry; at most one
+    chunk per pool worker is in flight across all requests. Returns the
+    series and the number of chunks.
+    """
+    chunk_size = timeline_chunk_size()
+    slots = fan_out_slots()
+
+    async def run_chunk(first: int):
+        start, size = start_jd_utc + first * step_days, min(chunk_size, count - first)
+        key = cache_key("transit_timeline", ayanamsa, planets, start, step_days, size)
+        return await run_cached(key, calculate_timeline_chunk, start, step_days, size, planets, ayanamsa, slots=slots)
+
+    pieces = await asyncio.gather(*(run_chunk(first) for first in range(0, count, chunk_size)))
+    return {planet: np.concatenate([piece[planet] for piece in pieces], axis=1) for planet in planets}, len(pieces)
+
+
+def timeline_columns(series: np.ndarray) -> Dict[str, np.ndarray]:
+    """Longitude and speed with the sign (1-12), nakshatra (1-27), pada (1-4) and retrograde flag derived from them"""
+    longitudes, speeds = series
+    return {
+        "longitude": longitudes,
+        "speed": speeds,
+        "sign": np.minimum(longitudes // 30, 11).astype(np.uint8) + 1,
+        "nakshatra": np.minimum(longitudes // ONE_NAKSHATRA, 26).astype(np.uint8) + 1,
+        "pada": np.minimum((longitudes % ONE_NAKSHATRA) // ONE_PADA, 3).astype(np.uint8) + 1,
+        "retrograde": speeds < 0
+    }
+
+
+def encode_column(name: str, values: np.ndarray, fmt: str):
+    """A column as a JSON list (floats to 6 decimals), or base64 of its COLUMN_DTYPES bytes for "binary" """
+    if fmt == "binary":
+        return base64.b64encode(np.ascontiguousarray(values, dtype=COLUMN_DTYPES[name]).tobytes()).decode()
+    if values.dtype.kind == "f":
+        return np.round(values, 6).tolist()
+    return values.tolist()
+
+
+def timeline_csv(times: np.ndarray, jd_utc: np.ndarray, series: Dict[int, np.ndarray]) -> str:
+    """One row per sample and planet, in time order"""
+    columns = {planet: timeline_columns(values) for planet, values in series.items()}
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(["time", "jd_utc", "planet", "longitude", "speed", "sign", "nakshatra", "pada", "retrograde"])
+    for i, (time, jd) in enumerate(zip(times.tolist(), jd_utc.tolist())):
+        for planet, column in columns.items():
+            writer.writerow([
+                time, f"{jd:.6f}", PLANET_NAMES[planet], f"{column['longitude'][i]:.6f}", f"{column['speed'][i]:.6f}",
+                SIGN_NAMES[column["sign"][i] - 1], NAKSHATRA_NAMES[column["nakshatra"][i] - 1], column["pada"][i],
+                str(bool(column["retrograde"][i])).lower()
+            ])
+    return out.getvalue()
@@ -0,0 +1,388 @@
+"""
+Precomputed planetary ephemeris for fast sidereal longitude lookups
+
+The store holds Chebyshev segments of each planet's tropical longitude
+(true position, mean equinox of date) over a span of years, in one .npy
+file that every worker memory-maps, so the pages are shared by all
+processes on the host. Subtracting the mean ayanamsa gives exactly what
+drik.sidereal_longitude() calculates, within the store's error bound.
+
+Build it once per deployment (about half a minute for 1900-2100):
+
+    python -m app.services.ephemeris_store --span 1900-2100
+
+Without a store, or outside its span, positions come from Swiss Ephemeris.
+"""
+
+import argparse
+import logging
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+from math import ceil, floor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+from jhora import const
+from jhora.panchanga import drik
+from numpy.polynomial import chebyshev
+
+logger = logging.getLogger(__name__)
+
+# Bump when the file layout or the fitted quantity changes; older files are then ignored
+STORE_VERSION = 1
+DEFAULT_STORE_PATH = f"/tmp/pyjhora-ephemeris-v{STORE_VERSION}.npy"
+DEFAULT_STORE_SPAN = "1900-2100"
+DEFAULT_VERIFY_SAMPLES = 64
+# Seconds before a worker without a store looks for the file again
+STORE_RECHECK_SECONDS = 60
+
+# Swiss Ephemeris body of each planet 0-8 (Sun to Ketu); Ketu is derived from Rahu
+EPHEMERIS_BODIES = [const._SUN, const._MOON, const._MARS, const._MERCURY, const._JUPITER,
+                    const._VENUS, const._SATURN, const._RAHU, const._RAHU]
+RAHU, KETU = 7, 8
+
+# Segment length in days and Chebyshev degree of planets 0-7, for errors around 1e-8 degrees
+STORE_SEGMENTS = {0: (16, 10), 1: (4, 10), 2: (16, 12), 3: (8, 10), 4: (16, 8), 5: (16, 12), 6: (16, 8), 7: (128, 8)}
+STORE_COLUMNS = 16
+HEADER_ROWS = 1 + len(STORE_SEGMENTS)
+
+# Without nutation, longitudes are smooth enough for long segments; the mean ayanamsa
+# (same flags) then gives the sidereal longitude PyJHora calculates with FLG_SIDEREAL
+TROPICAL_FLAGS = swe.FLG_SWIEPH | swe.FLG_TRUEPOS | swe.FLG_SPEED | swe.FLG_NONUT
+AYANAMSA_FLAGS = swe.FLG_SWIEPH | swe.FLG_TRUEPOS | swe.FLG_NONUT
+
+# Modes for which PyJHora does not set the Swiss Ephemeris mode itself
+UNSTORED_AYANAMSA_MODES = ("SIDM_USER", "SENTHIL", "SUNDAR_SS", "KP-SENTHIL")
+
+# Measured errors are doubled for the bound, since they are sampled at three points per segment;
+# the floor covers the conversion to sidereal longitudes
+ERROR_MARGIN = 2.0
+MIN_ERROR_BOUND = 1e-9
+AYANAMSA_GRID_DAYS = 1.0
+# Grid points of the ayanamsa kept per process for single lookups
+AYANAMSA_CACHE_SIZE = 4096
+
+
+def planet_series(jd_utc: np.ndarray, planet: int) -> np.ndarray:
+    """
+    Sidereal longitudes and daily speeds of `planet` (0-8) at each of `jd_utc`, shape (2, n)
+
+    One calc_ut per sample returns both the longitude and the speed (drik
+    calls it once for each). The ayanamsa mode is set once for the whole
+    series instead of per call; longitudes are the same as
+    drik.sidereal_longitude() gives.
+    """
+    if planet == KETU:
+        rahu = planet_series(jd_utc, RAHU)
+        return np.stack([(rahu[0] + 180) % 360, rahu[1]])
+    values = np.empty((2, len(jd_utc)))
+    body = EPHEMERIS_BODIES[planet]
+    if const._TROPICAL_MODE:
+        flags = swe.FLG_SWIEPH | swe.FLG_SPEED
+    else:
+        flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL | drik._rise_flags
+        drik.set_ayanamsa_mode(const._DEFAULT_AYANAMSA_MODE, drik._ayanamsa_value, float(jd_utc[0]))
+    try:
+        for i, jd in enumerate(jd_utc.tolist()):
+            position, _ = swe.calc_ut(jd, body, flags=flags)
+            values[0, i] = position[0]
+            values[1, i] = position[3]
+    finally:
+        if not const._TROPICAL_MODE:
+            drik.reset_ayanamsa_mode()
+    values[0] %= 360
+    return values
+
+
+def tropical_series(jd_utc: np.ndarray, planet: int) -> np.ndarray:
+    """Tropical longitudes (mean equinox of date) and speeds of `planet` (0-7) from Swiss Ephemeris, shape (2, n)"""
+    values = np.empty((2, len(jd_utc)))
+    for i, jd in enumerate(jd_utc.tolist()):
+        position, _ = swe.calc_ut(jd, EPHEMERIS_BODIES[planet], flags=TROPICAL_FLAGS)
+        values[0, i] = position[0]
+        values[1, i] = position[3]
+    return values
+
+
+def chebyshev_nodes(degree: int) -> np.ndarray:
+    """Chebyshev points of the first kind on [-1, 1], ascending"""
+    return np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))[::-1]
+
+
+def parse_span(span: str) -> Tuple[float, float]:
+    """Julian days (UT) of 1 January of the first and last year of "YYYY-YYYY" """
+    first, last = (int(year) for year in span.split("-"))
+    if last <= first:
+        raise ValueError(f"Invalid ephemeris span {span!r}, expected e.g. 1900-2100")
+    return swe.julday(first, 1, 1, 0.0), swe.julday(last, 1, 1, 0.0)
+
+
+class EphemerisStore:
+    """
+    Chebyshev segments of the tropical longitude of planets 0-7 (Sun to Rahu)
+
+    `table` is a float64 array of STORE_COLUMNS columns: row 0 holds
+    (version, start jd, end jd), row 1 + planet holds (segment days,
+    degree, first row, segments, longitude error bound, speed error bound)
+    and the remaining rows the coefficients of one segment each, fitted to
+    the unwrapped longitude over x in [-1, 1].
+    """
+
+    def __init__(self, table: np.ndarray, source: str = "built"):
+        if table.ndim != 2 or table.shape[1] != STORE_COLUMNS or int(table[0, 0]) != STORE_VERSION:
+            raise ValueError("Not an ephemeris store of this version")
+        self.table = table
+        self.start_jd, self.end_jd = float(table[0, 1]), float(table[0, 2])
+        self.layout = {planet: tuple(table[1 + planet, :6].tolist()) for planet in STORE_SEGMENTS}
+        self.source = source
+
+    @classmethod
+    def build(cls, start_jd: float, end_jd: float) -> "EphemerisStore":
+        """Fit every planet's segments and measure their error at each segment's ends and middle"""
+        header = np.zeros((HEADER_ROWS, STORE_COLUMNS))
+        header[0, :3] = STORE_VERSION, start_jd, end_jd
+        blocks = [header]
+        first_row = HEADER_ROWS
+        for planet, (days, degree) in STORE_SEGMENTS.items():
+            segments = ceil((end_jd - start_jd) / days)
+            starts = start_jd + days * np.arange(segments)
+            nodes = chebyshev_nodes(degree)
+            times = starts[:, None] + (nodes + 1) / 2 * days
+            longitudes = tropical_series(times.ravel(), planet)[0].reshape(times.shape)
+            coefficients = np.unwrap(longitudes, period=360, axis=1) @ np.linalg.inv(chebyshev.chebvander(nodes, degree)).T
+            block = np.zeros((segments, STORE_COLUMNS))
+            block[:, :degree + 1] = coefficients
+
+            checks = np.concatenate([starts, starts + days / 2, [starts[-1] + days]])
+            expected = tropical_series(checks, planet)
+            rows = np.concatenate([np.arange(segments), np.arange(segments), [segments - 1]])
+            x = np.concatenate([np.full(segments, -1.0), np.zeros(segments), [1.0]])
+            longitude, derivative = clenshaw(list(block[rows, :degree + 1].T), x)
+            speed = derivative * 2 / days
+            error = np.abs((longitude - expected[0] + 180) % 360 - 180).max()
+            speed_error = np.abs(speed - expected[1]).max()
+            header[1 + planet, :6] = (days, degree, first_row, segments, max(error * ERROR_MARGIN, MIN_ERROR_BOUND),
+                                      speed_error * ERROR_MARGIN)
+            blocks.append(block)
+            first_row += segments
+        return cls(np.concatenate(blocks))
+
+    @classmethod
+    def load(cls, path: str) -> Optional["EphemerisStore"]:
+        """Memory-mapped store saved by `save`, or None if missing or of another version"""
+        try:
+            return cls(np.load(path, mmap_mode="r"), source="loaded")
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def save(self, path: str):
+        tmp = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, np.asarray(self.table))
+        os.replace(tmp, path)
+
+    def error_bound(self, planet: int) -> float:
+        """Largest longitude error in degrees of `planet` (0-8)"""
+        return self.layout[min(planet, RAHU)][4]
+
+    def tropical(self, jd_utc: np.ndarray, planet: int) -> np.ndarray:
+        """Tropical longitudes (mean equinox of date) and daily speeds of `planet` (0-8), shape (2, n)"""
+        days, degree, first_row, segments = self.layout[min(planet, RAHU)][:4]
+        offsets = (np.asarray(jd_utc, dtype=np.float64) - self.start_jd) / days
+        index = np.minimum(offsets.astype(np.int64), int(segments) - 1)
+        coefficients = self.table[int(first_row) + index, :int(degree) + 1]
+        longitude, derivative = clenshaw(list(coefficients.T), 2 * (offsets - index) - 1)
+        if planet == KETU:
+            longitude = longitude + 180
+        return np.stack([longitude % 360, derivative * 2 / days])
+
+    def tropical_at(self, jd_utc: float, planet: int) -> Tuple[float, float]:
+        """Same as `tropical` for one instant, without array overhead"""
+        days, degree, first_row, segments = self.layout[min(planet, RAHU)][:4]
+        offset = (jd_utc - self.start_jd) / days
+        index = min(int(offset), int(segments) - 1)
+        longitude, derivative = clenshaw(self.table[int(first_row) + index, :int(degree) + 1].tolist(), 2 * (offset - index) - 1)
+        if planet == KETU:
+            longitude += 180
+        return longitude % 360, derivative * 2 / days
+
+    def verify(self, samples: int) -> Dict[int, float]:
+        """Check `samples` random lookups against Swiss Ephemeris; returns the planets exceeding their bound"""
+        failures = {}
+        for _ in range(samples):
+            planet = random.choice(list(STORE_SEGMENTS))
+            jd = np.array([random.uniform(self.start_jd, self.end_jd)])
+            error = abs((self.tropical_at(jd[0], planet)[0] - tropical_series(jd, planet)[0, 0] + 180) % 360 - 180)
+            if error > self.error_bound(planet):
+                failures[planet] = max(error, failures.get(planet, 0.0))
+        return failures
+
+    def info(self) -> Dict:
+        return {
+            "version": STORE_VERSION,
+            "source": self.source,
+            "span": [drik.jd_to_gregorian(self.start_jd)[0], drik.jd_to_gregorian(self.end_jd)[0]],
+            "bytes": int(self.table.nbytes),
+            "error_bounds": {planet: self.error_bound(planet) for planet in STORE_SEGMENTS}
+        }
+
+
+def clenshaw(coefficients: List, x):
+    """Value and derivative in x of the Chebyshev series with `coefficients` (floats, or arrays for many series)"""
+    b1 = b2 = d1 = d2 = 0.0
+    for c in reversed(coefficients[1:]):
+        b1, b2, d1, d2 = 2 * x * b1 - b2 + c, b1, 2 * b1 + 2 * x * d1 - d2, d1
+    return x * b1 - b2 + coefficients[0], b1 + x * d1 - d2
+
+
+_store: Optional[EphemerisStore] = None
+_store_checked = -STORE_RECHECK_SECONDS
+_store_lock = threading.Lock()
+
+
+def store_path() -> str:
+    return os.getenv("PYJHORA_EPHEMERIS_STORE", DEFAULT_STORE_PATH)
+
+
+def store_enabled() -> bool:
+    return os.getenv("PYJHORA_EPHEMERIS_STORE_ENABLED", "1") != "0"
+
+
+def ephemeris_store() -> Optional[EphemerisStore]:
+    """
+    Store of this process, memory-mapped on first use; None if there is none
+
+    A store that fails the check of PYJHORA_EPHEMERIS_VERIFY random lookups
+    is not used. Without a store the file is looked for again every
+    STORE_RECHECK_SECONDS, so one built while the service runs is picked up.
+    """
+    global _store, _store_checked
+    if not store_enabled():
+        return None
+    with _store_lock:
+        if _store is None and time.monotonic() - _store_checked >= STORE_RECHECK_SECONDS:
+            _store_checked = time.monotonic()
+            store = EphemerisStore.load(store_path())
+            if store is not None:
+                failures = store.verify(int(os.getenv("PYJHORA_EPHEMERIS_VERIFY", DEFAULT_VERIFY_SAMPLES)))
+                if failures:
+                    logger.warning("Ephemeris store %s exceeds its error bounds %s, not using it", store_path(), failures)
+                    store = None
+            _store = store
+        return _store
+
+
+def store_stats() -> Dict:
+    """
+    Path and, when one is in use, span, size and error bounds of this process's store
+
+    Reports the store as last looked up (at startup or by a calculation)
+    without loading it, so /health never maps and verifies the file.
+    """
+    store = _store if store_enabled() else None
+    return {"path": store_path(), "loaded": store is not None, **(store.info() if store else {})}
+
+
+def mean_ayanamsa(jd_utc: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ayanamsa of PyJHora's current mode without nutation, and its daily rate, at each of `jd_utc`
+
+    It changes slowly, so it is calculated on a grid of at most
+    AYANAMSA_GRID_DAYS and interpolated (within 1e-9 degrees even for the
+    star-based modes). Instants sparser than the grid take the mean and
+    difference of the values half a day either side instead.
+    """
+    first, last = float(np.min(jd_utc)) - 0.5, float(np.max(jd_utc)) + 0.5
+    points = ceil((last - first) / AYANAMSA_GRID_DAYS) + 1
+    drik.set_ayanamsa_mode(const._DEFAULT_AYANAMSA_MODE, drik._ayanamsa_value, first)
+    try:
+        if points > 2 * len(jd_utc):
+            before, after = (np.array([swe.get_ayanamsa_ex_ut(jd + offset, AYANAMSA_FLAGS)[1] for jd in jd_utc.tolist()])
+                             for offset in (-0.5, 0.5))
+            return (before + after) / 2, after - before
+        grid = np.linspace(first, last, points)
+        values = np.array([swe.get_ayanamsa_ex_ut(jd, AYANAMSA_FLAGS)[1] for jd in grid.tolist()])
+    finally:
+        drik.reset_ayanamsa_mode()
+    rates = np.diff(values) / np.diff(grid)
+    return np.interp(jd_utc, grid, values), rates[np.clip(np.searchsorted(grid, jd_utc) - 1, 0, len(rates) - 1)]
+
+
+@lru_cache(maxsize=AYANAMSA_CACHE_SIZE)
+def grid_ayanamsa(mode: str, jd_utc: float) -> float:
+    """
+    Ayanamsa of `mode` without nutation at a point of the AYANAMSA_GRID_DAYS grid
+
+    Cached, since single lookups come planet by planet for the same instant.
+    Only used for modes the store serves, whose value depends on the date alone.
+    """
+    drik.set_ayanamsa_mode(mode, drik._ayanamsa_value, jd_utc)
+    try:
+        return swe.get_ayanamsa_ex_ut(jd_utc, AYANAMSA_FLAGS)[1]
+    finally:
+        drik.reset_ayanamsa_mode()
+
+
+def usable_store(planet: int, tolerance: float) -> Optional[EphemerisStore]:
+    """The store, if it may serve `planet` in the current mode with an error within `tolerance` degrees"""
+    store = ephemeris_store()
+    if (store is None or const._TROPICAL_MODE or const._DEFAULT_AYANAMSA_MODE in UNSTORED_AYANAMSA_MODES
+            or tolerance < store.error_bound(planet)):
+        return None
+    return store
+
+
+def sidereal_positions(jd_utc: np.ndarray, planet: int, tolerance: float = 0.0) -> np.ndarray:
+    """
+    Sidereal longitudes and daily speeds of `planet` (0-8) at each of `jd_utc`, shape (2, n)
+
+    Read from the ephemeris store for the instants it covers, when its
+    error bound is within `tolerance` degrees; calculated with Swiss
+    Ephemeris (planet_series) otherwise, so the default tolerance of 0
+    always gives PyJHora's values.
+    """
+    store = usable_store(planet, tolerance)
+    covered = store is not None and (jd_utc >= store.start_jd) & (jd_utc <= store.end_jd)
+    if not np.any(covered):
+        return planet_series(jd_utc, planet)
+    if not np.all(covered):
+        values = np.empty((2, len(jd_utc)))
+        values[:, covered] = sidereal_positions(jd_utc[covered], planet, tolerance)
+        values[:, ~covered] = planet_series(jd_utc[~covered], planet)
+        return values
+    longitudes, speeds = store.tropical(jd_utc, planet)
+    ayanamsa, ayanamsa_rate = mean_ayanamsa(jd_utc)
+    return np.stack([(longitudes - ayanamsa) % 360, speeds - ayanamsa_rate])
+
+
+def sidereal_position(jd_utc: float, planet: int, tolerance: float = 0.0) -> Tuple[float, float]:
+    """Sidereal longitude and daily speed of `planet` (0-8) at one instant, as sidereal_positions()"""
+    store = usable_store(planet, tolerance)
+    if store is None or not store.start_jd <= jd_utc <= store.end_jd:
+        longitude, speed = planet_series(np.array([jd_utc]), planet)[:, 0].tolist()
+        return longitude, speed
+    longitude, speed = store.tropical_at(jd_utc, planet)
+    # Interpolated between the grid points either side, like mean_ayanamsa()
+    first = floor(jd_utc / AYANAMSA_GRID_DAYS) * AYANAMSA_GRID_DAYS
+    before, after = (grid_ayanamsa(const._DEFAULT_AYANAMSA_MODE, jd) for jd in (first, first + AYANAMSA_GRID_DAYS))
+    rate = (after - before) / AYANAMSA_GRID_DAYS
+    return (longitude - before - rate * (jd_utc - first)) % 360, speed - rate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.services.ephemeris_store",
+                                     description="Build the precomputed ephemeris store.")
+    parser.add_argument("--span", default=os.getenv("PYJHORA_EPHEMERIS_SPAN", DEFAULT_STORE_SPAN),
+                        help=f"Years covered, e.g. 1900-2100 (default: PYJHORA_EPHEMERIS_SPAN or {DEFAULT_STORE_SPAN})")
+    parser.add_argument("--path", default=store_path(),
+                        help="Output file (default: PYJHORA_EPHEMERIS_STORE or " + DEFAULT_STORE_PATH + ")")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    store = EphemerisStore.build(*parse_span(args.span))
+    store.save(args.path)
+    print(f"Saved {args.path} ({store.info()['bytes']} bytes) in {time.perf_counter() - started:.1f}s")
+    for planet, bound in store.info()["error_bounds"].items():
+        print(f"  planet {planet}: error below {bound:.1e} degrees")
@@ -0,0 +1,426 @@
+"""Process pool execution layer for PyJHora calculations"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import weakref
+from contextlib import nullcontext
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.cache import result_cache, request_cache_status, canonical_birth_data, cache_key
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_START_METHOD = "spawn"
+DEFAULT_EXECUTOR = "process"
+
+
+class CalculationPoolError(Exception):
+    """Base error for calculations that could not be run by the pool"""
+    status_code = 503
+
+
+class PoolSaturatedError(CalculationPoolError):
+    """Raised when the pool queue is full and the task is rejected"""
+    status_code = 503
+
+
+class CalculationTimeoutError(CalculationPoolError):
+    """Raised when a calculation exceeds the per-task timeout"""
+    status_code = 504
+
+
+def warm_worker():
+    """Import PyJHora and load the ephemeris store once per worker process so the first task is not slowed down"""
+    import app.services.calculator  # noqa: F401
+    from app.services.ephemeris_store import ephemeris_store
+
+    ephemeris_store()
+
+
+def invoke_calculator(birth_data: Dict, ayanamsa: str, method: str, args: tuple = (), kwargs: Optional[Dict] = None):
+    """Build a calculator and run one of its calculate_* methods (executed inside a worker)"""
+    from app.services.calculator import PyJHoraCalculator
+
+    with ayanamsa_guard.use(ayanamsa):
+        calculator = PyJHoraCalculator(birth_data, ayanamsa)
+        return getattr(calculator, method)(*args, **(kwargs or {}))
+
+
+def invoke_calculator_methods(birth_data: Dict, ayanamsa: str, calls: List[Tuple[str, tuple, Dict]]
+                             ) -> Tuple[List[Tuple[bool, Any]], Dict[str, int]]:
+    """
+    Run several calculate_* methods on one calculator (executed inside a worker)
+
+    The methods share the calculator's memoized D1 chart. Returns (True,
+    result) or (False, error message) per call, and the PyJHora calls made.
+    """
+    from app.services.calculator import PyJHoraCalculator
+
+    outcomes = []
+    with ayanamsa_guard.use(ayanamsa):
+        calculator = PyJHoraCalculator(birth_data, ayanamsa)
+        for method, args, kwargs in calls:
+            try:
+                outcomes.append((True, getattr(calculator, method)(*args, **kwargs)))
+            except Exception as e:
+                outcomes.append((False, str(e)))
+    return outcomes, dict(calculator.ephemeris_calls)
+
+
+def invoke_calculator_batch(items: List[Dict], ayanamsa: str, method: str, args: tuple = (),
+                            kwargs: Optional[Dict] = None) -> List[Tuple[bool, Any]]:
+    """
+    Run one calculate_* method for many births (executed inside a worker)
+
+    Returns (True, result) or (False, error message) per item, so one bad
+    record does not fail the rest of the chunk.
+    """
+    from app.services.calculator import PyJHoraCalculator
+
+    outcomes = []
+    with ayanamsa_guard.use(ayanamsa):
+        for birth_data in items:
+            try:
+                calculator = PyJHoraCalculator(birth_data, ayanamsa)
+                outcomes.append((True, getattr(calculator, method)(*args, **(kwargs or {}))))
+            except Exception as e:
+                outcomes.append((False, str(e)))
+    return outcomes
+
+
+def guarded_call(ayanamsa: str, fn: Callable, *args):
+    """Run `fn(*args)` while holding `ayanamsa` as the active mode (executed inside a worker)"""
+    with ayanamsa_guard.use(ayanamsa):
+        return fn(*args)
+
+
+class CalculationPool:
+    """
+    Bounded process pool for CPU-bound PyJHora work
+
+    Keeps the event loop free for I/O and health checks. Tasks beyond
+    `max_queue` (running + waiting) are rejected instead of piling up,
+    and each task is bounded by `timeout` seconds; a task that times out
+    keeps counting towards `max_queue` until its worker has finished it
+    (reported as abandoned). The "thread" executor
+    runs calculations in-process; ayanamsa_guard keeps their modes apart.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 timeout: Optional[float] = None, start_method: Optional[str] = None,
+                 executor: Optional[str] = None):
+        self.workers = workers or int(os.getenv("PYJHORA_POOL_WORKERS", DEFAULT_WORKERS))
+        self.max_queue = max_queue or int(os.getenv("PYJHORA_POOL_MAX_QUEUE", DEFAULT_MAX_QUEUE))
+        self.timeout = timeout or float(os.getenv("PYJHORA_POOL_TIMEOUT", DEFAULT_TIMEOUT))
+        self.start_method = start_method or os.getenv("PYJHORA_POOL_START_METHOD", DEFAULT_START_METHOD)
+        self.executor_type = executor or os.getenv("PYJHORA_POOL_EXECUTOR", DEFAULT_EXECUTOR)
+        if self.executor_type not in ("process", "thread"):
+            raise ValueError(f"Unsupported pool executor: {self.executor_type}")
+
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        # Timed-out tasks still running in a worker (they count towards max_queue until they finish)
+        self._abandoned: Set[Future] = set()
+
+    def _get_executor(self) -> Executor:
+        """Create the executor lazily so each gunicorn worker owns its own pool"""
+        with self._lock:
+            if self._executor is None and self.executor_type == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pyjhora")
+            elif self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=warm_worker
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: Executor):
+        """Forget a broken executor so the next task starts a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _task_done(self, future: Future):
+        """Free the queue slot of a task once its worker is done with it"""
+        with self._lock:
+            self._pending -= 1
+            self._abandoned.discard(future)
+
+    async def submit(self, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` in the pool and await its result"""
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self._rejected += 1
+                raise PoolSaturatedError(
+                    f"Calculation pool is saturated ({self._pending}/{self.max_queue} tasks), retry shortly"
+                )
+            self._pending += 1
+
+        executor = None
+        try:
+            executor = self._get_executor()
+            future = executor.submit(fn, *args)
+        except BaseException as e:
+            with self._lock:
+                self._pending -= 1
+            if isinstance(e, BrokenProcessPool):
+                self._discard_executor(executor)
+                with self._lock:
+                    self._failed += 1
+                raise CalculationPoolError("Calculation worker crashed, please retry")
+            raise
+        # The slot is held until the task finishes, not until its caller stops waiting
+        future.add_done_callback(self._task_done)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM kill); replace the pool for subsequent tasks
+            self._discard_executor(executor)
+            with self._lock:
+                self._failed += 1
+            raise CalculationPoolError("Calculation worker crashed, please retry")
+        except asyncio.TimeoutError:
+            # A running task cannot be interrupted; it keeps its worker busy in the background
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+                if not future.done():
+                    self._abandoned.add(future)
+            raise CalculationTimeoutError(f"Calculation exceeded the {self.timeout:g}s time limit")
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        with self._lock:
+            self._completed += 1
+        return result
+
+    def stats(self) -> Dict:
+        """Pool configuration, current load and lifetime counters"""
+        with self._lock:
+            running = min(self._pending, self.workers)
+            return {
+                "executor": self.executor_type,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout,
+                "running": running,
+                "queued": self._pending - running,
+                "abandoned": len(self._abandoned),
+                "saturation": round(self._pending / self.max_queue, 3),
+                "saturated": self._pending >= self.max_queue,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out
+            }
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+calculation_pool = CalculationPool()
+
+class FanOutSlots:
+    """
+    Chunks of fanned-out requests allowed in flight at once, shared by all of them
+
+    One slot per pool worker, however many requests split their range into
+    chunks, so concurrent large requests cannot fill the queue between
+    them. Waiting for a slot is bounded by the pool timeout, after which
+    the chunk is rejected like a task arriving at a full queue.
+    """
+
+    def __init__(self, size: int):
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def __aenter__(self):
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=calculation_pool.timeout)
+        except asyncio.TimeoutError:
+            raise PoolSaturatedError(
+                f"No calculation slot became free within {calculation_pool.timeout:g}s, retry shortly"
+            )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+
+_fan_out_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, FanOutSlots]" = weakref.WeakKeyDictionary()
+
+
+def fan_out_slots() -> FanOutSlots:
+    """The fan-out slots of the running event loop (asyncio primitives are bound to the loop they first wait on)"""
+    loop = asyncio.get_running_loop()
+    slots = _fan_out_slots.get(loop)
+    if slots is None:
+        slots = _fan_out_slots[loop] = FanOutSlots(calculation_pool.workers)
+    return slots
+
+# Methods whose "current period" depends on an as_of date that defaults to today
+DATE_DEPENDENT_METHODS = {"calculate_dasha", "calculate_dasha_bhukti"}
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calculations of the same canonical key
+
+    The first request starts the calculation as its own task; identical
+    requests arriving while it runs await that task instead of queueing
+    duplicates in the pool. A caller disconnecting does not cancel the
+    calculation for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def joinable(self, key: str) -> bool:
+        """True if a calculation for `key` is already running"""
+        return key in self._in_flight
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the running calculation for `key`, or start `compute()` as it"""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            self.started += 1
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter has gone away
+
+    def stats(self) -> Dict:
+        """Calculations running now and lifetime coalescing counters"""
+        return {
+            "in_flight": len(self._in_flight),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
+
+
+single_flight = SingleFlight()
+
+
+async def run_cached(key: str, fn: Callable, *args, slots: Optional[FanOutSlots] = None) -> Any:
+    """
+    Return the cached result for `key`, or run `fn(*args)` in the pool and cache it
+
+    With `slots` the pool task waits for a fan-out slot; cache lookups and
+    requests joining a running calculation do not take one.
+    """
+    status = request_cache_status.get()
+    if status is None or not status.bypass:
+        found, value = await result_cache.aget(key)
+        if found:
+            if status is not None:
+                status.hits += 1
+            return value
+    if status is not None:
+        if single_flight.joinable(key):
+            status.coalesced += 1
+        elif not status.bypass:
+            status.misses += 1
+
+    async def compute():
+        async with slots or nullcontext():
+            value = await calculation_pool.submit(fn, *args)
+        await result_cache.aset(key, value)
+        return value
+
+    return await single_flight.run(key, compute)
+
+
+def calculation_key(birth_data: Dict, ayanamsa: str, method: str, args: tuple = (), kwargs: Optional[Dict] = None) -> str:
+    """Cache key of `PyJHoraCalculator(birth_data, ayanamsa).<method>(*args, **kwargs)`"""
+    return cache_key(method, canonical_birth_data(birth_data), ayanamsa, tuple(args), kwargs or {})
+
+
+def restamp_birth_data(result: Any, birth_data: Dict) -> Any:
+    """Echo this request's birth data in a result computed for an equivalent one (e.g. another place_name)"""
+    if isinstance(result, dict) and "birth_data" in result and result["birth_data"] != birth_data:
+        return {**result, "birth_data": birth_data}
+    return result
+
+
+def _pin_as_of(method: str, kwargs: Dict) -> Dict:
+    """Pin "today" before keying so the cached entry is only reused for the same date"""
+    if method in DATE_DEPENDENT_METHODS and kwargs.get("as_of") is None:
+        return {**kwargs, "as_of": date.today().isoformat()}
+    return kwargs
+
+
+async def calculate(birth_data: Dict, ayanamsa: str, method: str, *args, **kwargs) -> Any:
+    """Run `PyJHoraCalculator(birth_data, ayanamsa).<method>(*args, **kwargs)` in the pool, cached"""
+    kwargs = _pin_as_of(method, kwargs)
+    key = calculation_key(birth_data, ayanamsa, method, args, kwargs)
+    result = await run_cached(key, invoke_calculator, birth_data, ayanamsa, method, args, kwargs)
+    return restamp_birth_data(result, birth_data)
+
+
+async def calculate_many(birth_data: Dict, ayanamsa: str, calls: List[Tuple[str, tuple, Dict]]
+                         ) -> Tuple[List[Tuple[bool, Any]], Dict[str, int]]:
+    """
+    Run several calculator methods for one birth as a single pool task
+
+    Each result is cached under the same key `calculate()` uses, so it is
+    shared with the single-purpose endpoints. Only the uncached methods are
+    calculated, together on one calculator. Returns (True, result) or
+    (False, error message) per call, and the PyJHora calls made (empty
+    when every result was cached).
+    """
+    calls = [(method, tuple(args), _pin_as_of(method, kwargs)) for method, args, kwargs in calls]
+    keys = [calculation_key(birth_data, ayanamsa, method, args, kwargs) for method, args, kwargs in calls]
+    status = request_cache_status.get()
+    bypass = status is not None and status.bypass
+    outcomes = [(False, None)] * len(keys) if bypass else await result_cache.aget_many(keys)
+    missing = [index for index, (found, _) in enumerate(outcomes) if not found]
+    group = cache_key("calculate_many", *[keys[index] for index in missing])
+    if status is not None:
+        status.hits += len(keys) - len(missing)
+        if missing and single_flight.joinable(group):
+            status.coalesced += 1
+        elif not bypass:
+            status.misses += len(missing)
+
+    ephemeris_calls: Dict[str, int] = {}
+    if missing:
+        async def compute():
+            calculated, made = await calculation_pool.submit(
+                invoke_calculator_methods, birth_data, ayanamsa, [calls[index] for index in missing])
+            await result_cache.aset_many([(keys[index], value) for index, (ok, value) in zip(missing, calculated) if ok])
+            return calculated, made
+
+        calculated, ephemeris_calls = await single_flight.run(group, compute)
+        for index, outcome in zip(missing, calculated):
+            outcomes[index] = outcome
+    return [(ok, restamp_birth_data(value, birth_data) if ok else value) for ok, value in outcomes], ephemeris_calls
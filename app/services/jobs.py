@@ -0,0 +1,506 @@
+"""Persistent background jobs for bulk calculations"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from app.services.batch import batch_chunk_size, run_chunked, validate_birth_data
+from app.services.executor import calculation_pool
+from app.services.operations import invoke_operations_batch, operation_calls, operations_chunk_size
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for Parquet input/output
+    pa = pq = None
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, where every process runs jobs
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_JOBS_DIR = "/tmp/pyjhora-jobs"
+DEFAULT_JOB_CHUNK = 200
+DEFAULT_JOB_LEASE = 60.0
+DEFAULT_JOB_POLL_INTERVAL = 1.0
+DEFAULT_JOB_POOL_SHARE = 0.5
+
+INPUT_FORMATS = ("csv", "jsonl", "parquet")
+OUTPUT_FORMATS = ("jsonl", "parquet")
+BIRTH_FIELDS = ("date", "time", "timezone_offset", "latitude", "longitude", "place_name")
+
+
+class JobError(Exception):
+    """Raised for job submissions or lookups that cannot be served"""
+    status_code = 400
+
+
+class JobNotFoundError(JobError):
+    status_code = 404
+
+
+def detect_format(filename: Optional[str], declared: Optional[str] = None) -> str:
+    """Input format from the declared value or the file extension"""
+    fmt = (declared or os.path.splitext(filename or "")[1].lstrip(".")).lower()
+    fmt = {"ndjson": "jsonl", "json": "jsonl", "pq": "parquet"}.get(fmt, fmt)
+    if fmt not in INPUT_FORMATS:
+        raise JobError(f"Unsupported input format '{fmt}'; use {list(INPUT_FORMATS)}")
+    require_format(fmt)
+    return fmt
+
+
+def require_format(fmt: str):
+    """Fail early if a Parquet file is requested without pyarrow installed"""
+    if fmt == "parquet" and pq is None:
+        raise JobError("Parquet support requires the 'pyarrow' package")
+
+
+def iter_rows(f: TextIO, fmt: str) -> Iterator[Dict]:
+    """Stream rows as dicts from an open CSV or JSONL text stream"""
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+        return
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"__error__": f"Invalid JSON line - {e}"}
+
+
+def read_rows(path: str, fmt: str, skip: int = 0) -> Iterator[Dict]:
+    """Stream input rows as dicts, starting after the first `skip` rows"""
+    if fmt == "parquet":
+        rows = (row for batch in pq.ParquetFile(path).iter_batches() for row in batch.to_pylist())
+        yield from islice(rows, skip, None)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from islice(iter_rows(f, fmt), skip, None)
+
+
+def count_rows(path: str, fmt: str) -> int:
+    """Number of input rows (without reading them into memory)"""
+    if fmt == "parquet":
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            return sum(1 for _ in csv.DictReader(f))
+        return sum(1 for line in f if line.strip())
+
+
+def job_pool_slots() -> int:
+    """Pool workers a job may occupy at once; interactive requests keep the rest"""
+    share = float(os.getenv("PYJHORA_JOB_POOL_SHARE", DEFAULT_JOB_POOL_SHARE))
+    return max(1, int(calculation_pool.workers * share))
+
+
+def write_part(path: str, records: List[Dict], fmt: str):
+    """Write one chunk of results atomically, so a resumed job can simply overwrite it"""
+    tmp = f"{path}.tmp"
+    if fmt == "parquet":
+        pq.write_table(parquet_table(records), tmp)
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+    os.replace(tmp, path)
+
+
+def parquet_table(records: List[Dict]):
+    """Result records as a Parquet table; nested values are stored as JSON strings"""
+    columns = {
+        "row": [r["row"] for r in records],
+        "status": [r["status"] for r in records],
+        **{name: [json.dumps(r.get(name), default=str) for r in records]
+           for name in ("birth_data", "fields", "results", "errors")}
+    }
+    return pa.table(columns)
+
+
+def prepare_row(row: Dict) -> Dict:
+    """Split an input row into birth data and the caller's own columns"""
+    birth = {name: row[name] for name in BIRTH_FIELDS if row.get(name) not in (None, "")}
+    fields = {name: value for name, value in row.items() if name not in BIRTH_FIELDS}
+    return {"birth": birth, "fields": fields}
+
+
+def prepare_records(batch: List[Dict], first_row: int) -> Tuple[List[Dict], List[Dict], List[int]]:
+    """
+    Validate a chunk of input rows
+
+    Returns one result record per row, the valid births to calculate and
+    the position of each of those births in the records.
+    """
+    records, births, positions = [], [], []
+    for offset, row in enumerate(batch):
+        record = {"row": first_row + offset, "status": "success"}
+        if "__error__" in row:
+            record.update(status="error", errors={"input": row["__error__"]})
+        else:
+            prepared = prepare_row(row)
+            birth_data, error = validate_birth_data(prepared["birth"])
+            record.update(birth_data=birth_data or prepared["birth"])
+            if prepared["fields"]:
+                record["fields"] = prepared["fields"]
+            if error:
+                record.update(status="error", errors={"birth_data": error})
+            else:
+                births.append(birth_data)
+                positions.append(offset)
+        records.append(record)
+    return records, births, positions
+
+
+def complete_records(records: List[Dict], positions: List[int], outcomes: List[Tuple[Dict, Dict]]) -> List[Dict]:
+    """Merge the (results, errors) of invoke_operations_batch into the prepared records"""
+    for offset, (results, errors) in zip(positions, outcomes):
+        records[offset]["results"] = results
+        if errors:
+            records[offset].update(status="error", errors=errors)
+    return records
+
+
+class JobStore:
+    """
+    SQLite-backed job queue shared by every API process on the host
+
+    Each job's input and result parts live in their own directory next to
+    the database. A running job is owned by one runner that renews its
+    lease; a job whose lease expired (crashed worker) is claimed again and
+    resumes from its last checkpointed chunk.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv("PYJHORA_JOBS_DIR", DEFAULT_JOBS_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, "jobs.sqlite3")
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, created REAL NOT NULL, started REAL, finished REAL, "
+            "filename TEXT, input_format TEXT NOT NULL, output_format TEXT NOT NULL, total_rows INTEGER NOT NULL, "
+            "ayanamsa TEXT NOT NULL, operations TEXT NOT NULL, options TEXT NOT NULL, chunk_size INTEGER NOT NULL, "
+            "next_chunk INTEGER NOT NULL DEFAULT 0, processed_rows INTEGER NOT NULL DEFAULT 0, "
+            "failed_rows INTEGER NOT NULL DEFAULT 0, active_seconds REAL NOT NULL DEFAULT 0, "
+            "attempts INTEGER NOT NULL DEFAULT 0, owner TEXT, heartbeat REAL, error TEXT)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id)
+
+    def input_path(self, job: Dict) -> str:
+        return os.path.join(self.job_dir(job["id"]), f"input.{job['input_format']}")
+
+    def part_path(self, job: Dict, part: int) -> str:
+        return os.path.join(self.job_dir(job["id"]), f"results-{part:05d}.{job['output_format']}")
+
+    def new_job_dir(self) -> str:
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_dir(job_id))
+        return job_id
+
+    def create(self, job_id: str, filename: Optional[str], input_format: str, output_format: str,
+               total_rows: int, ayanamsa: str, operations: List[str], options: Dict, chunk_size: int) -> Dict:
+        self._connection().execute(
+            "INSERT INTO jobs (id, status, created, filename, input_format, output_format, total_rows, "
+            "ayanamsa, operations, options, chunk_size) VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, time.time(), filename, input_format, output_format, total_rows,
+             ayanamsa, json.dumps(operations), json.dumps(options), chunk_size)
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Dict:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFoundError(f"Job {job_id} not found")
+        return self._to_dict(row)
+
+    def list(self, limit: int = 50) -> List[Dict]:
+        rows = self._connection().execute("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,))
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["operations"] = json.loads(job["operations"])
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def claim(self, owner: str, lease: float) -> Optional[Dict]:
+        """Take the oldest queued job, or a running one whose owner stopped renewing its lease"""
+        now = time.time()
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' OR (status = 'running' AND heartbeat < ?) "
+                "ORDER BY created LIMIT 1", (now - lease,)
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, heartbeat = ?, started = COALESCE(started, ?), "
+                    "attempts = attempts + 1 WHERE id = ?", (owner, now, now, row["id"])
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return self.get(row["id"]) if row is not None else None
+
+    def renew(self, job_id: str, owner: str) -> bool:
+        """Extend the lease; False once the job was cancelled or claimed by another runner"""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET heartbeat = ? WHERE id = ? AND owner = ? AND status = 'running'",
+            (time.time(), job_id, owner)
+        )
+        return cursor.rowcount == 1
+
+    def checkpoint(self, job_id: str, owner: str, next_chunk: int, processed: int, failed: int, seconds: float) -> bool:
+        """Record a completed chunk; False if this runner no longer owns the job"""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET next_chunk = ?, processed_rows = processed_rows + ?, failed_rows = failed_rows + ?, "
+            "active_seconds = active_seconds + ?, heartbeat = ? "
+            "WHERE id = ? AND owner = ? AND status = 'running' AND next_chunk = ?",
+            (next_chunk, processed, failed, seconds, time.time(), job_id, owner, next_chunk - 1)
+        )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id: str, owner: str, status: str, error: Optional[str] = None):
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, finished = ?, error = ?, owner = NULL "
+            "WHERE id = ? AND owner = ? AND status = 'running'",
+            (status, time.time(), error, job_id, owner)
+        )
+
+    def cancel(self, job_id: str) -> Dict:
+        self.get(job_id)
+        self._connection().execute(
+            "UPDATE jobs SET status = 'cancelled', finished = ?, owner = NULL "
+            "WHERE id = ? AND status IN ('queued', 'running')", (time.time(), job_id)
+        )
+        return self.get(job_id)
+
+
+class JobRunner:
+    """
+    Background loop in each API process that claims and runs queued jobs
+
+    Only the process holding the runner lock of the jobs directory processes
+    jobs, so gunicorn workers do not all fill their pools with job chunks;
+    when it exits, another process takes the lock over at its next poll.
+    Rows are read in chunks of the job's chunk_size; each chunk is
+    calculated on a share of the pool, written as one result part and then
+    checkpointed, so at most one chunk is recomputed after a crash.
+    """
+
+    def __init__(self, store: JobStore, lease: Optional[float] = None, poll_interval: Optional[float] = None):
+        self.store = store
+        self.lease = lease or float(os.getenv("PYJHORA_JOB_LEASE", DEFAULT_JOB_LEASE))
+        self.poll_interval = poll_interval or float(os.getenv("PYJHORA_JOB_POLL_INTERVAL", DEFAULT_JOB_POLL_INTERVAL))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._lock_file: Optional[TextIO] = None
+
+    @property
+    def leader(self) -> bool:
+        """True while this runner holds the runner lock"""
+        return fcntl is None or self._lock_file is not None
+
+    def _lead(self) -> bool:
+        """Take the runner lock of the jobs directory if no other process holds it"""
+        if self.leader:
+            return True
+        f = open(os.path.join(self.store.directory, "runner.lock"), "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f
+        return True
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._lock_file is not None:
+            self._lock_file.close()  # releases the lock
+            self._lock_file = None
+
+    def notify(self):
+        """Look for work now instead of at the next poll"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run_forever(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim, self.owner, self.lease) if self._lead() else None
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+            if job is not None:
+                await self.run_job(job)
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _keep_lease(self, job_id: str, lost: asyncio.Event):
+        while not lost.is_set():
+            await asyncio.sleep(self.lease / 3)
+            if not await asyncio.to_thread(self.store.renew, job_id, self.owner):
+                lost.set()
+
+    async def run_job(self, job: Dict):
+        """Process a claimed job from its last checkpoint to the end"""
+        lost = asyncio.Event()
+        lease_keeper = asyncio.ensure_future(self._keep_lease(job["id"], lost))
+        try:
+            calls = operation_calls(job["operations"], job["options"])
+            chunk_size, chunk = job["chunk_size"], job["next_chunk"]
+            rows = read_rows(self.store.input_path(job), job["input_format"], skip=chunk * chunk_size)
+            while not lost.is_set():
+                start = time.perf_counter()
+                batch = await asyncio.to_thread(lambda: list(islice(rows, chunk_size)))
+                if not batch:
+                    break
+                records = await self._calculate_chunk(job, calls, chunk * chunk_size, batch)
+                await asyncio.to_thread(write_part, self.store.part_path(job, chunk), records, job["output_format"])
+                failed = sum(1 for record in records if record["status"] == "error")
+                chunk += 1
+                if not await asyncio.to_thread(self.store.checkpoint, job["id"], self.owner, chunk,
+                                               len(records), failed, time.perf_counter() - start):
+                    return
+            if not lost.is_set():
+                await asyncio.to_thread(self.store.finish, job["id"], self.owner, "completed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed", job["id"])
+            await asyncio.to_thread(self.store.finish, job["id"], self.owner, "failed", str(e))
+        finally:
+            lease_keeper.cancel()
+
+    async def _calculate_chunk(self, job: Dict, calls: List, first_row: int, batch: List[Dict]) -> List[Dict]:
+        records, births, positions = prepare_records(batch, first_row)
+        # Keep each pool task within the per-task timeout however costly the selected operations are
+        outcomes = await run_chunked(
+            births, invoke_operations_batch, job["ayanamsa"], calls,
+            chunk_size=operations_chunk_size(job["operations"], batch_chunk_size()),
+            on_error=lambda message: ({}, {"calculation": message}), wait_when_saturated=True,
+            max_in_flight=job_pool_slots()
+        )
+        return complete_records(records, positions, outcomes)
+
+
+def job_resource(job: Dict) -> Dict:
+    """Public representation of a job, with progress and throughput"""
+    def iso(timestamp):
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp)) if timestamp else None
+
+    processed, total = job["processed_rows"], job["total_rows"]
+    rate = processed / job["active_seconds"] if job["active_seconds"] else None
+    remaining = total - processed
+    parts = [
+        {"part": part, "rows": min(job["chunk_size"], total - part * job["chunk_size"]),
+         "url": f"/api/v1/jobs/{job['id']}/results/{part}"}
+        for part in range(job["next_chunk"])
+    ]
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "created_at": iso(job["created"]),
+        "started_at": iso(job["started"]),
+        "finished_at": iso(job["finished"]),
+        "ayanamsa": job["ayanamsa"],
+        "operations": job["operations"],
+        "options": job["options"],
+        "input": {"filename": job["filename"], "format": job["input_format"], "rows": total},
+        "progress": {
+            "total_rows": total,
+            "processed_rows": processed,
+            "failed_rows": job["failed_rows"],
+            "percent": round(100 * processed / total, 1) if total else 100.0,
+            "chunks_completed": job["next_chunk"],
+            "chunk_size": job["chunk_size"],
+            "attempts": job["attempts"]
+        },
+        "throughput": {
+            "rows_per_second": round(rate, 2) if rate else None,
+            "active_seconds": round(job["active_seconds"], 2),
+            "eta_seconds": round(remaining / rate, 1) if rate and job["status"] in ("queued", "running") else None
+        },
+        "results": {
+            "format": job["output_format"],
+            "parts": parts,
+            "url": f"/api/v1/jobs/{job['id']}/results" if job["output_format"] == "jsonl" else None
+        },
+        "error": job["error"]
+    }
+
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Job store of this process, created on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JobStore()
+        return _store
+
+
+job_runner: Optional[JobRunner] = None
+
+
+def start_job_runner() -> Optional[JobRunner]:
+    """Start this process' job runner unless PYJHORA_JOBS_ENABLED=0"""
+    global job_runner
+    if os.getenv("PYJHORA_JOBS_ENABLED", "1") == "0":
+        return None
+    if job_runner is None:
+        job_runner = JobRunner(get_job_store())
+    job_runner.start()
+    return job_runner
+
+
+async def stop_job_runner():
+    if job_runner is not None:
+        await job_runner.stop()
@@ -0,0 +1,208 @@
+"""One-to-many Ashtakoota compatibility matching"""
+
+import base64
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.services.ashtakoota import ASHTAKOOTA_KOOTAS, ashtakoota_table, pair_index
+from app.services.batch import run_batch, validate_birth_data
+from app.services.cache import nakshatra_cache
+from app.services.calculator import NAKSHATRA_NAMES, PyJHoraCalculator
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_MATCH_LIMIT = 50000
+DEFAULT_MATCH_CHUNK = 500
+DEFAULT_MATRIX_LIMIT = 2000
+
+# Matrix cell value (uint8 encoding) for a pair involving an invalid profile
+MATRIX_INVALID = 255
+MATRIX_ENCODINGS = ("json", "uint8")
+
+# Position of the Nadi koota in the table's last axis
+NADI = [koota for koota, _ in ASHTAKOOTA_KOOTAS].index("nadi")
+
+
+def match_limit() -> int:
+    """Largest number of candidates accepted in one match request"""
+    return int(os.getenv("PYJHORA_MATCH_LIMIT", DEFAULT_MATCH_LIMIT))
+
+
+def match_chunk_size() -> int:
+    """Candidate nakshatras calculated per pool task"""
+    return int(os.getenv("PYJHORA_MATCH_CHUNK", DEFAULT_MATCH_CHUNK))
+
+
+def matrix_limit() -> int:
+    """Largest number of profiles on each side of a compatibility matrix"""
+    return int(os.getenv("PYJHORA_MATRIX_LIMIT", DEFAULT_MATRIX_LIMIT))
+
+
+def nakshatra_number(value: Any) -> int:
+    """Nakshatra as 1-27, given its number or its name"""
+    if isinstance(value, str) and not value.strip().isdigit():
+        names = [name.lower() for name in NAKSHATRA_NAMES]
+        if value.strip().lower() not in names:
+            raise ValueError(f"Unknown nakshatra '{value}'; use 1-27 or one of {NAKSHATRA_NAMES}")
+        return names.index(value.strip().lower()) + 1
+    number = int(value)
+    if not 1 <= number <= 27:
+        raise ValueError("nakshatra must be between 1 and 27")
+    return number
+
+
+def pada_number(value: Any) -> int:
+    number = int(value)
+    if not 1 <= number <= 4:
+        raise ValueError("nakshatra_pada must be between 1 and 4")
+    return number
+
+
+def parse_candidate(item: Any) -> Tuple[Optional[Dict], Optional[Tuple[int, int]], Optional[str]]:
+    """
+    Read one candidate: either `birth_data` or a known `nakshatra` and `nakshatra_pada`
+
+    Returns (birth data, None, None), (None, (nakshatra, pada), None) or
+    (None, None, error message).
+    """
+    if not isinstance(item, dict):
+        return None, None, "Invalid candidate - expected an object"
+    if item.get("birth_data") is not None:
+        birth_data, error = validate_birth_data(item["birth_data"])
+        return birth_data, None, error
+    if item.get("nakshatra") is None or item.get("nakshatra_pada") is None:
+        return None, None, "Invalid candidate - provide birth_data, or nakshatra and nakshatra_pada"
+    try:
+        return None, (nakshatra_number(item["nakshatra"]), pada_number(item["nakshatra_pada"])), None
+    except (TypeError, ValueError) as e:
+        return None, None, f"Invalid candidate - {e}"
+
+
+def candidate_id(item: Any) -> Any:
+    return item.get("id") if isinstance(item, dict) else None
+
+
+async def resolve_candidates(items: List[Any], ayanamsa: str) -> Tuple[Dict[int, Tuple[int, int]], List[Dict], Dict]:
+    """
+    Janma (nakshatra, pada) of each candidate, keyed by input index
+
+    Nakshatras from birth data come from the nakshatra cache or are
+    calculated in chunks on the pool. Returns the pairs, per-item errors
+    and counters.
+    """
+    pairs, errors, births, birth_indices = {}, [], [], []
+    for index, item in enumerate(items):
+        birth_data, pair, error = parse_candidate(item)
+        if error:
+            errors.append({"index": index, "id": candidate_id(item), "error": error})
+        elif pair:
+            pairs[index] = pair
+        else:
+            births.append(birth_data)
+            birth_indices.append(index)
+
+    given = len(pairs)
+    outcomes, counters = await run_batch(
+        births, ayanamsa, "calculate_moon_nakshatra", chunk_size=match_chunk_size(), cache=nakshatra_cache
+    )
+    for index, (ok, value) in zip(birth_indices, outcomes):
+        if ok:
+            pairs[index] = (value["nakshatra_number"], value["nakshatra_pada"])
+        else:
+            errors.append({"index": index, "id": candidate_id(items[index]), "error": value})
+
+    info = {"nakshatras_given": given, "nakshatras_cached": counters["cached"],
+            "nakshatras_calculated": counters["calculated"]}
+    return pairs, sorted(errors, key=lambda error: error["index"]), info
+
+
+def rank_matches(profile: Tuple[int, int], role: str, candidates: List[Tuple[int, Any, Tuple[int, int]]],
+                 min_score: float = 0, exclude_nadi_dosha: bool = False, top_k: int = 10,
+                 include_breakdown: bool = True) -> Tuple[List[Dict], int]:
+    """
+    Score `candidates` [(index, id, (nakshatra, pada))] against the profile
+
+    Returns the top_k matches passing the filters, best first (ties keep
+    input order), and the number of candidates that passed. Scores are
+    gathered from the precomputed Ashtakoota table for all candidates at once.
+    """
+    if not candidates:
+        return [], 0
+    table = ashtakoota_table()
+    others = np.array([pair_index(*pair) for _, _, pair in candidates])
+    own = np.full_like(others, pair_index(*profile))
+    boys, girls = (own, others) if role == "boy" else (others, own)
+
+    totals = table.totals[boys, girls]
+    passed = totals >= min_score
+    if exclude_nadi_dosha:
+        passed &= table.half_points[boys, girls, NADI] > 0
+    positions = np.flatnonzero(passed)
+    best = positions[np.lexsort((positions, -totals[positions]))][:top_k]
+
+    results = []
+    for position in best.tolist():
+        index, candidate_id, pair = candidates[position]
+        scores, total_score = table.scores_at(int(boys[position]), int(girls[position]))
+        rating, _ = PyJHoraCalculator.compatibility_rating(total_score)
+        result = {
+            "index": index,
+            "id": candidate_id,
+            "nakshatra": NAKSHATRA_NAMES[pair[0] - 1],
+            "nakshatra_pada": pair[1],
+            "total_score": total_score,
+            "percentage": round((total_score / 36) * 100, 2),
+            "compatibility_rating": rating,
+            "nadi_dosha": scores["nadi"]["score"] == 0
+        }
+        if include_breakdown:
+            result["ashtakoota_scores"] = scores
+        results.append(result)
+    return results, len(positions)
+
+
+def table_indices(pairs: Dict[int, Tuple[int, int]], count: int) -> np.ndarray:
+    """Table index of each of `count` profiles, -1 for the ones without a nakshatra"""
+    indices = np.full(count, -1, dtype=np.int64)
+    for index, pair in pairs.items():
+        indices[index] = pair_index(*pair)
+    return indices
+
+
+def matrix_block(boys: np.ndarray, girls: np.ndarray, breakdown: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Scores of every boy x girl pair, in half-points, as uint8
+
+    Returns the (boys x girls) totals and, with `breakdown`, the
+    (boys x girls x 8) koota scores; pairs with an invalid profile
+    (index -1) are MATRIX_INVALID. Both are gathered from the Ashtakoota
+    table in one indexing operation.
+    """
+    table = ashtakoota_table()
+    rows, columns = np.ix_(np.maximum(boys, 0), np.maximum(girls, 0))
+    invalid = (boys < 0)[:, None] | (girls < 0)[None, :]
+    totals = table.total_half_points[rows, columns]
+    totals[invalid] = MATRIX_INVALID
+    kootas = None
+    if breakdown:
+        kootas = table.half_points[rows, columns]
+        kootas[invalid] = MATRIX_INVALID
+    return totals, kootas
+
+
+def encode_scores(half_points: np.ndarray, encoding: str) -> Union[str, List]:
+    """
+    Half-point scores as nested lists of points (null for invalid pairs), or
+    as base64 of the row-major uint8 half-points for the "uint8" encoding
+    """
+    if encoding == "uint8":
+        return base64.b64encode(np.ascontiguousarray(half_points, dtype=np.uint8).tobytes()).decode()
+    points = (half_points / 2).astype(object)
+    points[half_points == MATRIX_INVALID] = None
+    return points.tolist()
+
+
+def encode_breakdown(kootas: np.ndarray, encoding: str) -> Dict[str, Union[str, List]]:
+    """Per-koota score matrices, encoded like the totals"""
+    return {koota: encode_scores(kootas[..., i], encoding) for i, (koota, _) in enumerate(ASHTAKOOTA_KOOTAS)}
@@ -0,0 +1,101 @@
+"""Named calculator operations for bulk processing (jobs and the CLI)"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.ayanamsa import ayanamsa_guard
+
+
+class Operation:
+    """
+    A PyJHoraCalculator method selectable by name
+
+    `options` lists the request options passed to the method, in order
+    (currently chart_types and as_of). `cost` is its time per birth
+    relative to a D1 chart, used to size pool tasks.
+    """
+
+    def __init__(self, method: str, description: str, options: Tuple[str, ...] = (), cost: int = 1):
+        self.method = method
+        self.description = description
+        self.options = options
+        self.cost = cost
+
+    def args(self, options: Dict[str, Any]) -> tuple:
+        return tuple(options[name] for name in self.options)
+
+
+OPERATIONS = {
+    "charts": Operation("calculate_vargas", "Divisional charts (chart_types, default D1)", ("chart_types",)),
+    "varga_table": Operation("calculate_varga_table", "Planet x varga sign table", ("chart_types",)),
+    "dasha": Operation("calculate_dasha", "Vimsottari Maha Dasha periods and current dasha", ("dasha_system", "as_of")),
+    "bhukti": Operation("calculate_dasha_bhukti", "Vimsottari Bhukti periods and current bhukti", ("dasha_system", "as_of")),
+    "ashtakavarga": Operation("calculate_ashtakavarga", "Bhinna and Sarva Ashtakavarga", cost=2),
+    "yogas": Operation("calculate_yogas", "All yogas", cost=10),
+    "doshas": Operation("calculate_doshas", "All doshas", cost=5),
+    "shadbala": Operation("calculate_shadbala", "Shadbala planetary strengths", cost=10),
+    "bhava_bala": Operation("calculate_bhava_bala", "Bhava Bala house strengths", cost=10),
+    "panchanga": Operation("calculate_panchanga", "Birth panchanga", cost=2),
+    "extended_panchanga": Operation("calculate_extended_panchanga", "Panchanga with muhurtas and timings", cost=5),
+    "special_lagnas": Operation("calculate_special_lagnas", "Special lagnas", cost=2),
+    "bhava_chalit": Operation("calculate_bhava_chalit", "Bhava Chalit chart"),
+    "transits": Operation("calculate_current_transits", "Planetary positions (Gochara) at the birth moment"),
+    "sade_sati": Operation("calculate_sade_sati", "Sade Sati status")
+}
+
+
+def resolve_operations(names: List[str]) -> List[str]:
+    """Validate and de-duplicate operation names"""
+    names = [name.strip().lower() for name in names if name.strip()]
+    unknown = [name for name in names if name not in OPERATIONS]
+    if unknown or not names:
+        raise ValueError(f"Unsupported operations {unknown}; use {list(OPERATIONS)}")
+    return list(dict.fromkeys(names))
+
+
+def operations_chunk_size(names: List[str], chart_chunk_size: int) -> int:
+    """Births per pool task for the selected operations, given the births per task for D1 charts alone"""
+    return max(1, chart_chunk_size // sum(OPERATIONS[name].cost for name in names))
+
+
+def operation_options(chart_types: Optional[List[str]] = None, as_of: Optional[str] = None,
+                      dasha_system: str = "VIMSOTTARI") -> Dict[str, Any]:
+    """Options shared by all rows of a bulk run; "today" is pinned once for the whole run"""
+    return {
+        "chart_types": chart_types or ["D1"],
+        "as_of": as_of or date.today().isoformat(),
+        "dasha_system": dasha_system
+    }
+
+
+def operation_calls(names: List[str], options: Dict[str, Any]) -> List[Tuple[str, str, tuple]]:
+    """(name, method, args) for each selected operation"""
+    return [(name, OPERATIONS[name].method, OPERATIONS[name].args(options)) for name in names]
+
+
+def invoke_operations_batch(items: List[Dict], ayanamsa: str,
+                            calls: List[Tuple[str, str, tuple]]) -> List[Tuple[Dict, Dict]]:
+    """
+    Run the selected operations for many births (executed inside a worker)
+
+    One calculator per birth serves every operation, sharing its natal
+    chart. Returns (results, errors) per birth, keyed by operation name.
+    """
+    from app.services.calculator import PyJHoraCalculator
+
+    outcomes = []
+    with ayanamsa_guard.use(ayanamsa):
+        for birth_data in items:
+            results, errors = {}, {}
+            try:
+                calculator = PyJHoraCalculator(birth_data, ayanamsa)
+            except Exception as e:
+                outcomes.append((results, {"birth_data": str(e)}))
+                continue
+            for name, method, args in calls:
+                try:
+                    results[name] = getattr(calculator, method)(*args)
+                except Exception as e:
+                    errors[name] = str(e)
+            outcomes.append((results, errors))
+    return outcomes
@@ -0,0 +1,162 @@
+"""Day-by-day Panchanga calendars for one place over a date range"""
+
+import asyncio
+import os
+from collections import deque
+from datetime import date, timedelta
+from typing import AsyncIterator, Dict, List, Tuple
+
+import swisseph as swe
+from jhora import utils
+from jhora.panchanga import drik
+
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.cache import cache_key
+from app.services.calculator import KARANA_NAMES, NAKSHATRA_NAMES, TITHI_NAMES, VARA_LORDS, VARA_NAMES, YOGA_NAMES
+from app.services.executor import calculation_pool, fan_out_slots, run_cached
+from app.services.panchanga_kernel import PanchangaKernel
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_CALENDAR_MAX_DAYS = 1830
+
+
+def calendar_max_days() -> int:
+    """Largest number of days accepted in one calendar request"""
+    return int(os.getenv("PYJHORA_CALENDAR_MAX_DAYS", DEFAULT_CALENDAR_MAX_DAYS))
+
+
+def calendar_months(start: date, end: date) -> List[Tuple[date, date]]:
+    """Split the inclusive range [start, end] at month boundaries"""
+    pieces = []
+    first = start
+    while first <= end:
+        next_month = (first.replace(day=1) + timedelta(days=32)).replace(day=1)
+        last = min(end, next_month - timedelta(days=1))
+        pieces.append((first, last))
+        first = last + timedelta(days=1)
+    return pieces
+
+
+def tithi_name(number: int) -> str:
+    if number == 15:
+        return "Purnima"
+    if number == 30:
+        return "Amavasya"
+    return TITHI_NAMES[(number - 1) % 15]
+
+
+def karana_name(number: int) -> str:
+    """Name of karana 1-60: Kimstughna, then the seven movable karanas eight times, then the fixed three"""
+    if number == 1:
+        return KARANA_NAMES[0]
+    if number <= 57:
+        return KARANA_NAMES[1 + (number - 2) % 7]
+    return KARANA_NAMES[number - 50]
+
+
+def panchanga_day(day: date, kernel: PanchangaKernel, sunrise: List, next_sunrise: List) -> Dict:
+    """
+    Panchanga of one day, as prevailing at its sunrise
+
+    `sunrise` and `next_sunrise` are drik.sunrise() results bounding the day.
+    End times are local hours from the day's midnight, as PyJHora reports
+    them ("(+1)" for the next day).
+    """
+    rise = sunrise[2]
+    tithi, nakshatra, yoga, (karana, _, karana_end) = kernel.panchanga(rise)
+    vara = drik.vaara(rise)
+    return {
+        "date": day.isoformat(),
+        "vara": {"day": VARA_NAMES[vara], "lord": VARA_LORDS[vara], "number": vara + 1},
+        "sunrise": sunrise[1],
+        "sunset": kernel.sunset(rise)[1],
+        "next_sunrise": next_sunrise[1],
+        "tithi": {
+            "number": int(tithi[0]),
+            "name": tithi_name(int(tithi[0])),
+            "paksha": "Shukla" if tithi[0] <= 15 else "Krishna",
+            "ends": utils.to_dms(tithi[2])
+        },
+        "nakshatra": {
+            "number": int(nakshatra[0]),
+            "name": NAKSHATRA_NAMES[int(nakshatra[0]) - 1],
+            "pada": int(nakshatra[1]),
+            "ends": utils.to_dms(nakshatra[3])
+        },
+        "yoga": {
+            "number": int(yoga[0]),
+            "name": YOGA_NAMES[int(yoga[0]) - 1],
+            "ends": utils.to_dms(yoga[2])
+        },
+        "karana": {
+            "number": int(karana),
+            "name": karana_name(int(karana)),
+            "ends": utils.to_dms(karana_end)
+        }
+    }
+
+
+def calculate_calendar_days(first: str, last: str, location: Tuple[float, float, float], ayanamsa: str) -> List[Dict]:
+    """
+    Panchanga of every day from `first` to `last` (executed inside a worker)
+
+    Each day runs from its sunrise to the next one; every sunrise is
+    calculated once and closes the previous day as well as opening its own.
+    One panchanga kernel serves the whole range, so Sun/Moon positions
+    shared by neighbouring days (e.g. the nakshatra's sunrise-to-sunrise
+    Moon track) are evaluated once. A day that cannot be calculated (e.g.
+    no sunrise near the poles) carries an `error` instead of the panchanga.
+    """
+    latitude, longitude, timezone_offset = location
+    kernel = PanchangaKernel(drik.Place("Calendar", latitude, longitude, timezone_offset))
+    start = date.fromisoformat(first)
+    days = [start + timedelta(days=offset) for offset in range((date.fromisoformat(last) - start).days + 2)]
+
+    results = []
+    with ayanamsa_guard.use(ayanamsa):
+        sunrises = []
+        for day in days:
+            try:
+                sunrises.append(kernel.sunrise(swe.julday(day.year, day.month, day.day, 12.0)))
+            except Exception as e:
+                sunrises.append(e)
+        for index, day in enumerate(days[:-1]):
+            try:
+                for boundary in sunrises[index:index + 2]:
+                    if isinstance(boundary, Exception):
+                        raise boundary
+                results.append(panchanga_day(day, kernel, sunrises[index], sunrises[index + 1]))
+            except Exception as e:
+                results.append({"date": day.isoformat(), "error": str(e)})
+    return results
+
+
+async def iter_calendar(location: Tuple[float, float, float], start: date, end: date,
+                        ayanamsa: str) -> AsyncIterator[List[Dict]]:
+    """
+    Yield the calendar month by month, in date order
+
+    Each month is one pool task and one result-cache entry, so the same
+    place and months requested again are not recalculated. At most one
+    month per pool worker is in flight across all requests, and a stream
+    runs at most that many months ahead of its reader.
+    """
+    slots = fan_out_slots()
+
+    async def run_month(first: date, last: date):
+        key = cache_key("panchanga_calendar", location, ayanamsa, first.isoformat(), last.isoformat())
+        return await run_cached(
+            key, calculate_calendar_days, first.isoformat(), last.isoformat(), location, ayanamsa, slots=slots
+        )
+
+    pending = deque()
+    try:
+        for first, last in calendar_months(start, end):
+            pending.append(asyncio.ensure_future(run_month(first, last)))
+            if len(pending) >= calculation_pool.workers:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,178 @@
+"""Tithi, nakshatra, yoga and karana from shared Sun/Moon evaluations"""
+
+from math import ceil
+from typing import Dict, List, Tuple
+
+import swisseph as swe
+from jhora import const, utils
+from jhora.panchanga import drik
+
+ONE_TITHI = 360 / 30
+ONE_YOGA = 360. / 27.
+NAKSHATRA_OFFSETS = [0.0, 0.25, 0.5, 0.75, 1.0]
+
+
+class PanchangaKernel:
+    """
+    Panchanga limbs for one place, sharing the ephemeris work between them
+
+    drik.tithi, drik.nakshatra, drik.yogam and drik.karana each recalculate
+    the sunrises, sunsets and Sun/Moon positions they need, and karana
+    recalculates the whole tithi. The kernel follows the same formulas, but
+    evaluates each body once per instant (one calc_ut gives both the
+    sidereal longitude and the daily speed) and sunrise/sunset once per
+    date, so the four limbs share their inputs. Results are identical to
+    PyJHora's; with use_planet_speed_for_panchangam_end_timings off, tithi
+    and yoga are delegated to drik.
+
+    A kernel may be reused for many instants at the same place (e.g. the
+    days of a calendar) while the same ayanamsa mode is held.
+    """
+
+    def __init__(self, place: drik.Place):
+        self.place = place
+        self._bodies: Dict[Tuple[float, int], Tuple[float, float]] = {}
+        self._sunrises: Dict[Tuple, List] = {}
+        self._sunsets: Dict[Tuple, List] = {}
+
+    def body(self, jd_utc: float, planet: int) -> Tuple[float, float]:
+        """Sidereal longitude and daily speed of `planet` (const._SUN, ...) at `jd_utc`"""
+        key = (jd_utc, planet)
+        found = self._bodies.get(key)
+        if found is None:
+            flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL | drik._rise_flags
+            if const._TROPICAL_MODE:
+                longitude = drik.sidereal_longitude(jd_utc, planet)
+                position, _ = swe.calc_ut(jd_utc, planet, flags=flags)
+            else:
+                # Same mode handling as drik.sidereal_longitude(), whose flags include the speed
+                drik.set_ayanamsa_mode(const._DEFAULT_AYANAMSA_MODE, drik._ayanamsa_value, jd_utc)
+                position, _ = swe.calc_ut(jd_utc, planet, flags=flags)
+                drik.reset_ayanamsa_mode()
+                longitude = utils.norm360(position[0])
+            found = self._bodies[key] = (longitude, round(position[3], 3))
+        return found
+
+    def longitude(self, jd_utc: float, planet: int) -> float:
+        return self.body(jd_utc, planet)[0]
+
+    def daily_speed(self, jd: float, planet: int) -> float:
+        """Speed in degrees/day at local `jd`, as drik.daily_planet_speed()"""
+        return self.body(jd - self.place.timezone / 24., planet)[1]
+
+    def sunrise(self, jd: float) -> List:
+        """drik.sunrise() of the date of `jd`"""
+        day = drik.jd_to_gregorian(jd)[:3]
+        if day not in self._sunrises:
+            self._sunrises[day] = drik.sunrise(jd, self.place)
+        return self._sunrises[day]
+
+    def sunset(self, jd: float) -> List:
+        """drik.sunset() of the date of `jd`"""
+        day = drik.jd_to_gregorian(jd)[:3]
+        if day not in self._sunsets:
+            self._sunsets[day] = drik.sunset(jd, self.place)
+        return self._sunsets[day]
+
+    def tithi(self, jd: float) -> List:
+        """Same as drik.tithi(jd, place)"""
+        if not const.use_planet_speed_for_panchangam_end_timings:
+            return drik.tithi(jd, self.place)
+        _, _, _, jd_hours = utils.jd_to_gregorian(jd)
+
+        def tithi_at(jd):
+            jd_utc = jd - self.place.timezone / 24.
+            total = ((self.longitude(jd_utc, const._MOON) - self.longitude(jd_utc, const._SUN)) % 360) % 360
+            tit = ceil(total / ONE_TITHI)
+            tithi_no = int(tit)
+            degrees_left = tit * ONE_TITHI - total
+            day_length = self.sunset(jd)[0] - self.sunrise(jd)[0]
+            night_length = 24.0 + self.sunrise(jd + 1)[0] - self.sunset(jd)[0]
+            one_day_hours = day_length + night_length
+            relative_speed = self.daily_speed(jd, const._MOON) - self.daily_speed(jd, const._SUN)
+            end_time = jd_hours + degrees_left / relative_speed * one_day_hours
+            frac_left = degrees_left / ONE_TITHI
+            start_time = end_time - (end_time - jd_hours) / frac_left
+            if const.increase_tithi_by_one_before_kali_yuga and jd < const.mahabharatha_tithi_julian_day:
+                tithi_no = tithi_no % 30 + 1
+            return [tithi_no, start_time, end_time]
+
+        result = tithi_at(jd)
+        if result[2] < 24:
+            following = tithi_at(jd + result[2] / 24)
+            result += [result[0] % 30 + 1, result[2], result[2] + following[2]]
+        return result
+
+    def _nakshatra_at(self, jd: float) -> List:
+        """Same as drik._get_nakshathra(jd, place)"""
+        tz = self.place.timezone
+        y, m, d, _ = utils.jd_to_gregorian(jd)
+        jd_ut = utils.gregorian_to_jd(drik.Date(y, m, d))
+        jd_utc = jd - self.place.timezone / 24.
+        rise = self.sunrise(jd_utc)[2]
+        longitudes = [self.longitude(rise + t, const._MOON) for t in NAKSHATRA_OFFSETS]
+        unwrapped_longitudes = utils.unwrap_angles(longitudes)
+        extended_longitudes = utils.extend_angle_range(unwrapped_longitudes, 360)
+        x = NAKSHATRA_OFFSETS * (len(extended_longitudes) // len(unwrapped_longitudes))
+
+        nak_no, padam_no, _ = drik.nakshatra_pada(self.longitude(jd_utc, const._MOON))
+        y_check = utils.normalize_angle(nak_no * 360 / 27, start=min(extended_longitudes))
+        ends = (rise - jd_ut + utils.inverse_lagrange(x, extended_longitudes, y_check)) * 24 + tz
+        answer = [nak_no, padam_no, ends]
+        leap_nak = nak_no + 1
+        y_check = utils.normalize_angle(leap_nak * 360 / 27, start=min(extended_longitudes))
+        ends = (rise - jd_ut + utils.inverse_lagrange(x, extended_longitudes, y_check)) * 24 + tz
+        leap_nak = 1 if nak_no == 27 else leap_nak
+        return answer + [int(leap_nak), padam_no, ends]
+
+    def nakshatra(self, jd: float) -> List:
+        """Same as drik.nakshatra(jd, place)"""
+        current, previous = self._nakshatra_at(jd), self._nakshatra_at(jd - 1)
+        start = previous[2]
+        if start < 24.0:
+            start = -start
+        elif start > 24:
+            start -= 24.0
+        return [current[0], current[1], start, current[2]] + current[3:]
+
+    def yogam(self, jd: float) -> List:
+        """Same as drik.yogam(jd, place)"""
+        if not const.use_planet_speed_for_panchangam_end_timings:
+            return drik.yogam(jd, self.place)
+        _, _, _, jd_hours = utils.jd_to_gregorian(jd)
+
+        def yogam_at(jd):
+            jd_utc = jd - self.place.timezone / 24.
+            total = ((self.longitude(jd_utc, const._MOON) + self.longitude(jd_utc, const._SUN)) % 360) % 360
+            yog = ceil(total / ONE_YOGA)
+            degrees_left = yog * ONE_YOGA - total
+            combined_speed = self.daily_speed(jd, const._MOON) + self.daily_speed(jd, const._SUN)
+            end_time = jd_hours + degrees_left / combined_speed * 24
+            frac_left = degrees_left / ONE_YOGA
+            start_time = end_time - (end_time - jd_hours) / frac_left
+            return [int(yog), start_time, end_time, frac_left]
+
+        result = yogam_at(jd)
+        if result[2] < 24:
+            # PyJHora evaluates the next yoga at jd + end time in hours (not days); kept for identical results
+            following = yogam_at(jd + result[2])
+            following[1] = result[2]
+            following[2] += 24
+            following[3] = utils.get_fraction(following[1], following[2], jd_hours)
+            result += following
+        return result
+
+    def karana(self, jd: float, tithi: List = None) -> Tuple[int, float, float]:
+        """Same as drik.karana(jd, place), from an already calculated tithi if given"""
+        _, _, _, jd_hours = utils.jd_to_gregorian(jd)
+        tithi = tithi or self.tithi(jd)
+        tithi_middle = 0.5 * (tithi[1] + tithi[2])
+        karana = tithi[0] * 2 - 1
+        if jd_hours > tithi_middle:
+            return karana + 1, tithi_middle, tithi[2]
+        return karana, tithi[1], tithi_middle
+
+    def panchanga(self, jd: float) -> Tuple[List, List, List, Tuple[int, float, float]]:
+        """Tithi, nakshatra, yoga and karana at local `jd`, as the drik functions return them"""
+        tithi = self.tithi(jd)
+        return tithi, self.nakshatra(jd), self.yogam(jd), self.karana(jd, tithi)
@@ -0,0 +1,109 @@
+"""Concurrent execution of dependent calculation sections"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.executor import CalculationPoolError, CalculationTimeoutError
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_SECTION_TIMEOUT = 20.0
+
+
+class Section:
+    """
+    One node of a calculation graph
+
+    `run` receives the results of the sections named in `requires` and
+    returns an awaitable result; sections without a path between them run
+    concurrently.
+    """
+
+    def __init__(self, name: str, run: Callable[[Dict[str, Any]], Awaitable[Any]], requires: Tuple[str, ...] = ()):
+        self.name = name
+        self.run = run
+        self.requires = requires
+
+
+class SectionFailure:
+    """Why a section produced no result"""
+
+    def __init__(self, reason: str, error: Optional[Exception] = None):
+        self.reason = reason
+        self.error = error
+
+    def to_dict(self, name: str) -> Dict:
+        return {"section": name, "reason": self.reason}
+
+
+def section_timeout() -> float:
+    """Per-section time budget in seconds"""
+    return float(os.getenv("PYJHORA_SECTION_TIMEOUT", DEFAULT_SECTION_TIMEOUT))
+
+
+def _check_graph(sections: List[Section]):
+    """Reject requirements on unknown sections and cycles, which would never finish"""
+    by_name = {section.name: section for section in sections}
+    for section in sections:
+        unknown = [name for name in section.requires if name not in by_name]
+        if unknown:
+            raise ValueError(f"Section {section.name} requires unknown sections {unknown}")
+
+    visited, active = set(), set()
+
+    def visit(name: str):
+        if name in active:
+            raise ValueError(f"Sections form a cycle through {name}")
+        if name not in visited:
+            active.add(name)
+            for required in by_name[name].requires:
+                visit(required)
+            active.discard(name)
+            visited.add(name)
+
+    for section in sections:
+        visit(section.name)
+
+
+async def run_sections(sections: List[Section], timeout: Optional[float] = None
+                       ) -> Tuple[Dict[str, Any], Dict[str, SectionFailure], Dict[str, float]]:
+    """
+    Run a graph of sections, each as soon as its requirements are done
+
+    Returns (results, failures, timings in ms). A section that errors or
+    exceeds `timeout` seconds is reported in failures, and so is every
+    section depending on it; the others still complete.
+    """
+    timeout = timeout or section_timeout()
+    _check_graph(sections)
+
+    tasks: Dict[str, asyncio.Task] = {}
+    results: Dict[str, Any] = {}
+    failures: Dict[str, SectionFailure] = {}
+    timings: Dict[str, float] = {}
+
+    async def execute(section: Section):
+        for name in section.requires:
+            await asyncio.wait({tasks[name]})
+        missing = [name for name in section.requires if name in failures]
+        if missing:
+            failures[section.name] = SectionFailure(f"skipped, requires {', '.join(missing)}")
+            return
+        start = time.perf_counter()
+        try:
+            inputs = {name: results[name] for name in section.requires}
+            results[section.name] = await asyncio.wait_for(section.run(inputs), timeout=timeout)
+        except (asyncio.TimeoutError, CalculationTimeoutError) as e:
+            failures[section.name] = SectionFailure(f"timed out after {timeout:g}s", e)
+        except CalculationPoolError as e:
+            failures[section.name] = SectionFailure(str(e), e)
+        except Exception as e:
+            failures[section.name] = SectionFailure(f"error: {e}", e)
+        timings[section.name] = round((time.perf_counter() - start) * 1000, 1)
+
+    # Tasks are created before any of them runs, so requirements can be awaited by name
+    for section in sections:
+        tasks[section.name] = asyncio.ensure_future(execute(section))
+    await asyncio.gather(*tasks.values())
+    return results, failures, timings
@@ -0,0 +1,357 @@
+"""Planetary events (ingresses, stations, retrograde periods and combustion) found over a time range"""
+
+import asyncio
+import os
+from datetime import datetime
+from math import ceil
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+from jhora import const
+
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.cache import cache_key
+from app.services.ephemeris_store import sidereal_positions
+from app.services.executor import fan_out_slots, run_cached
+
+# Defaults can be overridden per deployment through environment variables
+DEFAULT_RANGE_MAX_DAYS = 36525
+DEFAULT_INGRESS_CHUNK_DAYS = 3653
+
+# Largest longitude error in degrees accepted from the ephemeris store
+EVENT_TOLERANCE = 1e-6
+# Event times are refined to within this many days (about 0.1 second)
+EVENT_PRECISION_DAYS = 1e-6
+MAX_REFINEMENTS = 60
+# Days either side of an instant for the rate of change of the speed
+STATION_STEP_DAYS = 0.01
+
+# Upper bound of the daily sidereal speed of planets 0-8 (Rahu/Ketu are the mean nodes)
+MAX_SPEED = {0: 1.1, 1: 16.0, 2: 0.9, 3: 2.3, 4: 0.3, 5: 1.3, 6: 0.15, 7: 0.06, 8: 0.06}
+# Longest grid step; every retrograde period lasts longer, so two samples never straddle both stations
+MAX_GRID_DAYS = 8.0
+
+# Divisions of the zodiac, in padas (the finest one); every sign and nakshatra boundary is a pada boundary
+INGRESS_DIVISIONS = {"sign": 9, "nakshatra": 4, "pada": 1}
+ONE_PADA = 360 / 108
+
+# First window searched for a planet's next ingress; each further window is four times longer
+NEXT_INGRESS_DAYS = 32
+NEXT_INGRESS_MAX_DAYS = 36600
+
+# Largest distance in degrees from the Sun at which planets 1-6 (Moon to Saturn) are combust,
+# moving direct and retrograde; PyJHora's tables list them in that order
+COMBUSTION_ORBS = {
+    planet: (direct, retrograde)
+    for planet, direct, retrograde in zip(range(1, 7), const.combustion_range_of_planets_from_sun,
+                                          const.combustion_range_of_planets_from_sun_while_in_retrogade)
+}
+# Stations and combustion are searched this many days beyond each end of the range, so periods
+# running there get their real dates (a retrograde or combustion period lasts under 150 days)
+EVENT_SEARCH_MARGIN_DAYS = 200
+# Events returned by the event search
+EVENT_KINDS = ("station", "retrograde", "combustion")
+
+
+def range_max_days(env: Optional[str] = None) -> int:
+    """Longest range in days accepted in one transit search, overridden by the `env` environment variable"""
+    return int(os.getenv(env, DEFAULT_RANGE_MAX_DAYS)) if env else DEFAULT_RANGE_MAX_DAYS
+
+
+def ingress_chunk_days() -> int:
+    """Days of one planet searched per pool task"""
+    return int(os.getenv("PYJHORA_INGRESS_CHUNK_DAYS", DEFAULT_INGRESS_CHUNK_DAYS))
+
+
+def planet_grid(start_jd_utc: float, end_jd_utc: float, planet: int, unit: float) -> np.ndarray:
+    """Samples from start to end close enough that `planet` moves less than `unit` degrees between two"""
+    step = min(MAX_GRID_DAYS, 0.9 * unit / MAX_SPEED[planet])
+    count = max(1, ceil((end_jd_utc - start_jd_utc) / step))
+    return np.linspace(start_jd_utc, end_jd_utc, count + 1)
+
+
+def refine(low: np.ndarray, high: np.ndarray, rising: np.ndarray, residual) -> np.ndarray:
+    """
+    Root in each (low, high) of a function given by `residual(times)` -> (values, slopes)
+
+    The function rises through zero in each bracket (falls where `rising`
+    is False). Newton steps converge in a few evaluations; a step leaving
+    the bracket is replaced by bisection.
+    """
+    time = low + (high - low) / 2
+    for _ in range(MAX_REFINEMENTS):
+        value, slope = residual(time)
+        before = (value < 0) == rising
+        low, high = np.where(before, time, low), np.where(before, high, time)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = value / slope
+        estimate = time - step
+        bisect = ~np.isfinite(estimate) | (estimate < low) | (estimate > high)
+        time = np.where(bisect, (low + high) / 2, estimate)
+        if np.all(np.where(bisect, high - low, np.abs(step)) < EVENT_PRECISION_DAYS):
+            break
+    return time
+
+
+def crossing_times(planet: int, low: np.ndarray, high: np.ndarray, boundary: np.ndarray,
+                   forward: np.ndarray) -> np.ndarray:
+    """Instants in each (low, high) at which `planet`, moving monotonically, passes `boundary` (degrees)"""
+    def offset(time):
+        longitude, speed = sidereal_positions(time, planet, EVENT_TOLERANCE)
+        return (longitude - boundary + 180) % 360 - 180, speed
+    return refine(low, high, forward, offset)
+
+
+def station_times(planet: int, low: np.ndarray, high: np.ndarray, retrograde: np.ndarray) -> np.ndarray:
+    """Instants in each (low, high) at which `planet` turns retrograde (or direct, where `retrograde` is False)"""
+    def speed(time):
+        speeds = sidereal_positions(np.concatenate([time, time - STATION_STEP_DAYS, time + STATION_STEP_DAYS]),
+                                    planet, EVENT_TOLERANCE)[1].reshape(3, -1)
+        return speeds[0], (speeds[2] - speeds[1]) / (2 * STATION_STEP_DAYS)
+    return refine(low, high, ~retrograde, speed)
+
+
+def planet_samples(start_jd_utc: float, end_jd_utc: float, planet: int,
+                   unit: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Times and (longitude, speed) of `planet` on its grid, with every station between two samples added
+
+    Also returns the stations' times and whether each turns retrograde.
+    The longitude is monotonic between neighbouring samples.
+    """
+    jd_utc = planet_grid(start_jd_utc, end_jd_utc, planet, unit)
+    values = sidereal_positions(jd_utc, planet, EVENT_TOLERANCE)
+    turns = np.flatnonzero(np.diff(np.signbit(values[1])))
+    retrograde = ~np.signbit(values[1, turns])
+    stations = jd_utc[turns]
+    if len(turns):
+        stations = station_times(planet, stations, jd_utc[turns + 1], retrograde)
+        order = np.argsort(np.concatenate([jd_utc, stations]), kind="stable")
+        jd_utc = np.concatenate([jd_utc, stations])[order]
+        values = np.concatenate([values, sidereal_positions(stations, planet, EVENT_TOLERANCE)], axis=1)[:, order]
+    return jd_utc, values, stations, retrograde
+
+
+def planet_ingresses(start_jd_utc: float, end_jd_utc: float, planet: int,
+                     divisions: Tuple[str, ...]) -> List[Tuple[float, str, int, int]]:
+    """
+    Every ingress of `planet` (0-8) into a sign, nakshatra or pada in `divisions` in (start, end]
+
+    Returns (jd_utc, division, from, to) in time order, with sign (0-11),
+    nakshatra (0-26) or pada (0-107) numbers. The longitude is sampled on a
+    grid and split at every station found between two samples, so it is
+    monotonic between neighbouring points; each change of division between
+    them is one crossing, retrograde re-entries included.
+    """
+    # Signs alone are searched in whole signs, anything finer in padas
+    unit, sizes = (30.0, {"sign": 1}) if divisions == ("sign",) else (ONE_PADA, {
+        division: INGRESS_DIVISIONS[division] for division in divisions})
+    units = round(360 / unit)
+    jd_utc, values, _, _ = planet_samples(start_jd_utc, end_jd_utc, planet, unit)
+
+    index = (values[0] // unit).astype(np.int64) % units
+    changed = np.flatnonzero(index[1:] != index[:-1])
+    if not len(changed):
+        return []
+    before, after = index[changed], index[changed + 1]
+    forward = (after - before) % units == 1
+    boundary = np.where(forward, after, before) * unit % 360
+    times = crossing_times(planet, jd_utc[changed], jd_utc[changed + 1], boundary, forward)
+
+    events = []
+    for time, start, end in zip(times.tolist(), before.tolist(), after.tolist()):
+        for division, size in sizes.items():
+            if start // size != end // size:
+                events.append((time, division, start // size, end // size))
+    return events
+
+
+def next_ingress(jd_utc: float, planet: int, division: str = "sign") -> Optional[Tuple[float, int, int]]:
+    """JD (UTC), from and to of the first ingress of `planet` (0-8) after `jd_utc`, searched in growing windows"""
+    start, days = jd_utc, NEXT_INGRESS_DAYS
+    while start - jd_utc < NEXT_INGRESS_MAX_DAYS:
+        events = planet_ingresses(start, start + days, planet, (division,))
+        if events:
+            return events[0][0], events[0][2], events[0][3]
+        start, days = start + days, days * 4
+    return None
+
+
+def combustion_times(planet: int, low: np.ndarray, high: np.ndarray, orb: np.ndarray,
+                     entering: np.ndarray) -> np.ndarray:
+    """Instants in each (low, high) at which `planet` comes within `orb` degrees of the Sun (or leaves, where not `entering`)"""
+    def distance(time):
+        longitude, speed = sidereal_positions(time, planet, EVENT_TOLERANCE)
+        sun_longitude, sun_speed = sidereal_positions(time, 0, EVENT_TOLERANCE)
+        separation = (longitude - sun_longitude + 180) % 360 - 180
+        return np.abs(separation) - orb, np.sign(separation) * (speed - sun_speed)
+    return refine(low, high, ~entering, distance)
+
+
+def planet_events(start_jd_utc: float, end_jd_utc: float,
+                  planet: int) -> Tuple[List[Tuple[float, bool]], List[Tuple[str, float, float]]]:
+    """
+    Stations of `planet` (0-8) in [start, end) and its retrograde and combustion periods overlapping it
+
+    Returns stations as (jd_utc, turns retrograde) and periods as
+    ("retrograde" or "combustion", start, end), both in time order. The
+    search extends EVENT_SEARCH_MARGIN_DAYS beyond the range so periods
+    running at its ends get their real start and end. Combustion compares
+    the distance from the Sun with COMBUSTION_ORBS, the retrograde orb
+    while the planet moves backwards; the grid is fine enough that no
+    combustion period falls between two samples.
+    """
+    search_start = start_jd_utc - EVENT_SEARCH_MARGIN_DAYS
+    search_end = end_jd_utc + EVENT_SEARCH_MARGIN_DAYS
+    orbs = COMBUSTION_ORBS.get(planet)
+    # The Sun and the planet approach at up to the sum of their speeds
+    unit = min(orbs) * MAX_SPEED[planet] / (MAX_SPEED[planet] + MAX_SPEED[0]) if orbs else 30.0
+    jd_utc, values, stations, retrograde = planet_samples(search_start, search_end, planet, unit)
+
+    changes = [(time, "retrograde", turns) for time, turns in zip(stations.tolist(), retrograde.tolist())]
+    if orbs:
+        separation = (values[0] - sidereal_positions(jd_utc, 0, EVENT_TOLERANCE)[0] + 180) % 360 - 180
+        combust = np.abs(separation) <= np.where(values[1] < 0, orbs[1], orbs[0])
+        changed = np.flatnonzero(combust[1:] != combust[:-1])
+        # A station is one end of its intervals, so the other end gives the direction within them
+        backwards = values[1, changed] + values[1, changed + 1] < 0
+        times = combustion_times(planet, jd_utc[changed], jd_utc[changed + 1],
+                                 np.where(backwards, orbs[1], orbs[0]), combust[changed + 1])
+        changes += [(time, "combustion", entering) for time, entering in zip(times.tolist(), combust[changed + 1].tolist())]
+    changes.sort()
+
+    # Periods already running at the start of the search, or still running at its end, have no known bound
+    periods, started = [], {}
+    for time, kind, entering in changes:
+        if entering:
+            started[kind] = time
+        elif kind in started:
+            periods.append((kind, started.pop(kind), time))
+    periods = sorted(period for period in periods if period[1] < end_jd_utc and period[2] > start_jd_utc)
+    return [(time, turns) for time, turns in zip(stations.tolist(), retrograde.tolist())
+            if start_jd_utc <= time < end_jd_utc], periods
+
+
+def calculate_ingress_chunk(start_jd_utc: float, end_jd_utc: float, planet: int, divisions: Tuple[str, ...],
+                            ayanamsa: str) -> List[Tuple[float, str, int, int]]:
+    """Ingresses of one planet over part of the range (executed inside a worker)"""
+    with ayanamsa_guard.use(ayanamsa):
+        return planet_ingresses(start_jd_utc, end_jd_utc, planet, divisions)
+
+
+def calculate_event_chunk(start_jd_utc: float, end_jd_utc: float, planet: int,
+                          ayanamsa: str) -> Tuple[List[Tuple[float, bool]], List[Tuple[str, float, float]]]:
+    """Stations and periods of one planet over part of the range (executed inside a worker)"""
+    with ayanamsa_guard.use(ayanamsa):
+        return planet_events(start_jd_utc, end_jd_utc, planet)
+
+
+async def run_planet_chunks(operation: str, function, start_jd_utc: float, end_jd_utc: float,
+                            planets: Tuple[int, ...], *args) -> List[Tuple[int, float, float, Any]]:
+    """
+    (planet, start, end, result) of `function(start, end, planet, *args)` for each planet and chunk of the range
+
+    Each planet and chunk is one pool task and one result-cache entry; at
+    most one task per pool worker is in flight across all requests. The
+    last argument is the ayanamsa.
+    """
+    chunk_days = ingress_chunk_days()
+    bounds = np.append(np.arange(start_jd_utc, end_jd_utc, chunk_days), end_jd_utc).tolist()
+    slots = fan_out_slots()
+
+    async def run_chunk(planet: int, start: float, end: float):
+        key = cache_key(operation, args[-1], planet, *args[:-1], start, end)
+        return await run_cached(key, function, start, end, planet, *args, slots=slots)
+
+    tasks = [(planet, start, end) for planet in planets for start, end in zip(bounds[:-1], bounds[1:])]
+    pieces = await asyncio.gather(*(run_chunk(*task) for task in tasks))
+    return [task + (piece,) for task, piece in zip(tasks, pieces)]
+
+
+def merge_ingresses(chunks: List[Tuple[int, float, float, Any]]) -> List[Tuple]:
+    """Ingresses (jd_utc, planet, division, from, to) of all planet chunks in time order"""
+    events = [(time, planet, division, start, end)
+              for planet, _, _, piece in chunks for time, division, start, end in piece]
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+async def calculate_ingresses(start_jd_utc: float, end_jd_utc: float, planets: Tuple[int, ...],
+                              divisions: Tuple[str, ...], ayanamsa: str) -> Tuple[List[Tuple], int]:
+    """
+    Ingresses (jd_utc, planet, division, from, to) of every planet in time order, and the number of tasks
+
+    A century of Moon padas is over 100000 ingresses, so they are merged
+    off the event loop.
+    """
+    chunks = await run_planet_chunks("transit_ingresses", calculate_ingress_chunk, start_jd_utc, end_jd_utc,
+                                     planets, divisions, ayanamsa)
+    return await asyncio.to_thread(merge_ingresses, chunks), len(chunks)
+
+
+async def calculate_events(start_jd_utc: float, end_jd_utc: float, planets: Tuple[int, ...],
+                           ayanamsa: str) -> Tuple[List[Tuple], List[Tuple], int]:
+    """
+    Stations (jd_utc, planet, turns retrograde) and periods (kind, planet, start, end) in time order,
+    and the number of tasks
+
+    Chunks are merged off the event loop.
+    """
+    chunks = await run_planet_chunks("transit_events", calculate_event_chunk, start_jd_utc, end_jd_utc,
+                                     planets, ayanamsa)
+    stations, periods = await asyncio.to_thread(merge_events, chunks, start_jd_utc)
+    return stations, periods, len(chunks)
+
+
+def merge_events(chunks: List[Tuple[int, float, float, Any]], start_jd_utc: float) -> Tuple[List[Tuple], List[Tuple]]:
+    """
+    Stations (jd_utc, planet, turns retrograde) and periods (kind, planet, start, end) of all planet chunks
+    in time order
+
+    A period crossing chunk boundaries is found by every chunk it
+    overlaps; only the chunk holding its start within the range keeps it.
+    """
+    stations, periods = [], []
+    for planet, chunk_start, chunk_end, (chunk_stations, chunk_periods) in chunks:
+        stations += [(time, planet, turns) for time, turns in chunk_stations]
+        periods += [(kind, planet, start, end) for kind, start, end in chunk_periods
+                    if chunk_start <= max(start, start_jd_utc) < chunk_end]
+    stations.sort(key=lambda station: station[0])
+    periods.sort(key=lambda period: period[2])
+    return stations, periods
+
+
+def ingress_divisions(names: Optional[List[str]]) -> Tuple[str, ...]:
+    """Divisions for the given names (signs when empty), in sign-nakshatra-pada order"""
+    if not names:
+        return ("sign",)
+    unknown = [name for name in names if name.strip().lower() not in INGRESS_DIVISIONS]
+    if unknown:
+        raise ValueError(f"Unknown divisions {unknown}; use {list(INGRESS_DIVISIONS)}")
+    requested = {name.strip().lower() for name in names}
+    return tuple(division for division in INGRESS_DIVISIONS if division in requested)
+
+
+def event_kinds(names: Optional[List[str]]) -> Tuple[str, ...]:
+    """Event kinds for the given names (all when empty), in EVENT_KINDS order"""
+    if not names:
+        return EVENT_KINDS
+    unknown = [name for name in names if name.strip().lower() not in EVENT_KINDS]
+    if unknown:
+        raise ValueError(f"Unknown events {unknown}; use {list(EVENT_KINDS)}")
+    requested = {name.strip().lower() for name in names}
+    return tuple(kind for kind in EVENT_KINDS if kind in requested)
+
+
+def utc_julian_day(local_time: str, timezone_offset: float) -> float:
+    """Julian day (UTC) of an ISO local time at `timezone_offset` hours from UTC"""
+    value = datetime.fromisoformat(local_time)
+    return swe.julday(value.year, value.month, value.day,
+                      value.hour + value.minute / 60 + value.second / 3600) - timezone_offset / 24
+
+
+def local_times(jd_utc: np.ndarray, timezone_offset: float) -> np.ndarray:
+    """ISO local times (to the second) of Julian days in UTC"""
+    seconds = np.round((np.asarray(jd_utc) + timezone_offset / 24 - 2440587.5) * 86400).astype(np.int64)
+    return np.datetime_as_string(seconds.astype("datetime64[s]"), unit="s")
@@ -0,0 +1,32 @@
+"""Shared scaffolding of the test scripts: banner, numbered checks and the closing line"""
+
+import asyncio
+from typing import Callable, Optional
+
+
+def section(title: str):
+    """Print the heading of one numbered check"""
+    print(f"\n{title}")
+    print("-"*80)
+
+
+def run_script(name: str, checks: Callable, cleanup: Optional[Callable[[], None]] = None):
+    """
+    Run a script's checks between its banner and closing line
+
+    `checks` may be a coroutine function; `cleanup` runs even when a check
+    fails. Scripts call this under `if __name__ == "__main__"` so that pool
+    workers (spawned processes re-import the main module) and scripts
+    importing each other's helpers never run the checks.
+    """
+    print("="*80)
+    print(f"TESTING {name.upper()}")
+    print("="*80)
+    try:
+        result = checks()
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+    finally:
+        if cleanup is not None:
+            cleanup()
+    print(f"\nAll {name} checks passed!")
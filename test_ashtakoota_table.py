@@ -0,0 +1,58 @@
+"""Test script for the precomputed Ashtakoota table"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.services import ashtakoota
+from app.services.ashtakoota import AshtakootaTable, NAKSHATRA_PADAS, pyjhora_scores
+from app.services.calculator import PyJHoraCalculator
+from script_checks import run_script, section
+
+
+def run_checks():
+    section("Test 1: Every pair matches PyJHora")
+    start = time.perf_counter()
+    table = AshtakootaTable.build()
+    print(f"Built {NAKSHATRA_PADAS}x{NAKSHATRA_PADAS} table in {time.perf_counter() - start:.2f}s, {table.info()}")
+    assert table.verify() == []
+    scores, total = PyJHoraCalculator.ashtakoota_scores(4, 2, 13, 3)
+    reference = pyjhora_scores(4, 2, 13, 3)
+    assert [(s["score"], s["max"]) for s in scores.values()] == [(float(a), float(b)) for a, b in reference]
+    assert total == sum(score for score, _ in reference)
+    print(f"  Rohini 2 / Hasta 3: {total}/36")
+
+    section("Test 2: Saved tables are reused only for the same version")
+    path = os.path.join(tempfile.mkdtemp(prefix="pyjhora-ashtakoota-test-"), "table.npz")
+    table.save(path)
+    print(f"Saved {os.path.getsize(path)} bytes")
+    loaded = AshtakootaTable.load(path)
+    assert loaded.source == "loaded" and np.array_equal(loaded.half_points, table.half_points)
+    original_version = ashtakoota.ASHTAKOOTA_TABLE_VERSION
+    ashtakoota.ASHTAKOOTA_TABLE_VERSION = original_version + 1
+    try:
+        assert AshtakootaTable.load(path) is None
+    finally:
+        ashtakoota.ASHTAKOOTA_TABLE_VERSION = original_version
+
+    section("Test 3: A table that disagrees with PyJHora is rebuilt")
+    corrupted = table.half_points.copy()
+    corrupted[:, :, 7] = 16 - corrupted[:, :, 7]
+    AshtakootaTable(corrupted, table.maxima).save(path)
+    assert AshtakootaTable.load(path).verify(32)
+    os.environ["PYJHORA_ASHTAKOOTA_TABLE"] = path
+    ashtakoota._table = None
+    try:
+        rebuilt = ashtakoota.ashtakoota_table()
+        print(f"Loaded corrupted table -> {rebuilt.source}")
+        assert rebuilt.source == "built" and np.array_equal(rebuilt.half_points, table.half_points)
+        assert AshtakootaTable.load(path).verify(32) == []
+    finally:
+        del os.environ["PYJHORA_ASHTAKOOTA_TABLE"]
+        ashtakoota._table = None
+
+
+if __name__ == "__main__":
+    run_script("Ashtakoota table", run_checks)
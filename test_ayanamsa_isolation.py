@@ -0,0 +1,89 @@
+"""Test script for ayanamsa isolation between concurrent calculations"""
+
+import asyncio
+import threading
+
+from app.services.calculator import PyJHoraCalculator
+from app.services.ayanamsa import AyanamsaGuard, LIBRARY_AYANAMSA
+from app.services.executor import CalculationPool, invoke_calculator
+
+# Test data for Sharan
+birth_data = {
+    'date': '1998-12-22',
+    'time': '17:12:00',
+    'latitude': 12.9716,
+    'longitude': 77.5946,
+    'timezone_offset': 5.5
+}
+
+AYANAMSAS = ['LAHIRI', 'KP', 'RAMAN']
+ROUNDS = 20
+
+
+def calculate(ayanamsa):
+    """Calculations whose output depends on the active sidereal mode"""
+    calc = PyJHoraCalculator(birth_data, ayanamsa)
+    return calc.ayanamsa_value, calc.calculate_panchanga(), calc.calculate_current_transits()
+
+
+print("="*80)
+print("TESTING AYANAMSA ISOLATION")
+print("="*80)
+
+# Serial reference results
+reference = {ayanamsa: calculate(ayanamsa) for ayanamsa in AYANAMSAS}
+print(f"\nLibrary ayanamsa (shared mode): {LIBRARY_AYANAMSA}")
+for ayanamsa, (value, _, transits) in reference.items():
+    moon = transits['planetary_positions'][1]
+    print(f"  {ayanamsa:<8} ayanamsa={value:.4f}  Moon={moon['longitude']}")
+
+# Concurrent threads, each mixing modes, guarded
+guard = AyanamsaGuard()
+mismatches = []
+
+
+def worker(offset):
+    for i in range(ROUNDS):
+        ayanamsa = AYANAMSAS[(i + offset) % len(AYANAMSAS)]
+        with guard.use(ayanamsa):
+            result = calculate(ayanamsa)
+        if result != reference[ayanamsa]:
+            mismatches.append(ayanamsa)
+
+
+threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+
+print(f"\nConcurrent calculations: {6 * ROUNDS}")
+print(f"Mismatches against serial results: {len(mismatches)}")
+print(f"Guard stats: {guard.stats()}")
+assert not mismatches, f"Ayanamsa cross-talk detected: {mismatches}"
+
+# Same mode repeatedly should not re-set PyJHora's mode
+guard = AyanamsaGuard()
+for _ in range(5):
+    with guard.use('KP'):
+        PyJHoraCalculator(birth_data, 'KP')
+print(f"\nRepeated KP requests -> mode switches: {guard.switches}")
+assert guard.switches <= 1
+
+
+async def run_thread_pool():
+    pool = CalculationPool(workers=4, max_queue=64, timeout=60, executor="thread")
+    jobs = [
+        pool.submit(invoke_calculator, birth_data, ayanamsa, 'calculate_current_transits', (), None)
+        for ayanamsa in AYANAMSAS * 5
+    ]
+    results = await asyncio.gather(*jobs)
+    pool.shutdown()
+    return [r == reference[a][2] for r, a in zip(results, AYANAMSAS * 5)]
+
+
+matches = asyncio.run(run_thread_pool())
+print(f"Thread pool transit results matching serial: {sum(matches)}/{len(matches)}")
+assert all(matches)
+
+print("\nAll ayanamsa isolation checks passed!")
@@ -0,0 +1,80 @@
+"""Test script for batch chart calculation"""
+
+import os
+import time
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.calculator import PyJHoraCalculator
+from script_checks import run_script, section
+
+BATCH_SIZE = 60
+
+
+def make_births(count):
+    """Births spread over a few decades, alternating between two cities"""
+    births = []
+    for i in range(count):
+        day = date(1960, 1, 1) + timedelta(days=397 * i)
+        lat, lon, place = (12.9716, 77.5946, "Bangalore, India") if i % 2 else (13.0827, 80.2707, "Chennai, India")
+        births.append({
+            'date': day.isoformat(),
+            'time': f"{(5 + i) % 24:02d}:{(7 * i) % 60:02d}:00",
+            'latitude': lat,
+            'longitude': lon,
+            'timezone_offset': 5.5,
+            'place_name': place
+        })
+    return births
+
+
+def run_checks():
+    births = make_births(BATCH_SIZE)
+    births[7] = dict(births[7], date="1990-02-30")
+    births[11] = {"date": "1990-01-01"}
+
+    with TestClient(app) as client:
+        section(f"Test 1: {BATCH_SIZE} births, D1 + D9, with two invalid records")
+        start = time.perf_counter()
+        response = client.post("/api/v1/batch/charts", json={"births": births, "chart_types": ["D1", "D9"]})
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200, response.text
+        body = response.json()
+        print(f"Elapsed {elapsed:.2f}s, succeeded {body['succeeded']}, failed {body['failed']}, "
+              f"info {body['calculation_info']}")
+        assert [r['index'] for r in body['results']] == list(range(BATCH_SIZE))
+        assert body['failed'] == 2 and body['succeeded'] == BATCH_SIZE - 2
+        print(f"  #7:  {body['results'][7]['error']}")
+        print(f"  #11: {body['results'][11]['error']}")
+        assert body['results'][7]['status'] == "error" and "date" in body['results'][7]['error']
+
+        # Identical to calculating each record on its own
+        for result in body['results']:
+            if result['status'] == "success":
+                calc = PyJHoraCalculator(births[result['index']], 'LAHIRI')
+                assert result['charts']['D9'] == calc.calculate_chart('D9'), f"Record {result['index']}"
+                assert result['charts']['D1']['birth_data']['place_name'] == births[result['index']]['place_name']
+        print("  Every chart matches a direct calculation")
+
+        section("Test 2: Repeated records are served from the result cache")
+        again = client.post("/api/v1/batch/charts", json={"births": births[:20], "chart_types": ["D1", "D9"]}).json()
+        print(f"Info: {again['calculation_info']}")
+        assert again['calculation_info']['cached'] == 18 and again['calculation_info']['calculated'] == 0
+        assert again['results'][3] == body['results'][3]
+        single = client.post("/api/v1/charts/vargas", json={"birth_data": births[0], "chart_types": ["D1"]})
+        assert single.status_code == 200
+
+        section("Test 3: Batch size limit")
+        os.environ["PYJHORA_BATCH_LIMIT"] = "10"
+        try:
+            too_many = client.post("/api/v1/batch/charts", json={"births": births[:11]})
+            print(f"11 births with a limit of 10 -> HTTP {too_many.status_code}")
+            assert too_many.status_code == 422
+        finally:
+            del os.environ["PYJHORA_BATCH_LIMIT"]
+
+
+if __name__ == "__main__":
+    run_script("batch chart", run_checks)
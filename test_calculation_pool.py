@@ -0,0 +1,111 @@
+"""Test script for the calculation process pool"""
+
+import asyncio
+import time
+
+from app.services.calculator import PyJHoraCalculator
+from app.services.cache import result_cache
+from app.services.executor import (
+    CalculationPool, FanOutSlots, PoolSaturatedError, CalculationTimeoutError, calculation_pool,
+    invoke_calculator, run_cached
+)
+from script_checks import run_script, section
+
+# Test data for Sharan
+birth_data = {
+    'date': '1998-12-22',
+    'time': '17:12:00',
+    'latitude': 12.9716,
+    'longitude': 77.5946,
+    'timezone_offset': 5.5
+}
+
+
+def slow_task(seconds):
+    """Stand-in for a long calculation such as yogas"""
+    time.sleep(seconds)
+    return seconds
+
+
+async def run_checks():
+    pool = CalculationPool(workers=2, max_queue=3, timeout=5)
+
+    section("Test 1: Pool result matches direct calculation")
+    pooled = await pool.submit(invoke_calculator, birth_data, 'LAHIRI', 'calculate_chart', ('D9',), None)
+    direct = PyJHoraCalculator(birth_data, 'LAHIRI').calculate_chart('D9')
+    assert pooled == direct, "Pooled D9 chart differs from direct calculation"
+    print(f"D9 ascendant: {pooled['ascendant']['sign']} (identical)")
+
+    section("Test 2: Event loop stays responsive while workers are busy")
+    busy = asyncio.ensure_future(pool.submit(slow_task, 1.0))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await asyncio.sleep(0)
+    stats = pool.stats()
+    lag = time.perf_counter() - start
+    assert lag < 0.1, f"Event loop blocked for {lag:.3f}s"
+    assert stats['running'] == 1
+    print(f"Loop lag: {lag*1000:.2f} ms, running: {stats['running']}")
+    await busy
+
+    section("Test 3: Queue limit rejects excess tasks")
+    tasks = [asyncio.ensure_future(pool.submit(slow_task, 0.5)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    try:
+        await pool.submit(slow_task, 0.1)
+        raise AssertionError("Fourth task should have been rejected")
+    except PoolSaturatedError as e:
+        print(f"Rejected: {e}")
+    print(f"Stats while saturated: {pool.stats()}")
+    await asyncio.gather(*tasks)
+
+    section("Test 4: Per-task timeout")
+    pool.timeout = 0.2
+    try:
+        await pool.submit(slow_task, 1.0)
+        raise AssertionError("Task should have timed out")
+    except CalculationTimeoutError as e:
+        print(f"Timed out: {e} (HTTP {e.status_code})")
+
+    stats = pool.stats()
+    print(f"Stats after the timeout: {stats}")
+    assert stats['abandoned'] == 1 and stats['running'] == 1
+
+    section("Test 5: Abandoned tasks hold their slot until they finish")
+    pool.timeout = 5
+    tasks = [asyncio.ensure_future(pool.submit(slow_task, 0.1)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    try:
+        await pool.submit(slow_task, 0.1)
+        raise AssertionError("Task beyond max_queue should have been rejected while the timed-out one runs")
+    except PoolSaturatedError as e:
+        print(f"Rejected: {e}")
+    await asyncio.gather(*tasks)
+    await asyncio.sleep(1.0)
+    stats = pool.stats()
+    print(f"\nFinal stats: {stats}")
+    assert stats['abandoned'] == 0 and stats['running'] == 0 and stats['queued'] == 0
+    assert stats['rejected'] == 2 and stats['timed_out'] == 1
+    pool.shutdown()
+
+    section("Test 6: Waiting for a fan-out slot is bounded by the pool timeout")
+    original_timeout = calculation_pool.timeout
+    calculation_pool.timeout = 0.2
+    try:
+        slots = FanOutSlots(1)
+        async with slots:
+            try:
+                async with slots:
+                    raise AssertionError("Second chunk should not have got the only slot")
+            except PoolSaturatedError as e:
+                print(f"Rejected: {e} (HTTP {e.status_code})")
+            # Cached results are returned without waiting for a slot
+            result_cache.set("fan-out-test", "cached")
+            assert await run_cached("fan-out-test", slow_task, 1.0, slots=slots) == "cached"
+    finally:
+        calculation_pool.timeout = original_timeout
+    print("Cache hits did not take a slot")
+
+
+if __name__ == "__main__":
+    run_script("calculation pool", run_checks)
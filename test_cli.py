@@ -0,0 +1,91 @@
+"""Test script for the offline command-line batch runner"""
+
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from test_batch_charts import make_births
+from script_checks import run_script, section
+
+ROWS = 12
+OPERATIONS = "varga_table,dasha,ashtakavarga,panchanga"
+API_ENDPOINTS = {
+    "varga_table": "/api/v1/charts/vargas",
+    "ashtakavarga": "/api/v1/strength/ashtakavarga",
+    "panchanga": "/api/v1/panchanga/"
+}
+
+
+def run_cli(*args, stdin=None):
+    return subprocess.run(
+        [sys.executable, "-m", "app.cli", *args], input=stdin, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)), timeout=600
+    )
+
+
+def run_checks():
+    births = make_births(ROWS)
+    births[3] = dict(births[3], time="25:00:00")
+    workdir = tempfile.mkdtemp(prefix="pyjhora-cli-test-")
+    input_path = os.path.join(workdir, "births.csv")
+    output_path = os.path.join(workdir, "results.jsonl")
+    with open(input_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", *births[0]])
+        writer.writeheader()
+        for i, birth in enumerate(births):
+            writer.writerow({"id": i, **birth})
+
+    section(f"Test 1: CSV file, {ROWS} rows, {OPERATIONS}")
+    result = run_cli(input_path, "-o", output_path, "--operations", OPERATIONS, "--chart-types", "D1,D9",
+                     "--as-of", "2025-01-01", "--workers", "2", "--chunk-size", "4")
+    assert result.returncode == 0, result.stderr
+    summary = result.stderr.strip().splitlines()[-1]
+    print(summary)
+    assert f"Processed {ROWS} rows ({ROWS - 1} succeeded, 1 failed)" in summary and "rows/sec" in summary
+    with open(output_path) as f:
+        records = [json.loads(line) for line in f]
+    assert [record["row"] for record in records] == list(range(ROWS))
+    assert records[3]["status"] == "error" and "time" in records[3]["errors"]["birth_data"]
+    assert records[5]["fields"] == {"id": "5"}
+    print("  Rows in input order with the invalid row reported")
+
+    section("Test 2: Output is identical to the API")
+    with TestClient(app) as client:
+        for record in (records[0], records[7], records[11]):
+            birth = births[record["row"]]
+            for name, path in API_ENDPOINTS.items():
+                body = {"birth_data": birth, "chart_types": ["D1", "D9"]} if name == "varga_table" else {"birth_data": birth}
+                response = client.post(path, json=body)
+                assert response.status_code == 200, response.text
+                assert record["results"][name] == response.json(), f"{name} differs for row {record['row']}"
+            dasha = client.post("/api/v1/dashas/vimsottari", json={"birth_data": birth, "as_of": "2025-01-01"}).json()
+            for key in ("current_dasha", "maha_dasha_periods", "as_of"):
+                assert record["results"]["dasha"][key] == dasha[key]
+    print("  Charts, ashtakavarga, panchanga and dasha match the endpoints")
+
+    section("Test 3: JSONL from stdin to stdout")
+    lines = "\n".join(json.dumps(birth) for birth in births[:5])
+    result = run_cli("-", "--operations", "charts", "--workers", "1", "--quiet", stdin=lines)
+    assert result.returncode == 0, result.stderr
+    streamed = [json.loads(line) for line in result.stdout.splitlines()]
+    print(f"{len(streamed)} rows on stdout")
+    assert [record["status"] for record in streamed] == ["success"] * 3 + ["error", "success"]
+    assert streamed[4]["results"]["charts"]["D1"]["birth_data"] == records[4]["birth_data"]
+
+    section("Test 4: Usage errors")
+    result = run_cli(input_path, "--operations", "horoscope")
+    print(f"Unknown operation -> exit {result.returncode}: {result.stderr.strip().splitlines()[-1]}")
+    assert result.returncode == 1
+    assert run_cli(input_path, "--workers", "0").returncode == 2
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_script("command-line runner", run_checks)
@@ -0,0 +1,116 @@
+"""Test script for one-to-many compatibility matching"""
+
+import asyncio
+import os
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.cache import nakshatra_cache
+from app.services.calculator import NAKSHATRA_NAMES
+from app.services.executor import calculation_pool
+from test_batch_charts import make_births
+from script_checks import run_script, section
+
+CANDIDATES = 40
+LARGE_CANDIDATES = 30
+
+
+def run_checks():
+    births = make_births(CANDIDATES + 1)
+    profile, others = births[0], births[1:]
+    candidates = [{"id": f"c{i}", "birth_data": birth} for i, birth in enumerate(others)]
+
+    with TestClient(app) as client:
+        section(f"Test 1: {CANDIDATES} birth-data candidates, scores match /marriage")
+        body = {"profile": {"birth_data": profile}, "candidates": candidates, "top_k": CANDIDATES}
+        response = client.post("/api/v1/compatibility/match", json=body)
+        assert response.status_code == 200, response.text
+        match = response.json()
+        print(f"Profile {match['profile']}, info {match['calculation_info']}")
+        assert match["returned"] == CANDIDATES and match["calculation_info"]["nakshatras_calculated"] == CANDIDATES
+        scores = [result["total_score"] for result in match["results"]]
+        assert scores == sorted(scores, reverse=True)
+        for result in match["results"][:3] + match["results"][-3:]:
+            single = client.post("/api/v1/compatibility/marriage", json={
+                "boy_birth_data": profile, "girl_birth_data": others[result["index"]]
+            }).json()
+            assert result["total_score"] == single["total_score"]
+            assert result["ashtakoota_scores"] == single["ashtakoota_scores"]
+            assert result["nakshatra"] == single["girl"]["nakshatra"] and result["id"] == f"c{result['index']}"
+        print(f"  Best: {match['results'][0]['id']} {match['results'][0]['total_score']}/36")
+
+        section("Test 2: Girl profile, filters and top_k")
+        girl_body = dict(body, profile_role="girl", min_score=18, exclude_nadi_dosha=True, top_k=5)
+        filtered = client.post("/api/v1/compatibility/match", json=girl_body).json()
+        print(f"Matched {filtered['matched']} of {filtered['scored']}, returned {filtered['returned']}")
+        assert filtered["returned"] == min(5, filtered["matched"])
+        assert all(r["total_score"] >= 18 and not r["nadi_dosha"] for r in filtered["results"])
+        best = filtered["results"][0]
+        single = client.post("/api/v1/compatibility/marriage", json={
+            "boy_birth_data": others[best["index"]], "girl_birth_data": profile
+        }).json()
+        assert best["total_score"] == single["total_score"]
+
+        section("Test 3: Repeat search uses cached nakshatras; known nakshatras need no calculation")
+        again = client.post("/api/v1/compatibility/match", json=body).json()
+        print(f"Info: {again['calculation_info']}")
+        assert again["calculation_info"]["nakshatras_cached"] == CANDIDATES
+        assert again["calculation_info"]["nakshatras_calculated"] == 0
+        assert again["results"] == match["results"]
+
+        known = [{"id": result["id"], "nakshatra": result["nakshatra"], "nakshatra_pada": result["nakshatra_pada"]}
+                 for result in match["results"]]
+        known.append({"id": "bad", "nakshatra": 28, "nakshatra_pada": 1})
+        profile_nakshatra = {"nakshatra": NAKSHATRA_NAMES.index(match["profile"]["nakshatra"]) + 1,
+                             "nakshatra_pada": match["profile"]["nakshatra_pada"]}
+        by_nakshatra = client.post("/api/v1/compatibility/match", json={
+            "profile": profile_nakshatra, "candidates": known, "top_k": CANDIDATES
+        }).json()
+        assert by_nakshatra["calculation_info"]["nakshatras_given"] == CANDIDATES
+        assert [r["total_score"] for r in by_nakshatra["results"]] == scores
+        assert by_nakshatra["errors"][0]["id"] == "bad"
+        print(f"Invalid candidate reported: {by_nakshatra['errors'][0]['error']}")
+
+        section("Test 4: Validation")
+        missing = client.post("/api/v1/compatibility/match", json={"profile": {"nakshatra": 4}, "candidates": known})
+        print(f"Profile without pada -> HTTP {missing.status_code}")
+        assert missing.status_code == 422
+        os.environ["PYJHORA_MATCH_LIMIT"] = "10"
+        try:
+            too_many = client.post("/api/v1/compatibility/match", json=body)
+            print(f"{CANDIDATES} candidates with a limit of 10 -> HTTP {too_many.status_code}")
+            assert too_many.status_code == 422
+        finally:
+            del os.environ["PYJHORA_MATCH_LIMIT"]
+
+    section("Test 5: Concurrent large searches share the pool without saturating it")
+    # One chunk per candidate and no queue room beyond the workers: chunks of
+    # both searches must wait for the shared slots rather than be rejected
+    large = make_births(2 * LARGE_CANDIDATES + 1)[1:]
+    bodies = [{"profile": {"birth_data": profile}, "top_k": 1,
+               "candidates": [{"birth_data": birth} for birth in large[side::2]]} for side in (0, 1)]
+
+    async def concurrent_searches():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=300) as client:
+            return await asyncio.gather(*(client.post("/api/v1/compatibility/match", json=body) for body in bodies))
+
+    nakshatra_cache.clear()
+    max_queue, calculation_pool.max_queue = calculation_pool.max_queue, calculation_pool.workers
+    os.environ["PYJHORA_MATCH_CHUNK"] = "1"
+    try:
+        responses = asyncio.run(concurrent_searches())
+    finally:
+        calculation_pool.max_queue = max_queue
+        del os.environ["PYJHORA_MATCH_CHUNK"]
+    for response in responses:
+        assert response.status_code == 200, response.text
+        assert response.json()["errors"] == [], response.json()["errors"][:3]
+        assert response.json()["calculation_info"]["nakshatras_calculated"] == LARGE_CANDIDATES
+    print(f"  2 x {LARGE_CANDIDATES} chunks with a queue of {calculation_pool.workers}: no candidate errors")
+
+
+if __name__ == "__main__":
+    run_script("compatibility matching", run_checks)
@@ -0,0 +1,122 @@
+"""Test script for the N x M compatibility matrix"""
+
+import asyncio
+import base64
+import json
+import time
+
+import os
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import compatibility
+from app.services import matching
+from app.services.ashtakoota import ashtakoota_table
+from app.services.cache import nakshatra_cache
+from app.services.executor import calculation_pool
+from test_batch_charts import make_births
+from script_checks import run_script, section
+
+BOYS = 12
+GIRLS = 9
+
+
+def run_checks():
+    births = make_births(BOYS + GIRLS)
+    boys = [{"id": f"b{i}", "birth_data": birth} for i, birth in enumerate(births[:BOYS])]
+    girls = [{"id": f"g{i}", "birth_data": birth} for i, birth in enumerate(births[BOYS:])]
+    boys[5] = {"id": "b5", "nakshatra": "Rohini", "nakshatra_pada": 2}
+    girls[4] = {"id": "bad", "birth_data": {"date": "1990-13-01"}}
+    body = {"boys": boys, "girls": girls}
+
+    with TestClient(app) as client:
+        section(f"Test 1: {BOYS} x {GIRLS} matrix matches /marriage")
+        response = client.post("/api/v1/compatibility/matrix", json=dict(body, breakdown=True))
+        assert response.status_code == 200, response.text
+        matrix = response.json()
+        print(f"Shape {matrix['shape']}, errors {matrix['errors']}, info {matrix['calculation_info']}")
+        assert matrix["shape"] == [BOYS, GIRLS] and len(matrix["totals"]) == BOYS
+        assert matrix["girls"][4] is None and matrix["errors"][0]["side"] == "girls"
+        assert all(row[4] is None for row in matrix["totals"])
+        for row, column in ((0, 0), (3, 7), (11, 2)):
+            single = client.post("/api/v1/compatibility/marriage", json={
+                "boy_birth_data": births[row], "girl_birth_data": births[BOYS + column]
+            }).json()
+            assert matrix["totals"][row][column] == single["total_score"]
+            for koota, score in single["ashtakoota_scores"].items():
+                assert matrix["breakdown"][koota][row][column] == score["score"]
+        assert matrix["boys"][5] == {"id": "b5", "nakshatra": "Rohini", "nakshatra_pada": 2}
+        for row in range(BOYS):
+            for column in range(GIRLS):
+                if column != 4:
+                    total = sum(matrix["breakdown"][koota][row][column] for koota in matrix["kootas"])
+                    assert total == matrix["totals"][row][column]
+        print("  Totals and per-koota scores agree with the single-pair endpoint")
+
+        section("Test 2: uint8 encoding")
+        packed = client.post("/api/v1/compatibility/matrix", json=dict(body, encoding="uint8")).json()
+        cells = np.frombuffer(base64.b64decode(packed["totals"]), dtype=np.uint8).reshape(packed["shape"])
+        expected = np.array([[255 if value is None else value * 2 for value in row] for row in matrix["totals"]])
+        assert np.array_equal(cells, expected) and packed["invalid_value"] == 255
+        print(f"  {len(packed['totals'])} base64 chars vs {len(json.dumps(matrix['totals']))} as JSON lists")
+
+        section("Test 3: Streamed NDJSON rows")
+        with client.stream("POST", "/api/v1/compatibility/matrix", json=dict(body, stream=True, breakdown=True)) as streamed:
+            assert streamed.headers["content-type"].startswith("application/x-ndjson")
+            lines = [json.loads(line) for line in streamed.iter_lines() if line]
+        assert lines[0]["type"] == "header" and lines[-1]["type"] == "summary"
+        rows = lines[1:-1]
+        assert [row["row"] for row in rows] == list(range(BOYS))
+        assert [row["totals"] for row in rows] == matrix["totals"]
+        assert rows[3]["breakdown"]["nadi"] == matrix["breakdown"]["nadi"][3]
+        print(f"  {len(lines)} lines: header, {len(rows)} rows, summary")
+
+        section("Test 4: 200 x 200 known nakshatras")
+        group = [{"nakshatra": i % 27 + 1, "nakshatra_pada": i % 4 + 1} for i in range(200)]
+        start = time.perf_counter()
+        large = client.post("/api/v1/compatibility/matrix", json={"boys": group, "girls": group[::-1], "encoding": "uint8"})
+        print(f"HTTP {large.status_code} in {(time.perf_counter() - start) * 1000:.0f}ms, "
+              f"{len(large.content)} bytes")
+        assert large.status_code == 200 and large.json()["calculation_info"]["nakshatras_calculated"] == 0
+        assert client.post("/api/v1/compatibility/matrix", json=dict(body, encoding="csv")).status_code == 422
+
+        section("Test 5: The table is only used off the event loop")
+        used_on = []
+
+        def recording_table():
+            try:
+                asyncio.get_running_loop()
+                used_on.append("event loop")
+            except RuntimeError:
+                used_on.append("thread")
+            return ashtakoota_table()
+
+        compatibility.ashtakoota_table = matching.ashtakoota_table = recording_table
+        try:
+            client.post("/api/v1/compatibility/matrix", json=body)
+            with client.stream("POST", "/api/v1/compatibility/matrix", json=dict(body, stream=True)) as streamed:
+                list(streamed.iter_lines())
+        finally:
+            compatibility.ashtakoota_table = matching.ashtakoota_table = ashtakoota_table
+        print(f"  Table used {len(used_on)} times, on: {sorted(set(used_on))}")
+        assert used_on and set(used_on) == {"thread"}
+
+        section("Test 6: Both sides share the pool without saturating it")
+        # One chunk per profile and no queue room beyond the workers
+        nakshatra_cache.clear()
+        max_queue, calculation_pool.max_queue = calculation_pool.max_queue, calculation_pool.workers
+        os.environ["PYJHORA_MATCH_CHUNK"] = "1"
+        try:
+            shared = client.post("/api/v1/compatibility/matrix", json=body).json()
+        finally:
+            calculation_pool.max_queue = max_queue
+            del os.environ["PYJHORA_MATCH_CHUNK"]
+        assert [error["id"] for error in shared["errors"]] == ["bad"], shared["errors"]
+        assert shared["totals"] == matrix["totals"]
+        print(f"  {shared['calculation_info']} with a queue of {calculation_pool.workers}")
+
+
+if __name__ == "__main__":
+    run_script("compatibility matrix", run_checks)
@@ -0,0 +1,148 @@
+"""Test script for the comprehensive analysis section graph"""
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.main import app
+from app.routers import comprehensive
+from app.services.cache import result_cache
+from app.services.executor import PoolSaturatedError, calculation_pool, single_flight
+from app.services.pipeline import Section, run_sections
+from script_checks import run_script, section
+
+# Test data for Sharan
+birth_data = {
+    'date': '1998-12-22',
+    'time': '17:12:00',
+    'latitude': 12.9716,
+    'longitude': 77.5946,
+    'timezone_offset': 5.5
+}
+
+
+def sleeper(seconds, value):
+    async def run(done):
+        await asyncio.sleep(seconds)
+        return value
+    return run
+
+
+async def run_checks():
+    section("Test 1: Independent sections run concurrently, dependents wait")
+    order = []
+
+    async def summary(done):
+        order.append("summary")
+        return done["a"] + done["b"]
+
+    start = time.perf_counter()
+    results, failures, timings = await run_sections([
+        Section("a", sleeper(0.2, 1)),
+        Section("b", sleeper(0.3, 2)),
+        Section("c", sleeper(0.3, 3)),
+        Section("summary", summary, requires=("a", "b"))
+    ], timeout=5)
+    elapsed = time.perf_counter() - start
+    print(f"Elapsed {elapsed:.2f}s for 0.2s + 0.3s + 0.3s of sections, timings {timings}")
+    assert results == {"a": 1, "b": 2, "c": 3, "summary": 3} and not failures
+    assert elapsed < 0.5
+
+    section("Test 2: Timeouts and errors are flagged, the rest still completes")
+
+    async def broken(done):
+        raise ValueError("no moon")
+
+    results, failures, _ = await run_sections([
+        Section("fast", sleeper(0.01, "ok")),
+        Section("slow", sleeper(1.0, "late")),
+        Section("broken", broken),
+        Section("after_slow", sleeper(0.01, "never"), requires=("slow",))
+    ], timeout=0.2)
+    for name, failure in failures.items():
+        print(f"  {name:<12} {failure.reason}")
+    assert results == {"fast": "ok"}
+    assert failures["slow"].reason.startswith("timed out")
+    assert failures["broken"].reason == "error: no moon"
+    assert failures["after_slow"].reason == "skipped, requires slow"
+
+    try:
+        await run_sections([Section("x", sleeper(0, 1), requires=("y",)), Section("y", sleeper(0, 1), requires=("x",))])
+        raise AssertionError("Cycle should have been rejected")
+    except ValueError as e:
+        print(f"  Rejected: {e}")
+
+    section("Test 3: Full analysis sections match the single-purpose endpoints")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        payload = {"birth_data": birth_data, "as_of": "2015-06-15"}
+        full = (await client.post("/api/v1/comprehensive/full-analysis", json=payload)).json()
+        dasha = (await client.post("/api/v1/dashas/vimsottari", json=payload)).json()
+        bhukti = (await client.post("/api/v1/dashas/bhukti", json=payload)).json()
+        d9 = (await client.post("/api/v1/charts/navamsa", json=payload)).json()
+        yogas = (await client.post("/api/v1/yogas/", json=payload)).json()
+
+    print(f"Section timings (ms): {full['summary']['section_timings_ms']}")
+    assert full['partial'] is False and full['failed_sections'] == []
+    assert full['as_of'] == "2015-06-15"
+    assert full['dashas']['maha_dasha']['current_period'] == dasha['current_dasha']
+    assert full['dashas']['antardasha']['current_period'] == bhukti['current_bhukti']
+    assert full['charts']['d9_navamsa']['planets'] == d9['planets']
+    assert full['yogas']['all_yogas'] == yogas['yogas']
+
+    section("Test 4: include/exclude decide what is calculated")
+    result_cache.clear()
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        started = single_flight.stats()['started']
+        light = await client.post("/api/v1/comprehensive/full-analysis",
+                                  json=dict(payload, include=["d1", "current_dasha"]))
+        body = light.json()
+        print(f"Sections calculated: {list(body['summary']['section_timings_ms'])}")
+        print(f"Response size: {len(light.content)} bytes (full analysis: {len(json.dumps(full))} bytes)")
+        assert single_flight.stats()['started'] - started == 1  # D1 and the maha dasha periods in one task
+        assert set(body['summary']['section_timings_ms']) == {"natal", "charts", "maha_dasha", "current_dasha"}
+        assert body['summary']['ephemeris_calls'] > 0
+        # Sections are cached under their own keys, so a repeat calculates nothing
+        again = (await client.post("/api/v1/comprehensive/full-analysis",
+                                   json=dict(payload, include=["d1", "current_dasha"]))).json()
+        assert single_flight.stats()['started'] - started == 1 and again['summary']['ephemeris_calls'] == 0
+        assert again['dashas'] == body['dashas']
+        assert list(body['charts']) == ["d1_rasi"]
+        assert body['dashas']['maha_dasha']['current_period'] == dasha['current_dasha']
+        assert 'periods' not in body['dashas']['maha_dasha'] and 'yogas' not in body
+
+        trimmed = (await client.post("/api/v1/comprehensive/full-analysis",
+                                     json=dict(payload, exclude="all_yogas,doshas,ashtakavarga"))).json()
+        assert trimmed['yogas']['present_yogas'] == full['yogas']['present_yogas']
+        assert 'all_yogas' not in trimmed['yogas'] and 'doshas' not in trimmed and 'ashtakavarga' not in trimmed
+
+        invalid = await client.post("/api/v1/comprehensive/full-analysis", json=dict(payload, include=["horoscope"]))
+        assert invalid.status_code == 422
+
+    section("Test 5: A failed natal task is reported against the sections it calculates")
+    original_calculate_many = comprehensive.calculate_many
+
+    async def failing_natal(birth_data, ayanamsa, calls):
+        if any(method == "calculate_vargas" for method, _, _ in calls):
+            raise PoolSaturatedError("Calculation pool is saturated, retry shortly")
+        return await original_calculate_many(birth_data, ayanamsa, calls)
+
+    comprehensive.calculate_many = failing_natal
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+            partial = (await client.post("/api/v1/comprehensive/full-analysis",
+                                         json=dict(payload, include=["d1", "current_dasha", "present_yogas"]))).json()
+    finally:
+        comprehensive.calculate_many = original_calculate_many
+    failed = {failure['section']: failure['reason'] for failure in partial['failed_sections']}
+    print(f"Failed sections: {failed}")
+    assert partial['partial'] is True and partial['charts'] is None and partial['yogas'] is not None
+    assert set(failed) == {"charts", "maha_dasha", "current_dasha"}
+    assert failed['charts'] == failed['maha_dasha'] == "Calculation pool is saturated, retry shortly"
+    calculation_pool.shutdown()
+
+
+if __name__ == "__main__":
+    run_script("comprehensive section", run_checks)
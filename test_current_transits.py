@@ -0,0 +1,83 @@
+"""Test script for current transits, Sade Sati and next sign entries"""
+
+import os
+
+import swisseph as swe
+from jhora import const
+from jhora.panchanga import drik
+
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.calculator import PyJHoraCalculator, SIGN_NAMES
+from script_checks import run_script, section
+
+CHENNAI = {"latitude": 13.0827, "longitude": 80.2707, "timezone_offset": 5.5}
+DATES = [("2025-06-15", "14:30:00"), ("1962-02-05", "05:15:00"), ("2047-11-30", "23:45:00")]
+
+# PyJHora body of each transit planet, by name
+BODIES = {"Sun": const._SUN, "Moon": const._MOON, "Mars": const._MARS, "Mercury": const._MERCURY,
+          "Jupiter": const._JUPITER, "Venus": const._VENUS, "Saturn": const._SATURN, "Rahu": const._RAHU}
+
+
+def run_checks():
+    # Exact Swiss Ephemeris positions, the store is covered by test_ephemeris_store
+    os.environ["PYJHORA_EPHEMERIS_STORE_ENABLED"] = "0"
+    try:
+        section("Test 1: Every planet is the body its name says")
+        for date, time in DATES:
+            calculator = PyJHoraCalculator({"date": date, "time": time, **CHENNAI}, "LAHIRI")
+            positions = {position["planet"]: position for position in calculator.calculate_current_transits()["planetary_positions"]}
+            hours = int(time[:2]) + int(time[3:5]) / 60 - CHENNAI["timezone_offset"]
+            jd_utc = swe.julday(*map(int, date.split("-")), hours)
+            with ayanamsa_guard.use("LAHIRI"):
+                expected = {name: drik.sidereal_longitude(jd_utc, body) for name, body in BODIES.items()}
+            expected["Ketu"] = drik.ketu(expected["Rahu"])
+            assert list(positions) == list(expected)
+            for name, longitude in expected.items():
+                assert positions[name]["longitude"] == round(longitude, 2), (date, name, positions[name], longitude)
+            assert positions["Rahu"]["retrograde"] and positions["Ketu"]["retrograde"]
+            print(f"  {date}: Mars {positions['Mars']['sign']}, Mercury {positions['Mercury']['sign']}, "
+                  f"Rahu {positions['Rahu']['sign']}, Ketu {positions['Ketu']['sign']}")
+
+        section("Test 2: The same instant gives the same transits in every timezone")
+        chennai = PyJHoraCalculator({"date": "2025-06-15", "time": "14:30:00", **CHENNAI}, "LAHIRI")
+        greenwich = PyJHoraCalculator({"date": "2025-06-15", "time": "09:00:00", "latitude": 51.4769,
+                                       "longitude": 0.0, "timezone_offset": 0.0}, "LAHIRI")
+        new_york = PyJHoraCalculator({"date": "2025-06-15", "time": "05:00:00", "latitude": 40.7128,
+                                      "longitude": -74.006, "timezone_offset": -4.0}, "LAHIRI")
+        transits = [calculator.calculate_current_transits()["planetary_positions"] for calculator in (chennai, greenwich, new_york)]
+        sade_sati = [(result["moon_sign"], result["current_saturn_sign"], result["in_sade_sati"])
+                     for result in (calculator.calculate_sade_sati() for calculator in (chennai, greenwich, new_york))]
+        assert transits[0] == transits[1] == transits[2]
+        assert sade_sati[0] == sade_sati[1] == sade_sati[2]
+        with ayanamsa_guard.use("LAHIRI"):
+            moon = drik.sidereal_longitude(swe.julday(2025, 6, 15, 9.0), const._MOON)
+        assert transits[0][1]["longitude"] == round(moon, 2)
+        print(f"  Moon at 09:00 UTC: {transits[0][1]['longitude']} in Chennai, Greenwich and New York")
+
+        section("Test 3: Next entries are found for every planet")
+        for date, time in DATES:
+            calculator = PyJHoraCalculator({"date": date, "time": time, **CHENNAI}, "LAHIRI")
+            entries = calculator.calculate_next_planet_entries(9)["next_entries"]
+            assert sorted(entry["planet"] for entry in entries) == sorted([*BODIES, "Ketu"]), (date, entries)
+            assert [entry["entry_datetime"] for entry in entries] == sorted(entry["entry_datetime"] for entry in entries)
+            for entry in entries:
+                local = entry["entry_datetime"]
+                hours = int(local[11:13]) + int(local[14:16]) / 60 + int(local[17:19]) / 3600 - CHENNAI["timezone_offset"]
+                jd_utc = swe.julday(int(local[:4]), int(local[5:7]), int(local[8:10]), hours)
+                assert local > f"{date}T{time}", (date, entry)
+                with ayanamsa_guard.use("LAHIRI"):
+                    # The planet is in the sign it enters a few seconds after the entry, not a few seconds before
+                    signs = []
+                    for offset in (-5 / 86400, 5 / 86400):
+                        body = BODIES["Rahu" if entry["planet"] == "Ketu" else entry["planet"]]
+                        longitude = drik.sidereal_longitude(jd_utc + offset, body)
+                        signs.append(int((drik.ketu(longitude) if entry["planet"] == "Ketu" else longitude) // 30))
+                assert signs[0] != signs[1] and signs[1] == SIGN_NAMES.index(entry["entering_sign"]), (date, entry, signs)
+            first = entries[0]
+            print(f"  From {date}: {len(entries)} entries, first {first['planet']} into {first['entering_sign']} {first['entry_datetime']}")
+    finally:
+        del os.environ["PYJHORA_EPHEMERIS_STORE_ENABLED"]
+
+
+if __name__ == "__main__":
+    run_script("current transit", run_checks)
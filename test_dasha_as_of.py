@@ -0,0 +1,72 @@
+"""Test script for as_of driven current dasha/bhukti periods"""
+
+import time
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.calculator import PyJHoraCalculator
+from app.services.cache import result_cache
+from script_checks import run_script, section
+
+# Test data for Sharan
+birth_data = {
+    'date': '1998-12-22',
+    'time': '17:12:00',
+    'latitude': 12.9716,
+    'longitude': 77.5946,
+    'timezone_offset': 5.5
+}
+
+
+def run_checks():
+    calc = PyJHoraCalculator(birth_data, 'LAHIRI')
+
+    section("Test 1: Natal periods are split from the as_of lookup")
+    periods = calc.calculate_dasha_periods('VIMSOTTARI')
+    bhuktis = calc.calculate_bhukti_periods('VIMSOTTARI')
+    assert 'current_dasha' not in periods and 'current_bhukti' not in bhuktis
+    for as_of in ['2000-01-01', '2015-06-15', '2030-03-01']:
+        dasha = PyJHoraCalculator.with_current_dasha(periods, as_of)
+        bhukti = PyJHoraCalculator.with_current_bhukti(bhuktis, as_of)
+        assert dasha == calc.calculate_dasha('VIMSOTTARI', as_of=as_of)
+        assert bhukti == calc.calculate_dasha_bhukti('VIMSOTTARI', as_of=as_of)
+        current = dasha['current_dasha']
+        assert current['start_date'] <= as_of < current['end_date']
+        assert bhukti['current_bhukti']['maha_dasha_lord'] == current['lord']
+        print(f"{as_of}: {current['lord']:<8} dasha / {bhukti['current_bhukti']['bhukti_lord']:<8} bhukti")
+
+    today = PyJHoraCalculator.with_current_dasha(periods)
+    assert today['as_of'] == date.today().isoformat()
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        PyJHoraCalculator.with_current_bhukti(bhuktis, '2020-01-01')
+    print(f"\nCurrent bhukti lookup: {(time.perf_counter() - start):.3f} ms per call")
+
+    section("Test 2: Endpoints share one cached natal tree across as_of dates")
+    result_cache.clear()
+    with TestClient(app) as client:
+        responses = [
+            client.post("/api/v1/dashas/bhukti",
+                        json={"birth_data": birth_data, "as_of": as_of})
+            for as_of in ['2000-01-01', '2030-03-01', None]
+        ]
+        assert [r.headers['X-Cache'] for r in responses] == ["MISS", "HIT", "HIT"]
+        lords = [r.json()['current_bhukti']['bhukti_lord'] for r in responses]
+        print(f"Bhukti lords for 2000-01-01, 2030-03-01, today: {lords}")
+        assert responses[0].json()['current_bhukti'] != responses[1].json()['current_bhukti']
+        assert responses[2].json()['as_of'] == date.today().isoformat()
+
+        current = client.post("/api/v1/dashas/current",
+                              json={"birth_data": birth_data, "as_of": "2000-01-01"}).json()
+        assert current['as_of'] == "2000-01-01"
+        assert current['current_dasha'] == PyJHoraCalculator.with_current_dasha(periods, '2000-01-01')['current_dasha']
+
+        invalid = client.post("/api/v1/dashas/current", json={"birth_data": birth_data, "as_of": "01/01/2000"})
+        assert invalid.status_code == 422
+
+
+if __name__ == "__main__":
+    run_script("dasha as_of", run_checks)
@@ -0,0 +1,87 @@
+"""Test script for the sunrise-based day timetable"""
+
+import random
+from datetime import date
+
+import swisseph as swe
+from fastapi.testclient import TestClient
+from jhora import utils
+from jhora.panchanga import drik
+
+from app.main import app
+from app.services.day_timetable import build_day_timetable, clock, clock_range, day_timetable, timetable_cache
+from test_panchanga_kernel import SwissEphemerisCounter
+from script_checks import run_script, section
+
+PLACES = 150
+
+
+def drik_timetable(jd, place):
+    return {
+        "sunrise": drik.sunrise(jd, place)[0],
+        "sunset": drik.sunset(jd, place)[0],
+        "rahu_kaal": drik.raahu_kaalam(jd, place),
+        "yamaganda": drik.yamaganda_kaalam(jd, place),
+        "gulika": drik.gulikai_kaalam(jd, place),
+        "durmuhurta": drik.durmuhurtam(jd, place),
+        "abhijit_muhurta": drik.abhijit_muhurta(jd, place),
+        "brahma_muhurta": drik.brahma_muhurtha(jd, place),
+        "moonrise": drik.moonrise(jd, place)[0],
+        "moonset": drik.moonset(jd, place)[0]
+    }
+
+
+def run_checks():
+    section(f"Test 1: Identical to the drik functions for {PLACES} random days and places")
+    rng = random.Random(20)
+    weekdays = set()
+    for _ in range(PLACES):
+        place = drik.Place("Test", rng.uniform(-55, 60), rng.uniform(-180, 180), round(rng.uniform(-11, 13) * 2) / 2)
+        jd = swe.julday(rng.randint(1900, 2100), rng.randint(1, 12), rng.randint(1, 28), rng.uniform(0, 24))
+        expected = drik_timetable(jd, place)
+        timetable = build_day_timetable(jd, place)
+        weekdays.add(timetable["weekday"])
+        for name in ("sunrise", "sunset", "moonrise", "moonset"):
+            assert timetable[name] == expected[name], name
+        for name in ("rahu_kaal", "yamaganda", "gulika", "abhijit_muhurta"):
+            assert [utils.to_dms(hours) for hours in timetable[name]] == expected[name], name
+        assert [utils.to_dms(hours) for period in timetable["durmuhurta"] for hours in period] == expected["durmuhurta"]
+        assert timetable["brahma_muhurta"] == expected["brahma_muhurta"]
+    assert weekdays == set(range(7))
+    print("  Every period matches, on all seven weekdays")
+
+    section("Test 2: Ephemeris work and the (date, cell, timezone) cache")
+    place = drik.Place("Chennai", 13.0827, 80.2707, 5.5)
+    jd = swe.julday(2024, 3, 12, 9.0)
+    with SwissEphemerisCounter() as separate:
+        drik_timetable(jd, place)
+    with SwissEphemerisCounter() as once:
+        build_day_timetable(jd, place)
+    print(f"  rise_trans calls: {separate.calls['rise_trans']} separately, {once.calls['rise_trans']} for the timetable")
+    assert once.calls["rise_trans"] * 4 < separate.calls["rise_trans"]
+
+    timetable_cache().clear()
+    with SwissEphemerisCounter() as cached:
+        first = day_timetable(jd, place)
+        later_that_day = day_timetable(jd + 0.3, place)
+        nearby = day_timetable(jd, drik.Place("Chennai", 13.0811, 80.2748, 5.5))
+    assert first == later_that_day == nearby and cached.calls["rise_trans"] == once.calls["rise_trans"]
+    assert timetable_cache().stats()["hits"] == 2 and day_timetable(jd + 1, place) != first
+    print(f"  Later the same day and 0.004 degrees away reuse the entry: {timetable_cache().stats()['hits']} hits")
+
+    section("Test 3: Extended panchanga reports the timetable")
+    birth_data = {"date": "2024-03-12", "time": "09:00:00", "latitude": 13.0827, "longitude": 80.2707,
+                  "timezone_offset": 5.5}
+    with TestClient(app) as client:
+        extended = client.post("/api/v1/panchanga/extended", json={"birth_data": birth_data}).json()
+    print(f"  {extended['vara']}, {extended['sun_moon_timings']}")
+    print(f"  Rahu Kaal {extended['inauspicious_periods']['rahu_kaal']['timing']}")
+    assert extended["vara"]["day"] == date(2024, 3, 12).strftime("%A")
+    assert extended["inauspicious_periods"]["rahu_kaal"]["timing"] == clock_range(first["rahu_kaal"])
+    assert extended["inauspicious_periods"]["durmuhurta"]["timings"] == [clock_range(p) for p in first["durmuhurta"]]
+    assert extended["auspicious_periods"]["brahma_muhurta"]["timing"] == clock_range(first["brahma_muhurta"])
+    assert extended["sun_moon_timings"]["sunrise"] == clock(first["sunrise"])
+
+
+if __name__ == "__main__":
+    run_script("day timetable", run_checks)
@@ -0,0 +1,159 @@
+"""Test script for the precomputed ephemeris store"""
+
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import swisseph as swe
+from fastapi.testclient import TestClient
+from jhora import const
+from jhora.panchanga import drik
+
+from app.main import app
+from app.services import ephemeris_store
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.calculator import PyJHoraCalculator
+from app.services.ephemeris_store import (EPHEMERIS_BODIES, EphemerisStore, parse_span, planet_series,
+                                          sidereal_position, sidereal_positions)
+from test_panchanga_kernel import SwissEphemerisCounter
+from script_checks import run_script, section
+
+SAMPLES = 300
+BIRTH = {"date": "2025-06-15", "time": "14:30:00", "latitude": 13.0827, "longitude": 80.2707, "timezone_offset": 5.5}
+
+
+def use_store(path):
+    """Point this process at the store in `path` (None to disable the store)"""
+    if path is None:
+        os.environ["PYJHORA_EPHEMERIS_STORE_ENABLED"] = "0"
+    else:
+        os.environ.pop("PYJHORA_EPHEMERIS_STORE_ENABLED", None)
+        os.environ["PYJHORA_EPHEMERIS_STORE"] = path
+    ephemeris_store._store = None
+    ephemeris_store._store_checked = -ephemeris_store.STORE_RECHECK_SECONDS
+
+
+def transit_results():
+    calculator = PyJHoraCalculator(BIRTH, "LAHIRI")
+    return (calculator.calculate_current_transits(), calculator.calculate_sade_sati(),
+            calculator.calculate_next_planet_entries(7))
+
+
+def run_checks():
+    section("Test 1: Built store stays within its error bounds against drik")
+    start = time.perf_counter()
+    store = EphemerisStore.build(*parse_span("2020-2040"))
+    print(f"Built 2020-2040 in {time.perf_counter() - start:.2f}s, {store.info()['bytes']} bytes")
+    path = os.path.join(tempfile.mkdtemp(prefix="pyjhora-ephemeris-test-"), "store.npy")
+    store.save(path)
+    use_store(path)
+    loaded = ephemeris_store.ephemeris_store()
+    assert loaded.source == "loaded" and np.array_equal(loaded.table, store.table)
+    assert loaded.verify(200) == {}
+    assert max(loaded.info()["error_bounds"].values()) < 1e-6
+    rng = random.Random(22)
+    utc = drik.Place("UTC", 0.0, 0.0, 0.0)
+    for ayanamsa in ("LAHIRI", "RAMAN", "KP", "TRUE_CITRA"):
+        worst = 0.0
+        with ayanamsa_guard.use(ayanamsa):
+            for _ in range(SAMPLES // 4):
+                jd = rng.uniform(loaded.start_jd, loaded.end_jd)
+                for planet in range(9):
+                    longitude, speed = sidereal_position(jd, planet, 1e-6)
+                    expected = drik.sidereal_longitude(jd, EPHEMERIS_BODIES[planet])
+                    if planet == 8:
+                        expected = drik.ketu(expected)
+                    error = abs((longitude - expected + 180) % 360 - 180)
+                    assert error <= loaded.error_bound(planet), (ayanamsa, planet, jd, error)
+                    assert abs(speed - drik.daily_planet_speed(jd, utc, EPHEMERIS_BODIES[planet])) < 1e-3
+                    assert abs(sidereal_positions(np.array([jd]), planet, 1e-6)[0, 0] - longitude) < 1e-9
+                    worst = max(worst, error / loaded.error_bound(planet))
+        print(f"  {ayanamsa}: largest error {worst:.2f} of the bound")
+
+    section("Test 2: Swiss Ephemeris when the store cannot give the requested precision")
+    jd_utc = loaded.start_jd + np.arange(50) * 7.3
+    with ayanamsa_guard.use("LAHIRI"):
+        exact = planet_series(jd_utc, 4)
+        assert np.array_equal(sidereal_positions(jd_utc, 4), exact)
+        assert np.array_equal(sidereal_positions(jd_utc - 400, 4, 1e-3), planet_series(jd_utc - 400, 4))
+        assert sidereal_position(float(jd_utc[3]), 4) == tuple(exact[:, 3].tolist())
+        straddling = sidereal_positions(jd_utc - 180, 4, 1e-6)
+        outside = jd_utc - 180 < loaded.start_jd
+        assert np.array_equal(straddling[:, outside], planet_series(jd_utc[outside] - 180, 4))
+        assert np.abs(straddling[0, ~outside] - planet_series(jd_utc[~outside] - 180, 4)[0]).max() <= loaded.error_bound(4)
+    print("  Exact values for tolerance 0 and for dates outside the span, also within one request")
+
+    section("Test 3: Lookups are memory reads")
+    jd_utc = loaded.start_jd + np.arange(20000) * 0.1
+    with ayanamsa_guard.use("LAHIRI"):
+        with SwissEphemerisCounter() as counter:
+            start = time.perf_counter()
+            stored = sidereal_positions(jd_utc, 1, 1e-6)
+            stored_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        exact = planet_series(jd_utc, 1)
+        exact_ms = (time.perf_counter() - start) * 1000
+    print(f"  20000 Moon positions: {exact_ms:.1f}ms -> {stored_ms:.1f}ms, {counter.calls['calc_ut']} calc_ut calls")
+    assert counter.calls["calc_ut"] == 0 and stored_ms < exact_ms
+    assert np.abs((stored[0] - exact[0] + 180) % 360 - 180).max() <= loaded.error_bound(1)
+
+    section("Test 4: Transits read the store and give the same results")
+    with SwissEphemerisCounter() as counter:
+        stored = transit_results()
+    use_store(None)
+    with SwissEphemerisCounter() as exact_counter:
+        exact = transit_results()
+    use_store(path)
+    print(f"  calc_ut calls: {exact_counter.calls['calc_ut']} without the store, {counter.calls['calc_ut']} with it")
+    assert stored == exact and counter.calls["calc_ut"] * 10 < exact_counter.calls["calc_ut"]
+    transits, sade_sati, entries = stored
+    jd_utc = swe.julday(2025, 6, 15, 14.5 - 5.5)
+    with ayanamsa_guard.use("LAHIRI"):
+        for position, body in zip(transits["planetary_positions"], EPHEMERIS_BODIES[:8]):
+            assert position["longitude"] == round(drik.sidereal_longitude(jd_utc, body), 2), position
+    assert sade_sati["current_saturn_sign"] == "Pisces"
+    assert [entry["planet"] for entry in entries["next_entries"]][:3] == ["Moon", "Mercury", "Venus"]
+    sun = next(entry for entry in entries["next_entries"] if entry["planet"] == "Sun")
+    assert sun["entering_sign"] == "Cancer" and sun["entry_date"] == "2025-07-16"
+    print(f"  {len(entries['next_entries'])} next entries, Sun enters Cancer {sun['entry_datetime']}")
+
+    # Positions of all planets at one instant share the ayanamsa lookups
+    ephemeris_store.grid_ayanamsa.cache_clear()
+    original, lookups = swe.get_ayanamsa_ex_ut, []
+    swe.get_ayanamsa_ex_ut = lambda *args: lookups.append(args[0]) or original(*args)
+    try:
+        assert PyJHoraCalculator(BIRTH, "LAHIRI").calculate_current_transits() == transits
+    finally:
+        swe.get_ayanamsa_ex_ut = original
+    print(f"  {len(lookups)} ayanamsa lookups for the positions of 9 planets")
+    assert len(lookups) == 2
+
+    section("Test 5: Stores of another version are ignored")
+    original_version = ephemeris_store.STORE_VERSION
+    ephemeris_store.STORE_VERSION = original_version + 1
+    try:
+        assert EphemerisStore.load(path) is None
+    finally:
+        ephemeris_store.STORE_VERSION = original_version
+    use_store(path + ".missing")
+    assert ephemeris_store.ephemeris_store() is None
+    with ayanamsa_guard.use("LAHIRI"):
+        assert sidereal_position(2461000.5, const._MOON, 1e-6) == tuple(planet_series(np.array([2461000.5]), 1)[:, 0].tolist())
+    print("  Missing or outdated store files fall back to Swiss Ephemeris")
+
+    section("Test 6: The store is loaded at startup, /health only reports it")
+    use_store(path)
+    assert ephemeris_store.store_stats()["loaded"] is False and ephemeris_store._store is None
+    with TestClient(app) as client:
+        assert ephemeris_store._store is not None
+        health = client.get("/health").json()["ephemeris_store"]
+    assert health["loaded"] and health["path"] == path
+    print(f"  Loaded at startup: {health['path']}")
+    del os.environ["PYJHORA_EPHEMERIS_STORE"]
+    use_store(ephemeris_store.store_path())
+
+
+if __name__ == "__main__":
+    run_script("ephemeris store", run_checks)
@@ -0,0 +1,163 @@
+"""Test script for background bulk calculation jobs"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+JOBS_DIR = tempfile.mkdtemp(prefix="pyjhora-jobs-test-")
+os.environ["PYJHORA_JOBS_DIR"] = JOBS_DIR
+os.environ["PYJHORA_JOB_CHUNK"] = "10"
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.calculator import PyJHoraCalculator
+from app.services import jobs
+from app.services.executor import calculation_pool
+from app.services.jobs import JobRunner, get_job_store, job_pool_slots
+from app.services.operations import operations_chunk_size
+from test_batch_charts import make_births
+from script_checks import run_script, section
+
+ROWS = 25
+
+
+def wait_for(client, job_id, timeout=600):
+    """Poll the job resource until it leaves the queued/running states"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/v1/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.5)
+    raise AssertionError(f"Job {job_id} did not finish: {job}")
+
+
+def results_of(client, job_id):
+    response = client.get(f"/api/v1/jobs/{job_id}/results")
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def csv_upload(births):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=["user_id", *births[0]])
+    writer.writeheader()
+    for i, birth in enumerate(births):
+        writer.writerow({"user_id": f"u{i}", **birth})
+    return out.getvalue().encode()
+
+
+def run_checks():
+    births = make_births(ROWS)
+    births[7] = dict(births[7], date="1990-02-30")
+
+    with TestClient(app) as client:
+        section(f"Test 1: CSV upload, {ROWS} rows, charts + dasha")
+        response = client.post(
+            "/api/v1/jobs",
+            files={"file": ("births.csv", csv_upload(births), "text/csv")},
+            data={"operations": "charts,dasha", "chart_types": "D1,D9", "as_of": "2025-01-01"}
+        )
+        assert response.status_code == 202, response.text
+        job = response.json()
+        assert job["status"] == "queued" and job["input"]["rows"] == ROWS
+        csv_job_id = job["id"]
+        job = wait_for(client, csv_job_id)
+        print(f"Status {job['status']}, progress {job['progress']}, throughput {job['throughput']}")
+        assert job["status"] == "completed", job
+        assert job["progress"]["processed_rows"] == ROWS and job["progress"]["failed_rows"] == 1
+        assert job["progress"]["percent"] == 100.0 and job["throughput"]["rows_per_second"] > 0
+        assert len(job["results"]["parts"]) == 3
+
+        records = results_of(client, job["id"])
+        assert [record["row"] for record in records] == list(range(ROWS))
+        assert records[7]["status"] == "error" and "date" in records[7]["errors"]["birth_data"]
+        assert records[3]["fields"] == {"user_id": "u3"}
+        for record in (records[0], records[12], records[24]):
+            calc = PyJHoraCalculator(births[record["row"]], "LAHIRI")
+            assert record["results"]["charts"]["D9"] == json.loads(json.dumps(calc.calculate_chart("D9")))
+            assert record["results"]["dasha"]["as_of"] == "2025-01-01"
+        part = client.get(job["results"]["parts"][1]["url"])
+        assert part.status_code == 200 and len(part.text.splitlines()) == 10
+        print("  Rows in input order, invalid row reported, results match direct calculation")
+
+        section("Test 2: JSONL upload with a malformed line")
+        lines = [json.dumps(birth) for birth in births[:12]]
+        lines[4] = "{not json"
+        response = client.post(
+            "/api/v1/jobs",
+            files={"file": ("births.jsonl", "\n".join(lines).encode(), "application/x-ndjson")},
+            data={"operations": "panchanga"}
+        )
+        assert response.status_code == 202, response.text
+        job = wait_for(client, response.json()["id"])
+        records = results_of(client, job["id"])
+        print(f"Status {job['status']}, failed rows {job['progress']['failed_rows']}")
+        assert job["status"] == "completed" and len(records) == 12
+        assert records[4]["status"] == "error" and "input" in records[4]["errors"]
+        assert "panchanga" in records[5]["results"]
+
+        section("Test 3: A job abandoned by a crashed worker resumes from its checkpoint")
+        store = get_job_store()
+        job_id = store.new_job_dir()
+        shutil.copy(os.path.join(store.job_dir(csv_job_id), "input.csv"), os.path.join(store.job_dir(job_id), "input.csv"))
+        job = store.create(job_id, "births.csv", "csv", "jsonl", ROWS, "LAHIRI", ["charts"],
+                           {"chart_types": ["D1"], "as_of": "2025-01-01", "dasha_system": "VIMSOTTARI"}, 10)
+        for part in range(2):
+            with open(store.part_path(job, part), "w") as f:
+                f.write(json.dumps({"row": part, "status": "checkpointed"}) + "\n")
+        store._connection().execute(
+            "UPDATE jobs SET status = 'running', owner = 'crashed-worker', heartbeat = ?, started = ?, "
+            "attempts = 1, next_chunk = 2, processed_rows = 20, active_seconds = 1 WHERE id = ?",
+            (time.time() - 3600, time.time() - 3600, job_id)
+        )
+        job = wait_for(client, job_id)
+        records = results_of(client, job_id)
+        print(f"Status {job['status']}, attempts {job['progress']['attempts']}, rows in output {len(records)}")
+        assert job["status"] == "completed" and job["progress"]["attempts"] == 2
+        assert job["progress"]["processed_rows"] == ROWS
+        assert [record["status"] for record in records[:2]] == ["checkpointed"] * 2
+        assert [record["row"] for record in records[2:]] == list(range(20, ROWS))
+        print("  Checkpointed parts were kept, only the remaining rows were calculated")
+
+        section("Test 4: Validation, cancellation and unknown jobs")
+        bad = client.post("/api/v1/jobs", files={"file": ("births.csv", b"date\n", "text/csv")},
+                          data={"operations": "horoscope"})
+        print(f"Unknown operation -> HTTP {bad.status_code}")
+        assert bad.status_code == 400
+        bad = client.post("/api/v1/jobs", files={"file": ("births.xlsx", b"", "application/octet-stream")})
+        assert bad.status_code == 400
+        assert client.get("/api/v1/jobs/does-not-exist").status_code == 404
+
+        response = client.post("/api/v1/jobs", files={"file": ("births.csv", csv_upload(make_births(200)), "text/csv")},
+                               data={"operations": "yogas"})
+        cancelled = client.delete(f"/api/v1/jobs/{response.json()['id']}").json()
+        print(f"Cancelled job -> {cancelled['status']}")
+        assert cancelled["status"] == "cancelled"
+        time.sleep(1)
+        assert client.get(f"/api/v1/jobs/{cancelled['id']}").json()["status"] == "cancelled"
+
+        section("Test 5: One runner processes jobs, on part of the pool")
+        # Another gunicorn worker: its runner waits for the lock instead of claiming jobs
+        standby = JobRunner(get_job_store())
+        assert jobs.job_runner.leader and not standby._lead() and not standby.leader
+        assert 1 <= job_pool_slots() <= max(1, calculation_pool.workers // 2)
+        print(f"Standby runner idle, jobs use {job_pool_slots()} of {calculation_pool.workers} pool workers")
+    # The lock is released on shutdown and taken over by the next runner
+    assert not jobs.job_runner.leader and standby._lead()
+
+    section("Test 6: Pool tasks hold fewer births for costlier operations")
+    assert operations_chunk_size(["charts"], 25) == 25
+    assert operations_chunk_size(["charts", "dasha"], 25) == 12
+    assert operations_chunk_size(["yogas"], 25) == 2
+    assert operations_chunk_size(["yogas", "shadbala"], 25) == 1
+    print("  25 births per task for charts, 2 for yogas, 1 for yogas and shadbala")
+
+
+if __name__ == "__main__":
+    run_script("background job", run_checks, cleanup=lambda: shutil.rmtree(JOBS_DIR, ignore_errors=True))
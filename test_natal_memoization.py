@@ -0,0 +1,56 @@
+"""Test script for the natal chart state shared by calculate_* methods"""
+
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.calculator import PyJHoraCalculator
+from app.services.executor import invoke_calculator_methods
+from test_panchanga_kernel import SwissEphemerisCounter
+from script_checks import run_script, section
+
+# Test data for Sharan
+birth_data = {
+    'date': '1998-12-22',
+    'time': '17:12:00',
+    'latitude': 12.9716,
+    'longitude': 77.5946,
+    'timezone_offset': 5.5
+}
+
+D1_METHODS = [
+    ("calculate_chart", ("D1",)),
+    ("calculate_vargas", (["D1", "D9", "D10"],)),
+    ("calculate_dasha_periods", ("VIMSOTTARI",)),
+    ("calculate_bhukti_periods", ("VIMSOTTARI",)),
+    ("calculate_ashtakavarga", ()),
+    ("calculate_house_wise", ("D1",))
+]
+
+
+def run_checks():
+    section("Test 1: D1 is computed once across charts, vargas, dashas and ashtakavarga")
+    with ayanamsa_guard.use("LAHIRI"):
+        with SwissEphemerisCounter() as separate_calls:
+            separate = []
+            for method, args in D1_METHODS:
+                calculator = PyJHoraCalculator(birth_data, "LAHIRI")
+                separate.append(getattr(calculator, method)(*args))
+                assert calculator.ephemeris_calls.get("rasi_chart") == 1, method
+        with SwissEphemerisCounter() as shared_calls:
+            calculator = PyJHoraCalculator(birth_data, "LAHIRI")
+            shared = [getattr(calculator, method)(*args) for method, args in D1_METHODS]
+    assert shared == separate
+    print(f"  Separate calculators: {separate_calls.calls['calc_ut']} calc_ut calls, "
+          f"one calculator: {shared_calls.calls['calc_ut']} ({calculator.ephemeris_calls})")
+    assert calculator.ephemeris_calls["rasi_chart"] == 1
+    assert calculator.total_ephemeris_calls == sum(calculator.ephemeris_calls.values())
+    assert shared_calls.calls["calc_ut"] < separate_calls.calls["calc_ut"]
+
+    section("Test 2: A pool task running several methods reports its calls")
+    outcomes, calls = invoke_calculator_methods(birth_data, "LAHIRI", [
+        (method, args, {}) for method, args in D1_METHODS] + [("calculate_horoscope", (), {})])
+    assert [value for _, value in outcomes[:-1]] == separate
+    assert outcomes[-1][0] is False and calls["rasi_chart"] == 1
+    print(f"  {calls}; a bad method call fails alone: {outcomes[-1][1]}")
+
+
+if __name__ == "__main__":
+    run_script("natal memoization", run_checks)
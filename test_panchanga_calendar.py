@@ -0,0 +1,108 @@
+"""Test script for the day-by-day Panchanga calendar"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import date
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.cache import result_cache
+from app.services.executor import calculation_pool
+from script_checks import run_script, section
+
+LOCATION = {"latitude": 13.0827, "longitude": 80.2707, "timezone_offset": 5.5, "place_name": "Chennai, India"}
+
+
+def run_checks():
+    with TestClient(app) as client:
+        section("Test 1: Streamed month matches the single-instant panchanga at each sunrise")
+        body = dict(LOCATION, start_date="2024-02-20", end_date="2024-03-20")
+        with client.stream("POST", "/api/v1/panchanga/calendar", json=body) as streamed:
+            assert streamed.status_code == 200
+            assert streamed.headers["content-type"].startswith("application/x-ndjson")
+            lines = [json.loads(line) for line in streamed.iter_lines() if line]
+        assert lines[0]["type"] == "header" and lines[-1]["type"] == "summary"
+        days = lines[1:-1]
+        print(f"{len(days)} days, summary {lines[-1]}")
+        assert len(days) == 30 and lines[-1]["total_days"] == 30 and lines[-1]["errors"] == 0
+        assert lines[-1]["calculation_info"]["tasks"] == 2
+        for day, following in zip(days, days[1:]):
+            assert day["next_sunrise"] == following["sunrise"]
+        for day in days:
+            assert day["vara"]["day"] == date.fromisoformat(day["date"]).strftime("%A")
+        for day in days[::3]:
+            single = client.post("/api/v1/panchanga/", json={
+                "birth_data": {**LOCATION, "date": day["date"], "time": day["sunrise"]}
+            }).json()
+            assert day["tithi"]["number"] == single["tithi"]["number"]
+            assert day["nakshatra"]["number"] == single["nakshatra"]["number"]
+            assert day["nakshatra"]["pada"] == single["nakshatra"]["pada"]
+            assert day["yoga"]["number"] == single["yoga"]["number"]
+            assert day["karana"]["number"] == single["karana"]["number"]
+        print(f"  {days[0]['date']}: {days[0]['tithi']['name']}, {days[0]['nakshatra']['name']}, "
+              f"sunrise {days[0]['sunrise']}")
+
+        section("Test 2: JSON document, served from the cache on repeat")
+        document = client.post("/api/v1/panchanga/calendar", json=dict(body, stream=False))
+        assert document.status_code == 200
+        assert [dict(day, type="day") for day in document.json()["days"]] == days
+        assert document.json()["location"]["place_name"] == "Chennai, India"
+        print(f"  {document.json()['total_days']} days in {document.json()['calculation_info']['elapsed_ms']}ms")
+
+        section("Test 3: A year in one request vs one /extended request per day")
+        year = dict(LOCATION, start_date="2023-01-01", end_date="2023-12-31", stream=False)
+        start = time.perf_counter()
+        calendar = client.post("/api/v1/panchanga/calendar", json=year).json()
+        calendar_seconds = time.perf_counter() - start
+        assert calendar["total_days"] == 365 and calendar["calculation_info"]["tasks"] == 12
+        start = time.perf_counter()
+        for day in range(1, 31):
+            client.post("/api/v1/panchanga/extended", json={
+                "birth_data": {**LOCATION, "date": f"2022-06-{day:02d}", "time": "06:00:00"}
+            })
+        per_day = (time.perf_counter() - start) / 30
+        print(f"  Calendar: {calendar_seconds:.2f}s; 365 single-day requests: ~{per_day * 365:.2f}s")
+        assert calendar_seconds < per_day * 365
+
+        section("Test 4: Validation")
+        backwards = client.post("/api/v1/panchanga/calendar", json=dict(body, start_date="2024-03-21"))
+        print(f"end_date before start_date -> HTTP {backwards.status_code}")
+        assert backwards.status_code == 422
+        os.environ["PYJHORA_CALENDAR_MAX_DAYS"] = "10"
+        try:
+            too_long = client.post("/api/v1/panchanga/calendar", json=body)
+            print(f"30 days with a limit of 10 -> HTTP {too_long.status_code}")
+            assert too_long.status_code == 422
+        finally:
+            del os.environ["PYJHORA_CALENDAR_MAX_DAYS"]
+
+    section("Test 5: Concurrent streams share the pool without saturating it")
+
+    async def concurrent_streams():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=300) as client:
+            async def stream(year):
+                body = dict(LOCATION, start_date=f"{year}-01-01", end_date=f"{year}-06-30")
+                async with client.stream("POST", "/api/v1/panchanga/calendar", json=body) as streamed:
+                    return [json.loads(line) async for line in streamed.aiter_lines() if line]
+            return await asyncio.gather(*(stream(year) for year in (2031, 2032, 2033)))
+
+    # No queue room beyond the workers: months of all streams must wait for the shared slots
+    result_cache.clear()
+    max_queue, calculation_pool.max_queue = calculation_pool.max_queue, calculation_pool.workers
+    try:
+        streams = asyncio.run(concurrent_streams())
+    finally:
+        calculation_pool.max_queue = max_queue
+    for lines in streams:
+        assert lines[-1]["type"] == "summary", lines[-1]
+        assert lines[-1]["total_days"] == len(lines) - 2 and lines[-1]["errors"] == 0
+    print(f"  3 streams of {len(streams[0]) - 2} days with a queue of {calculation_pool.workers}: no errors")
+
+
+if __name__ == "__main__":
+    run_script("panchanga calendar", run_checks)
@@ -0,0 +1,90 @@
+"""Test script for the fused panchanga kernel"""
+
+import random
+import time
+
+import swisseph as swe
+from jhora.panchanga import drik
+
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.panchanga_kernel import PanchangaKernel
+from script_checks import run_script, section
+
+INSTANTS = 200
+
+
+def drik_panchanga(jd, place):
+    return drik.tithi(jd, place), drik.nakshatra(jd, place), drik.yogam(jd, place), drik.karana(jd, place)
+
+
+def random_instants(count):
+    rng = random.Random(19)
+    for _ in range(count):
+        place = drik.Place("Test", rng.uniform(-60, 65), rng.uniform(-180, 180), round(rng.uniform(-11, 13) * 2) / 2)
+        yield swe.julday(rng.randint(1800, 2200), rng.randint(1, 12), rng.randint(1, 28), rng.uniform(0, 24)), place
+
+
+class SwissEphemerisCounter:
+    """Counts calc_ut and rise_trans calls made while active"""
+
+    def __enter__(self):
+        self.calls = {"calc_ut": 0, "rise_trans": 0}
+        self._originals = {name: getattr(swe, name) for name in self.calls}
+        for name, original in self._originals.items():
+            setattr(swe, name, self._counted(name, original))
+        return self
+
+    def _counted(self, name, original):
+        def counted(*args, **kwargs):
+            self.calls[name] += 1
+            return original(*args, **kwargs)
+        return counted
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(swe, name, original)
+
+
+def run_checks():
+    section(f"Test 1: Identical to drik for {INSTANTS} random instants and places, per ayanamsa")
+    for ayanamsa in ("LAHIRI", "RAMAN", "KP"):
+        with ayanamsa_guard.use(ayanamsa):
+            for jd, place in random_instants(INSTANTS):
+                expected = [list(limb) for limb in drik_panchanga(jd, place)]
+                result = [list(limb) for limb in PanchangaKernel(place).panchanga(jd)]
+                assert result == expected, (ayanamsa, jd, place, expected, result)
+        print(f"  {ayanamsa}: all limbs and end times identical")
+
+    section("Test 2: Ephemeris work per instant")
+    place = drik.Place("Chennai", 13.0827, 80.2707, 5.5)
+    jd = swe.julday(2024, 3, 10, 6.5)
+    with SwissEphemerisCounter() as separate:
+        drik_panchanga(jd, place)
+    with SwissEphemerisCounter() as fused:
+        PanchangaKernel(place).panchanga(jd)
+    print(f"  drik functions: {separate.calls}; kernel: {fused.calls}")
+    assert fused.calls["calc_ut"] * 2 < separate.calls["calc_ut"]
+    assert fused.calls["rise_trans"] * 2 < separate.calls["rise_trans"]
+
+    start = time.perf_counter()
+    for day in range(100):
+        drik_panchanga(jd + day, place)
+    separate_ms = (time.perf_counter() - start) * 10
+    start = time.perf_counter()
+    for day in range(100):
+        PanchangaKernel(place).panchanga(jd + day)
+    fused_ms = (time.perf_counter() - start) * 10
+    print(f"  {separate_ms:.2f}ms -> {fused_ms:.2f}ms per instant")
+
+    section("Test 3: One kernel reused for consecutive days shares their evaluations")
+    kernel = PanchangaKernel(place)
+    expected = [[list(limb) for limb in drik_panchanga(jd + day, place)] for day in range(30)]
+    with SwissEphemerisCounter() as reused:
+        results = [[list(limb) for limb in kernel.panchanga(jd + day)] for day in range(30)]
+    assert results == expected
+    print(f"  30 days: {reused.calls} ({reused.calls['calc_ut'] / 30:.1f} calc_ut per day)")
+    assert reused.calls["calc_ut"] < fused.calls["calc_ut"] * 30
+
+
+if __name__ == "__main__":
+    run_script("panchanga kernel", run_checks)
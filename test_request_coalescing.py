@@ -0,0 +1,83 @@
+"""Test script for coalescing concurrent identical requests"""
+
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.services.cache import result_cache
+from app.services.executor import SingleFlight, calculation_pool, single_flight
+from script_checks import run_script, section
+
+# Test data for Sharan
+birth_data = {
+    'date': '1998-12-22',
+    'time': '17:12:00',
+    'latitude': 12.9716,
+    'longitude': 77.5946,
+    'timezone_offset': 5.5
+}
+
+BURST = 8
+# Pool tasks behind one full analysis (the D1-based sections together, yogas, doshas)
+POOL_SECTIONS = 3
+
+
+async def run_checks():
+    section("Test 1: Waiters share one computation, its errors and survive the first caller leaving")
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"total_score": 28}
+
+    results = await asyncio.gather(*[flight.run("k", compute) for _ in range(5)])
+    assert len(calls) == 1 and all(r == {"total_score": 28} for r in results)
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ValueError("bad birth data")
+
+    outcomes = await asyncio.gather(*[flight.run("bad", failing) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(o, ValueError) for o in outcomes)
+
+    first = asyncio.ensure_future(flight.run("k2", compute))
+    await asyncio.sleep(0.01)
+    second = asyncio.ensure_future(flight.run("k2", compute))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == {"total_score": 28}
+    print(f"Stats: {flight.stats()}")
+    assert flight.stats() == {"in_flight": 0, "started": 3, "coalesced": 7}
+
+    section(f"Test 2: Burst of {BURST} identical full-analysis requests")
+    result_cache.clear()
+    completed = calculation_pool.stats()['completed']
+    coalesced = single_flight.stats()['coalesced']
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        payload = {"birth_data": birth_data, "ayanamsa": "LAHIRI"}
+        responses = await asyncio.gather(*[
+            client.post("/api/v1/comprehensive/full-analysis", json=payload) for _ in range(BURST)
+        ])
+        health = (await client.get("/health")).json()
+
+    assert all(r.status_code == 200 for r in responses)
+    # Everything but the per-request section timings is shared
+    bodies = [r.json() for r in responses]
+    for body in bodies:
+        body['summary'].pop('section_timings_ms')
+    assert all(body == bodies[0] for body in bodies)
+    headers = sorted(r.headers['X-Cache'] for r in responses)
+    print(f"X-Cache: {headers}")
+    print(f"Coalescing stats: {health['request_coalescing']}")
+    assert headers == ["COALESCED"] * (BURST - 1) + ["MISS"]
+    assert health['calculation_pool']['completed'] - completed == POOL_SECTIONS
+    assert health['request_coalescing']['coalesced'] - coalesced == (BURST - 1) * POOL_SECTIONS
+    calculation_pool.shutdown()
+
+
+if __name__ == "__main__":
+    run_script("request coalescing", run_checks)
@@ -0,0 +1,198 @@
+"""Test script for the calculation result cache"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.cache import (
+    CacheBackend, LRUCache, SQLiteCache, RedisCache, TieredCache, cache_key, canonical_birth_data, result_cache
+)
+from script_checks import run_script, section
+
+# Test data for Sharan
+birth_data = {
+    'date': '1998-12-22',
+    'time': '17:12:00',
+    'latitude': 12.9716,
+    'longitude': 77.5946,
+    'timezone_offset': 5.5,
+    'place_name': 'Bangalore, India'
+}
+
+
+class LocalRedis:
+    """In-memory stand-in for the subset of the Redis client used by RedisCache"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match="*"):
+        return [key for key in list(self.data) if key.startswith(match.rstrip("*"))]
+
+
+class UnavailableStore(LRUCache):
+    """Shared store that is down"""
+
+    def get(self, key):
+        raise ConnectionError("connection refused")
+
+    def set(self, key, value, ttl=None):
+        raise ConnectionError("connection refused")
+
+
+def run_checks():
+    section("Test 1: LRU size limit, TTL and counters")
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1) and cache.get("c") == (True, 3)
+    cache.set("d", 4, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get("d") == (False, None)
+    stats = cache.stats()
+    print(f"Stats: {stats}")
+    assert stats['evictions'] == 2 and stats['expirations'] == 1 and stats['hits'] == 3
+
+    # Pickled sizes are limited too: larger values are not kept, older ones make room for new ones
+    sized = LRUCache(maxsize=10, ttl=60, maxbytes=3000)
+    sized.set("big", b"x" * 4000)
+    sized.set("a", b"x" * 1000)
+    sized.set("b", b"x" * 1000)
+    sized.set("a", b"x" * 1200)
+    sized.set("c", b"x" * 1000)  # evicts "b", the least recently used
+    assert sized.get("big") == (False, None) and sized.get("b") == (False, None)
+    assert sized.get("a") == (True, b"x" * 1200) and sized.get("c")[0]
+    assert sized.stats()["entries"] == 2 and sized.stats()["bytes"] <= 3000
+    sized.clear()
+    assert sized.stats()["bytes"] == 0
+
+    # Every caller gets its own copy of a cached result
+    cache.set("chart", {"planets": [{"planet": "Sun"}]})
+    cache.get("chart")[1]["planets"].append({"planet": "Moon"})
+    assert cache.get("chart") == (True, {"planets": [{"planet": "Sun"}]})
+    try:
+        CacheBackend()
+        raise AssertionError("CacheBackend is abstract")
+    except TypeError:
+        pass
+
+    section("Test 2: Canonical keys")
+    variant = dict(birth_data, date='1998-12-22', latitude=12.97160, place_name='Bengaluru')
+    same = cache_key("calculate_yogas", canonical_birth_data(birth_data), "LAHIRI")
+    assert same == cache_key("calculate_yogas", canonical_birth_data(variant), "LAHIRI")
+    assert same != cache_key("calculate_yogas", canonical_birth_data(birth_data), "KP")
+    assert same != cache_key("calculate_doshas", canonical_birth_data(birth_data), "LAHIRI")
+    print(f"Key: {same}")
+
+    section("Test 3: Repeat requests are served from the cache")
+    result_cache.clear()
+    with TestClient(app) as client:
+        payload = {"birth_data": birth_data, "ayanamsa": "LAHIRI"}
+        responses = {}
+        for endpoint in ["/api/v1/yogas/", "/api/v1/strength/shadbala"]:
+            start = time.perf_counter()
+            first = client.post(endpoint, json=payload)
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            second = client.post(endpoint, json=payload)
+            warm = time.perf_counter() - start
+            assert first.status_code == 200 and second.status_code == 200
+            assert first.headers['X-Cache'] == "MISS" and second.headers['X-Cache'] == "HIT"
+            assert first.json() == second.json()
+            print(f"{endpoint:<30} cold {cold*1000:8.1f} ms   cached {warm*1000:6.1f} ms")
+            assert warm < cold
+            responses[endpoint] = first.json()
+
+        renamed = client.post("/api/v1/yogas/",
+                              json={"birth_data": dict(birth_data, place_name="Bengaluru"), "ayanamsa": "LAHIRI"})
+        assert renamed.headers['X-Cache'] == "HIT"
+        assert renamed.json()['birth_data']['place_name'] == "Bengaluru"
+
+        bypass = client.post("/api/v1/yogas/", json=payload, headers={"X-Cache-Bypass": "1"})
+        assert bypass.headers['X-Cache'] == "BYPASS"
+        assert bypass.json() == responses["/api/v1/yogas/"]
+
+        health = client.get("/health").json()
+        print(f"\nCache stats: {health['result_cache']}")
+        assert 'X-Cache' not in client.get("/health").headers
+
+    section("Test 4: Shared L2 tier")
+    chart = {"ascendant": {"sign": "Gemini"}, "houses": {1: ["Moon"]}}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        # Two gunicorn workers: separate L1s, one SQLite file
+        worker_a = TieredCache(LRUCache(maxsize=10, ttl=60), SQLiteCache(path, maxsize=100, ttl=60))
+        worker_b = TieredCache(LRUCache(maxsize=10, ttl=60), SQLiteCache(path, maxsize=100, ttl=60))
+        worker_a.set("chart", chart)
+        assert worker_b.get("chart") == (True, chart), "L2 entry not shared between workers"
+        assert worker_b.l1.get("chart") == (True, chart), "L2 hit not promoted to L1"
+        stats = worker_b.stats()
+        print(f"SQLite worker B stats: hits={stats['hits']} l2={stats['l2']}")
+
+        # Least recently used entries are pruned beyond maxsize
+        store = SQLiteCache(os.path.join(tmp, "small.sqlite3"), maxsize=5, ttl=60)
+        for i in range(SQLiteCache.PRUNE_EVERY):
+            store.set(f"k{i}", i)
+        assert store.stats()['entries'] == 5
+        assert store.get(f"k{SQLiteCache.PRUNE_EVERY - 1}") == (True, SQLiteCache.PRUNE_EVERY - 1)
+
+        # Batched and async access; a locked database never stalls the event loop
+        store.set_many([("a", 1), ("b", 2)])
+        assert store.get_many(["a", "missing", "b"]) == [(True, 1), (False, None), (True, 2)]
+        assert store.stats()['entries'] == 7
+
+        async def locked_write():
+            blocker = sqlite3.connect(path, isolation_level=None)
+            blocker.execute("BEGIN EXCLUSIVE")
+            write = asyncio.ensure_future(worker_a.aset("late", chart))
+            started, ticks = time.perf_counter(), 0
+            while time.perf_counter() - started < 0.3:
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert not write.done() and ticks > 10, ticks
+            blocker.execute("ROLLBACK")
+            blocker.close()
+            await write
+            worker_b.l1.clear()
+            return ticks, await worker_b.aget("late"), await worker_b.aget_many(["chart", "missing"])
+
+        ticks, late, many = asyncio.run(locked_write())
+        assert late == (True, chart) and many == [(True, chart), (False, None)]
+        print(f"Event loop ticked {ticks} times while the SQLite write waited on a lock")
+
+    shared = LocalRedis()
+    worker_a = TieredCache(LRUCache(maxsize=10, ttl=60), RedisCache(client=shared, ttl=60))
+    worker_b = TieredCache(LRUCache(maxsize=10, ttl=60), RedisCache(client=shared, ttl=60))
+    worker_a.set("chart", chart)
+    assert worker_b.get("chart") == (True, chart)
+    worker_b.clear()
+    assert not shared.data
+    print(f"Redis worker B stats: {worker_b.stats()['l2']}")
+
+    degraded = TieredCache(LRUCache(maxsize=10, ttl=60), UnavailableStore(maxsize=10, ttl=60))
+    degraded.set("chart", chart)
+    assert degraded.get("chart") == (True, chart) and degraded.get("other") == (False, None)
+    assert degraded.stats()['l2_errors'] == 2
+    print(f"Unavailable L2 tolerated, errors counted: {degraded.stats()['l2_errors']}")
+
+
+if __name__ == "__main__":
+    run_script("result cache", run_checks)
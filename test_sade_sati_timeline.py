@@ -0,0 +1,84 @@
+"""Test script for the lifetime Sade Sati timeline"""
+
+from datetime import datetime
+
+import numpy as np
+import swisseph as swe
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.calculator import PyJHoraCalculator, SATURN_TRANSITS, SIGN_NAMES
+from app.services.ephemeris_store import planet_series
+from script_checks import run_script, section
+
+BIRTH = {"date": "1985-03-10", "time": "06:30:00", "latitude": 13.0827, "longitude": 80.2707, "timezone_offset": 5.5}
+
+
+def jd_utc(local_time, timezone_offset=5.5):
+    """Julian day (UTC) of an ISO local time"""
+    parsed = datetime.fromisoformat(local_time)
+    return swe.julday(parsed.year, parsed.month, parsed.day,
+                      parsed.hour + parsed.minute / 60 + parsed.second / 3600 - timezone_offset)
+
+
+def run_checks():
+    section("Test 1: Periods match Saturn's daily sign over 100 years, phases start on sign boundaries")
+    calculator = PyJHoraCalculator(BIRTH, "LAHIRI")
+    result = calculator.calculate_sade_sati_timeline(100, ("ashtama", "kantaka"))
+    moon_sign = SIGN_NAMES.index(result["moon_sign"])
+    days = calculator.jd_utc + np.arange(0, 100 * 365.25, 1.0)
+    with ayanamsa_guard.use("LAHIRI"):
+        saturn = planet_series(days, 6)
+        offsets = (saturn[0] // 30).astype(int) - moon_sign
+        for kind, periods in result["timeline"].items():
+            expected = np.isin(offsets % 12, list(SATURN_TRANSITS[kind]))
+            found = np.zeros(len(days), dtype=bool)
+            for period in periods:
+                start, end = jd_utc(period["start"]), jd_utc(period["end"])
+                found |= (days >= start) & (days < end)
+                assert period["start"] == period["phases"][0]["start"] and period["end"] == period["phases"][-1]["end"]
+                for phase, following in zip(period["phases"], period["phases"][1:]):
+                    assert phase["end"] == following["start"]
+                for phase in period["phases"]:
+                    entry = jd_utc(phase["start"])
+                    longitude, speed = planet_series(np.array([entry]), 6)[:, 0]
+                    assert abs((longitude + 15) % 30 - 15) < 1e-3, (kind, phase)
+                    assert phase["retrograde_entry"] == (speed < 0), (kind, phase)
+            mismatched = np.count_nonzero(found != expected)
+            print(f"  {kind}: {len(periods)} periods in {periods[-1]['cycle']} cycles, {mismatched} mismatched days")
+            # Only days containing an ingress may disagree with the noon-to-noon samples
+            assert mismatched <= 2 * len(periods)
+    cycles = [period["cycle"] for period in result["timeline"]["sade_sati"]]
+    assert cycles == sorted(cycles) and len(set(cycles)) < len(cycles)
+    assert any(phase["retrograde_entry"] for period in result["timeline"]["sade_sati"] for phase in period["phases"])
+
+    section("Test 2: A period running at birth keeps its real start")
+    first = result["timeline"]["sade_sati"][0]
+    print(f"  Born {BIRTH['date']} in {result['moon_sign']} Moon, first Sade Sati {first['start']} to {first['end']}")
+    assert first["start"] < BIRTH["date"] < first["end"] and 7 < first["years"] < 8
+
+    section("Test 3: Current period of /sade-sati and the timeline endpoint")
+    now = PyJHoraCalculator({**BIRTH, "date": "2013-05-23"}, "LAHIRI")
+    sade_sati = now.calculate_sade_sati()
+    moon_sign = SIGN_NAMES.index(sade_sati["moon_sign"])
+    current = now.saturn_transit_periods(moon_sign, now.jd_utc, now.jd_utc, ("sade_sati",))["sade_sati"]
+    assert sade_sati["in_sade_sati"] and sade_sati["current_period"] == current[0]
+    assert current[0]["start"] < "2013-05-23" < current[0]["end"]
+    print(f"  In {sade_sati['current_phase']}, period {current[0]['start']} to {current[0]['end']}")
+
+    with TestClient(app) as client:
+        data = client.post("/api/v1/transits/sade-sati/timeline", json={"birth_data": BIRTH, "years": 100}).json()
+        both = client.post("/api/v1/transits/sade-sati/timeline", json={
+            "birth_data": BIRTH, "years": 100, "include": ["Kantaka", "ashtama"]}).json()
+        rejected = [client.post("/api/v1/transits/sade-sati/timeline", json={"birth_data": BIRTH, **change}).status_code
+                    for change in ({"years": 0}, {"years": 151}, {"include": ["janma"]})]
+    assert list(data["timeline"]) == ["sade_sati"]
+    assert data["timeline"]["sade_sati"] == result["timeline"]["sade_sati"]
+    assert list(both["timeline"]) == ["sade_sati", "ashtama", "kantaka"] and both["signs"]["ashtama"] == ["Taurus"]
+    assert rejected == [422, 422, 422]
+    print(f"  {len(data['timeline']['sade_sati'])} Sade Sati periods; invalid requests rejected")
+
+
+if __name__ == "__main__":
+    run_script("Sade Sati timeline", run_checks)
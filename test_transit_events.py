@@ -0,0 +1,141 @@
+"""Test script for the station, retrograde and combustion event search"""
+
+import asyncio
+import os
+import random
+import time
+
+import numpy as np
+import swisseph as swe
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.schemas import TransitEventRequest, TransitIngressRequest, TransitRangeRequest
+from app.routers import transits
+from app.services import transit_events
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.ephemeris_store import planet_series
+from app.services.transit_events import COMBUSTION_ORBS, planet_events
+from script_checks import run_script, section
+
+RANGES = 12
+
+
+def run_checks():
+    section(f"Test 1: Same periods as a fine scan for {RANGES} random ranges")
+    rng = random.Random(25)
+    with ayanamsa_guard.use("LAHIRI"):
+        for _ in range(RANGES):
+            planet = rng.randrange(1, 7)
+            start = swe.julday(rng.randint(1900, 2099), rng.randint(1, 12), rng.randint(1, 28), 0.0)
+            end = start + rng.uniform(30, 700)
+            stations, periods = planet_events(start, end, planet)
+            jd_utc = np.arange(start, end, 0.01)
+            longitude, speed = planet_series(jd_utc, planet)
+            distance = np.abs((longitude - planet_series(jd_utc, 0)[0] + 180) % 360 - 180)
+            direct, retrograde = COMBUSTION_ORBS[planet]
+            expected = {"retrograde": speed < 0, "combustion": distance <= np.where(speed < 0, retrograde, direct)}
+            for kind, state in expected.items():
+                found = np.zeros(len(jd_utc), dtype=bool)
+                for period_kind, period_start, period_end in periods:
+                    if period_kind == kind:
+                        found |= (jd_utc >= period_start) & (jd_utc < period_end)
+                assert np.array_equal(found, state), (planet, start, kind, np.count_nonzero(found != state))
+            assert len(stations) == np.count_nonzero(np.diff(np.signbit(speed)))
+            for station, turns_retrograde in stations:
+                assert abs(planet_series(np.array([station]), planet)[1, 0]) < 1e-6, (planet, station)
+                assert turns_retrograde == (planet_series(np.array([station + 0.5]), planet)[1, 0] < 0)
+    print("  Every retrograde and combustion period and every station found")
+
+    section("Test 2: Periods at the ends of the range keep their real dates")
+    with ayanamsa_guard.use("LAHIRI"):
+        mercury_start = swe.julday(2025, 3, 25, 0.0)
+        stations, periods = planet_events(mercury_start, mercury_start + 5, 3)
+    retrograde = [period for period in periods if period[0] == "retrograde"]
+    assert not stations and len(retrograde) == 1
+    assert retrograde[0][1] < mercury_start and retrograde[0][2] > mercury_start + 5 and 20 < retrograde[0][2] - retrograde[0][1] < 26
+    print(f"  Mercury retrograde {retrograde[0][2] - retrograde[0][1]:.1f} days around a 5-day range")
+    with ayanamsa_guard.use("LAHIRI"):
+        assert planet_events(mercury_start, mercury_start + 365, 0) == ([], [])
+        assert planet_events(mercury_start, mercury_start + 365, 7) == ([], [])
+
+    section("Test 3: Ten years of all planets through the endpoint")
+    request = {"start": "2025-01-01", "end": "2035-01-01", "timezone_offset": 5.5}
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        data = client.post("/api/v1/transits/events", json=request).json()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        chunked = client.post("/api/v1/transits/events", json={**request, "start": "2015-01-01"}).json()
+        stations = client.post("/api/v1/transits/events", json={
+            **request, "planets": ["Mercury"], "events": ["station"]}).json()
+        rejected = [client.post("/api/v1/transits/events", json={**request, **change}).status_code
+                    for change in ({"end": "2024-12-31"}, {"events": ["eclipse"]}, {"planets": ["Pluto"]})]
+    print(f"  {len(data['stations'])} stations, {len(data['retrograde'])} retrograde and "
+          f"{len(data['combustion'])} combustion periods in {elapsed_ms:.0f}ms ({data['calculation_info']})")
+    assert {station["planet"] for station in data["stations"]} == {"Mars", "Mercury", "Jupiter", "Venus", "Saturn"}
+    assert {period["planet"] for period in data["combustion"]} == {"Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"}
+    assert [station["time"] for station in data["stations"]] == sorted(station["time"] for station in data["stations"])
+    mercury = [station for station in data["stations"] if station["planet"] == "Mercury"]
+    assert [station["turns"] for station in mercury[:2]] == ["retrograde", "direct"]
+    assert mercury[0]["time"].startswith("2025-03-15")
+    assert data["combustion_orbs"]["Mercury"] == {"direct": 14, "retrograde": 12}
+    # Chunks of the longer search find the same periods, each once
+    later = {kind: [period for period in chunked[kind] if period["end"] > "2025-01-01"] for kind in ("retrograde", "combustion")}
+    assert chunked["calculation_info"]["tasks"] > data["calculation_info"]["tasks"]
+    for kind, periods in later.items():
+        assert [(period["planet"], period["start"][:16]) for period in periods] == \
+               [(period["planet"], period["start"][:16]) for period in data[kind]], kind
+    assert list(stations) == ["status", "start", "end", "timezone_offset", "ayanamsa", "planets", "events", "stations",
+                              "calculation_info"]
+    assert stations["stations"] == mercury
+    assert rejected == [422, 422, 422]
+    print(f"  Mercury next turns retrograde {mercury[0]['time']}; invalid requests rejected")
+
+    # Event and ingress searches have their own range limits
+    os.environ["PYJHORA_EVENTS_MAX_DAYS"] = "3653"
+    try:
+        TransitIngressRequest(**request)
+        try:
+            TransitEventRequest(**{**request, "end": "2040-01-01"})
+            raise AssertionError("Event range limit not applied")
+        except ValueError as e:
+            assert "At most 3653 days per event search" in str(e)
+    finally:
+        del os.environ["PYJHORA_EVENTS_MAX_DAYS"]
+    # The base range model has the default limit
+    TransitRangeRequest(**{**request, "end": "2040-01-01"})
+    try:
+        TransitRangeRequest(**{**request, "start": "1900-01-01", "end": "2040-01-01"})
+        raise AssertionError("Default range limit not applied")
+    except ValueError as e:
+        assert "At most 36525 days per search" in str(e)
+
+    section("Test 4: Events are merged and the payload built off the event loop")
+    used_on = []
+
+    def recording(function):
+        def wrapper(*args):
+            try:
+                asyncio.get_running_loop()
+                used_on.append(f"{function.__name__} on the event loop")
+            except RuntimeError:
+                used_on.append(f"{function.__name__} in a thread")
+            return function(*args)
+        return wrapper
+
+    original_merge, original_times = transit_events.merge_events, transits.local_times
+    transit_events.merge_events, transits.local_times = recording(original_merge), recording(original_times)
+    try:
+        with TestClient(app) as client:
+            again = client.post("/api/v1/transits/events", json=request).json()
+    finally:
+        transit_events.merge_events, transits.local_times = original_merge, original_times
+    for key in ("stations", "retrograde", "combustion", "combustion_orbs"):
+        assert again[key] == data[key], key
+    print(f"  {used_on}")
+    # One conversion for all stations and one for all period bounds
+    assert used_on == ["merge_events in a thread"] + ["local_times in a thread"] * 2
+
+
+if __name__ == "__main__":
+    run_script("transit event", run_checks)
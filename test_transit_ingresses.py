@@ -0,0 +1,123 @@
+"""Test script for the ingress search engine and endpoint"""
+
+import asyncio
+import random
+import time
+
+import numpy as np
+import swisseph as swe
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import transits
+from app.services import transit_events
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.calculator import PyJHoraCalculator
+from app.services.ephemeris_store import planet_series
+from app.services.transit_events import local_times, next_ingress, planet_ingresses, utc_julian_day
+from script_checks import run_script, section
+
+RANGES = 24
+DIVISIONS = {"sign": 30.0, "nakshatra": 40 / 3, "pada": 10 / 3}
+
+
+def run_checks():
+    section(f"Test 1: Same ingresses as a fine scan for {RANGES} random ranges, per ayanamsa")
+    rng = random.Random(23)
+    for ayanamsa in ("LAHIRI", "KP"):
+        with ayanamsa_guard.use(ayanamsa):
+            for _ in range(RANGES // 2):
+                planet = rng.randrange(9)
+                start = swe.julday(rng.randint(1900, 2099), rng.randint(1, 12), rng.randint(1, 28), 0.0)
+                end = start + rng.uniform(1, 200)
+                events = planet_ingresses(start, end, planet, tuple(DIVISIONS))
+                jd_utc = np.arange(start, end, 0.002 if planet == 1 else 0.02)
+                longitudes = planet_series(jd_utc, planet)[0]
+                for division, size in DIVISIONS.items():
+                    found = [event for event in events if event[1] == division]
+                    assert len(found) == np.count_nonzero(np.diff(longitudes // size)), (ayanamsa, planet, start, division)
+                    for time_, _, before, after in found:
+                        boundary = (after if (after - before) % round(360 / size) == 1 else before) * size
+                        longitude = planet_series(np.array([time_]), planet)[0, 0]
+                        assert abs((longitude - boundary + 180) % 360 - 180) < 1e-5, (planet, time_, division)
+        print(f"  {ayanamsa}: every sign, nakshatra and pada change found, on its boundary")
+
+    section("Test 2: Retrograde re-entries")
+    with ayanamsa_guard.use("LAHIRI"):
+        events = planet_ingresses(swe.julday(2025, 1, 1, 0.0), swe.julday(2026, 1, 1, 0.0), 3, ("sign",))
+    moves = [(before, after) for _, _, before, after in events]
+    print(f"  Mercury 2025: {len(events)} sign ingresses, {moves}")
+    backward = [i for i, (before, after) in enumerate(moves) if (after - before) % 12 != 1]
+    assert backward and all(moves[i + 1] == moves[i][::-1] for i in backward if i + 1 < len(moves))
+
+    section("Test 3: A yearly calendar of all planets")
+    request = {"start": "2025-01-01", "end": "2026-01-01", "timezone_offset": 5.5}
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        data = client.post("/api/v1/transits/ingresses", json=request).json()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        padas = client.post("/api/v1/transits/ingresses", json={
+            **request, "planets": ["moon"], "divisions": ["pada", "nakshatra"], "limit": 10
+        }).json()
+        rejected = [client.post("/api/v1/transits/ingresses", json={**request, **change}).status_code
+                    for change in ({"end": "2024-12-31"}, {"divisions": ["tithi"]}, {"limit": 0})]
+    print(f"  {data['total']} ingresses in {elapsed_ms:.0f}ms ({data['calculation_info']})")
+    counts = {name: sum(event["planet"] == name for event in data["ingresses"]) for name in data["planets"]}
+    assert counts["Sun"] == 12 and counts["Moon"] > 150 and counts["Rahu"] == counts["Ketu"] == 1
+    assert [event["time"] for event in data["ingresses"]] == sorted(event["time"] for event in data["ingresses"])
+    sun = [event for event in data["ingresses"] if event["planet"] == "Sun"]
+    assert sun[0]["to"] == "Capricorn" and sun[0]["time"].startswith("2025-01-14")
+    assert all(event["retrograde"] for event in data["ingresses"] if event["planet"] in ("Rahu", "Ketu"))
+
+    assert padas["divisions"] == ["nakshatra", "pada"] and padas["truncated"] and len(padas["ingresses"]) == 10
+    assert all(event["division"] == "pada" or event["to"] in padas["ingresses"][i + 1]["to"]
+               for i, event in enumerate(padas["ingresses"][:-1]))
+    assert rejected == [422, 422, 422]
+    print(f"  Moon padas: {[event['to'] for event in padas['ingresses'][:5]]}; invalid requests rejected")
+
+    section("Test 4: Next entries include Rahu and Ketu")
+    calculator = PyJHoraCalculator({"date": "2025-06-15", "time": "14:30:00", "latitude": 13.0827,
+                                    "longitude": 80.2707, "timezone_offset": 5.5}, "LAHIRI")
+    entries = calculator.calculate_next_planet_entries(9)["next_entries"]
+    assert len(entries) == 9 and {entry["planet"] for entry in entries if entry["retrograde"]} >= {"Rahu", "Ketu"}
+    with ayanamsa_guard.use("LAHIRI"):
+        saturn = next_ingress(calculator.jd_utc, 6)
+    print(f"  {[(entry['planet'], entry['entry_date']) for entry in entries]}")
+    assert saturn and saturn[2] == 0
+
+    section("Test 5: Local times and UTC Julian days round-trip")
+    for local_time, offset in (("2025-01-01T00:00:00", 5.5), ("1947-08-14T23:59:59", -9.75), ("2100-06-30T12:30:00", 0)):
+        jd_utc = utc_julian_day(local_time, offset)
+        assert str(local_times(np.array([jd_utc]), offset)[0]) == local_time, local_time
+    assert utc_julian_day("2025-01-01", 5.5) == swe.julday(2025, 1, 1, 0.0) - 5.5 / 24
+    print("  Dates with and without times, east and west of UTC")
+
+    section("Test 6: Ingresses are merged and the payload built off the event loop")
+    used_on = []
+
+    def recording(function):
+        def wrapper(*args):
+            try:
+                asyncio.get_running_loop()
+                used_on.append(f"{function.__name__} on the event loop")
+            except RuntimeError:
+                used_on.append(f"{function.__name__} in a thread")
+            return function(*args)
+        return wrapper
+
+    original_merge, original_times = transit_events.merge_ingresses, transits.local_times
+    transit_events.merge_ingresses, transits.local_times = recording(original_merge), recording(original_times)
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/v1/transits/ingresses", json={
+                "start": "2030-01-01", "end": "2031-01-01", "planets": ["Moon"], "divisions": ["pada"], "limit": 100000
+            })
+    finally:
+        transit_events.merge_ingresses, transits.local_times = original_merge, original_times
+    assert response.status_code == 200 and response.json()["total"] > 1000
+    print(f"  {response.json()['total']} Moon pada ingresses; {sorted(set(used_on))}")
+    assert sorted(set(used_on)) == ["local_times in a thread", "merge_ingresses in a thread"]
+
+
+if __name__ == "__main__":
+    run_script("transit ingress", run_checks)
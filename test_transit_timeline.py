@@ -0,0 +1,135 @@
+"""Test script for the planetary timeline endpoint"""
+
+import asyncio
+import base64
+import os
+import random
+
+import httpx
+import numpy as np
+import swisseph as swe
+from fastapi.testclient import TestClient
+from jhora import const
+from jhora.panchanga import drik
+
+from app.main import app
+from app.routers import transits
+from app.services.ayanamsa import ayanamsa_guard
+from app.services.ephemeris import COLUMN_DTYPES, calculate_timeline_chunk, timeline_columns
+from app.services.ephemeris_store import EPHEMERIS_BODIES
+from app.services.executor import calculation_pool
+from test_panchanga_kernel import SwissEphemerisCounter
+from script_checks import run_script, section
+
+SAMPLES = 300
+
+
+def run_checks():
+    # Tests 1-3 check the Swiss Ephemeris path; test_ephemeris_store covers the store
+    os.environ["PYJHORA_EPHEMERIS_STORE_ENABLED"] = "0"
+    section(f"Test 1: Same longitudes and speeds as drik for {SAMPLES} random instants, per ayanamsa")
+    rng = random.Random(21)
+    utc = drik.Place("UTC", 0.0, 0.0, 0.0)
+    for ayanamsa in ("LAHIRI", "RAMAN", "KP"):
+        for _ in range(SAMPLES // 3):
+            jd = swe.julday(rng.randint(1800, 2200), rng.randint(1, 12), rng.randint(1, 28), rng.uniform(0, 24))
+            series = calculate_timeline_chunk(jd, 1.0, 1, tuple(range(9)), ayanamsa)
+            with ayanamsa_guard.use(ayanamsa):
+                for planet in range(9):
+                    longitude = drik.sidereal_longitude(jd, EPHEMERIS_BODIES[planet])
+                    if planet == 8:
+                        longitude = drik.ketu(longitude)
+                    assert abs(series[planet][0][0] - longitude) < 1e-9, (ayanamsa, planet, jd)
+                    assert round(series[planet][1][0], 3) == drik.daily_planet_speed(jd, utc, EPHEMERIS_BODIES[planet])
+        print(f"  {ayanamsa}: identical")
+
+    section("Test 2: Vectorized signs and nakshatras match the per-instant formulas")
+    longitudes = np.array([0.0, 29.999999, 30.0, 13.333333333333334, 359.9999999] + [rng.uniform(0, 360) for _ in range(2000)])
+    columns = timeline_columns(np.stack([longitudes, np.linspace(-1, 1, len(longitudes))]))
+    for i, longitude in enumerate(longitudes):
+        assert columns["sign"][i] == int(longitude / 30) + 1
+        assert columns["nakshatra"][i] == int(longitude / 13.333333333333334) % 27 + 1
+        assert columns["pada"][i] == int((longitude % 13.333333333333334) / 3.333333333333333) + 1
+    print("  Signs, nakshatras and padas agree for 2005 longitudes")
+
+    section("Test 3: One ephemeris call per sample and planet, Ketu from Rahu")
+    with SwissEphemerisCounter() as counter:
+        calculate_timeline_chunk(2460676.5, 1.0, 100, tuple(range(9)), "LAHIRI")
+    print(f"  100 samples of 9 planets: {counter.calls['calc_ut']} calc_ut calls")
+    assert counter.calls["calc_ut"] == 800
+    del os.environ["PYJHORA_EPHEMERIS_STORE_ENABLED"]
+
+    section("Test 4: Ten years at daily resolution, in every format")
+    request = {"start": "2025-01-01", "end": "2034-12-31", "timezone_offset": 5.5}
+    with TestClient(app) as client:
+        data = client.post("/api/v1/transits/timeline", json=request).json()
+        binary = client.post("/api/v1/transits/timeline", json={**request, "format": "binary"}).json()
+        text = client.post("/api/v1/transits/timeline", json={**request, "format": "csv"}).text
+        hourly = client.post("/api/v1/transits/timeline", json={
+            "start": "2025-01-01T00:00", "end": "2025-01-01T06:00", "step_minutes": 60, "planets": ["Ketu", "moon"]
+        }).json()
+        rejected = client.post("/api/v1/transits/timeline", json={"start": "2025-01-02", "end": "2025-01-01"})
+    print(f"  {data['samples']} samples in {data['calculation_info']}")
+    assert data["samples"] == len(data["times"]) == 3652
+    assert data["times"][0] == "2025-01-01T00:00:00" and data["times"][-1] == "2034-12-31T00:00:00"
+    assert list(data["planets"]) == ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+    saturn = data["planets"]["Saturn"]
+    assert any(saturn["retrograde"]) and not all(saturn["retrograde"])
+    for name, dtype in COLUMN_DTYPES.items():
+        decoded = np.frombuffer(base64.b64decode(binary["planets"]["Saturn"][name]), dtype=dtype)
+        assert np.allclose(decoded, saturn[name], atol=1e-6), name
+    rows = text.strip().split("\n")
+    assert len(rows) == 1 + 3652 * 9 and rows[0].startswith("time,jd_utc,planet")
+    assert rows[2].split(",")[2] == "Moon" and rows[2].split(",")[5] == data["sign_names"][data["planets"]["Moon"]["sign"][0] - 1]
+    print(f"  json {len(data['times'])} times, binary and csv ({len(rows) - 1} rows) agree")
+
+    assert list(hourly["planets"]) == ["Moon", "Ketu"] and len(hourly["times"]) == 7
+    assert hourly["times"][1] == "2025-01-01T01:00:00"
+    assert abs(hourly["planets"]["Moon"]["longitude"][0] - drik.sidereal_longitude(swe.julday(2025, 1, 1, 0.0), const._MOON)) < 1e-6
+    assert rejected.status_code == 422
+    print("  Hourly samples for selected planets; end before start is rejected")
+
+    section("Test 5: Concurrent requests share the pool slots, payloads are built off the event loop")
+    in_flight, peak, built_on = [0], [0], []
+    original_submit, original_columns = calculation_pool.submit, transits.timeline_columns
+
+    async def counted_submit(*args):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        try:
+            return await original_submit(*args)
+        finally:
+            in_flight[0] -= 1
+
+    def recording_columns(series):
+        try:
+            asyncio.get_running_loop()
+            built_on.append("event loop")
+        except RuntimeError:
+            built_on.append("thread")
+        return original_columns(series)
+
+    async def concurrent_requests():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=300) as client:
+            return await asyncio.gather(*(
+                client.post("/api/v1/transits/timeline", json={"start": f"{year}-01-01", "end": f"{year}-12-31"})
+                for year in (2041, 2042, 2043)
+            ))
+
+    calculation_pool.submit, transits.timeline_columns = counted_submit, recording_columns
+    os.environ["PYJHORA_TIMELINE_CHUNK"] = "50"
+    try:
+        responses = asyncio.run(concurrent_requests())
+    finally:
+        calculation_pool.submit, transits.timeline_columns = original_submit, original_columns
+        del os.environ["PYJHORA_TIMELINE_CHUNK"]
+    tasks = sum(response.json()["calculation_info"]["tasks"] for response in responses)
+    print(f"  {tasks} chunks of 3 requests, at most {peak[0]} in flight on {calculation_pool.workers} workers")
+    assert all(response.status_code == 200 for response in responses) and tasks == 3 * 8
+    assert peak[0] == calculation_pool.workers
+    assert built_on and set(built_on) == {"thread"}
+
+
+if __name__ == "__main__":
+    run_script("transit timeline", run_checks)
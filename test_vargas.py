@@ -0,0 +1,61 @@
+"""Test script for divisional charts derived from a single D1 evaluation"""
+
+from jhora.horoscope.chart import charts
+from app.services.calculator import PyJHoraCalculator, CHART_FACTORS
+
+# Test data for Sharan
+birth_data = {
+    'date': '1998-12-22',
+    'time': '17:12:00',
+    'latitude': 12.9716,
+    'longitude': 77.5946,
+    'timezone_offset': 5.5
+}
+
+print("="*80)
+print("TESTING VARGA ENGINE")
+print("="*80)
+
+calc = PyJHoraCalculator(birth_data, 'LAHIRI')
+vargas = calc.calculate_vargas()
+
+print(f"\nCharts calculated: {len(vargas)}")
+print(f"Ephemeris calls: {calc.ephemeris_calls}")
+assert calc.total_ephemeris_calls == 1, "All vargas should share one D1 evaluation"
+
+print(f"\n{'Chart':<6} {'Asc':<12} {'Sun':<12} {'Moon':<12} Matches PyJHora")
+print("-"*80)
+for chart_type, factor in CHART_FACTORS.items():
+    chart = vargas[chart_type]
+    assert chart['calculation_info']['divisional_factor'] == factor
+    planets = {p['planet']: p for p in chart['planets']}
+
+    if factor == 2:
+        # D2 uses the classical Hora method rather than PyJHora's default
+        matches = "classical hora"
+    else:
+        # Compare with PyJHora's own per-chart ephemeris evaluation
+        expected = charts.divisional_chart(calc.jd, calc.place, divisional_chart_factor=factor)
+        parsed, asc_sign, asc_deg = calc.parse_chart_data(expected)
+        assert chart['ascendant']['sign_id'] == asc_sign
+        assert chart['ascendant']['degree'] == round(asc_deg, 4)
+        for planet_id, (sign_id, longitude) in parsed.items():
+            planet = chart['planets'][planet_id]
+            assert planet['sign_id'] == sign_id, f"{chart_type} planet {planet_id}"
+            assert planet['longitude'] == round(longitude, 4), f"{chart_type} planet {planet_id}"
+        matches = "yes"
+
+    print(f"{chart_type:<6} {chart['ascendant']['sign']:<12} {planets['Sun']['sign']:<12} "
+          f"{planets['Moon']['sign']:<12} {matches}")
+
+# Compact table used by POST /api/v1/charts/vargas
+table_result = PyJHoraCalculator(birth_data, 'LAHIRI').calculate_varga_table(["D1", "D9", "D60"])
+table = table_result['table']
+print(f"\nVarga table ({', '.join(table_result['chart_types'])}):")
+for planet, signs in table.items():
+    print(f"  {planet:<10} " + "  ".join(f"{chart}={sign:<12}" for chart, sign in signs.items()))
+    if planet != "Ascendant":
+        assert signs["D9"] == vargas["D9"]['planets'][list(table).index(planet) - 1]['sign']
+assert table["Ascendant"]["D60"] == vargas["D60"]['ascendant']['sign']
+
+print("\nAll varga checks passed!")